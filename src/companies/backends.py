@@ -0,0 +1,82 @@
+import time
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+
+
+PERMISSION_CACHE_TIMEOUT = 60 * 60
+PERMISSION_VERSION_KEY = "companies:permission-version"
+
+
+def get_permission_version() -> int:
+    version = cache.get(PERMISSION_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted version never matches permission
+        # sets cached under an older number.
+        cache.add(PERMISSION_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(PERMISSION_VERSION_KEY)
+    return version
+
+
+async def aget_permission_version() -> int:
+    version = await cache.aget(PERMISSION_VERSION_KEY)
+    if version is None:
+        await cache.aadd(PERMISSION_VERSION_KEY, time.time_ns(), None)
+        version = await cache.aget(PERMISSION_VERSION_KEY)
+    return version
+
+
+def _increment_permission_version() -> None:
+    try:
+        cache.incr(PERMISSION_VERSION_KEY)
+    except ValueError:
+        cache.set(PERMISSION_VERSION_KEY, time.time_ns(), None)
+
+
+def bump_permission_version() -> None:
+    # Bumped again on commit in case a request cached the pre-change
+    # permissions in between.
+    _increment_permission_version()
+    transaction.on_commit(_increment_permission_version)
+
+
+def _permission_cache_key(user, version: int) -> str:
+    return f"companies:permissions:{version}:{user.pk}:{int(user.is_superuser)}"
+
+
+def permission_cache_key(user) -> str:
+    return _permission_cache_key(user, get_permission_version())
+
+
+async def apermission_cache_key(user) -> str:
+    return _permission_cache_key(user, await aget_permission_version())
+
+
+class CachedPermissionBackend(ModelBackend):
+    # ModelBackend resolves user and group permissions again on every request;
+    # this keeps the resolved set in the shared cache across requests.
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            key = permission_cache_key(user_obj)
+            permissions = cache.get(key)
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                cache.set(key, permissions, PERMISSION_CACHE_TIMEOUT)
+            user_obj._perm_cache = permissions
+        return user_obj._perm_cache
+
+    async def aget_all_permissions(self, user_obj, obj=None):
+        # BaseBackend's async path reads user and group permissions directly,
+        # so ahas_perm() would skip the cache without this override.
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            key = await apermission_cache_key(user_obj)
+            permissions = await cache.aget(key)
+            if permissions is None:
+                permissions = await super().aget_all_permissions(user_obj)
+                await cache.aset(key, permissions, PERMISSION_CACHE_TIMEOUT)
+            user_obj._perm_cache = permissions
+        return user_obj._perm_cache
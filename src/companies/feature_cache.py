@@ -0,0 +1,127 @@
+import threading
+import time
+from typing import Iterable, NamedTuple
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import NoReverseMatch, reverse
+from .feature_routes import FEATURE_ROUTE_NAMES
+from .models import CompanyFeature
+
+
+FEATURE_CACHE_TIMEOUT = 60 * 60
+# Invalidation clears this process's entries at once; the TTL bounds how long
+# other processes can serve grants that changed elsewhere.
+FEATURE_LOCAL_TTL = 10
+
+
+class SidebarFeature(NamedTuple):
+    name: str
+    url: str
+
+
+class FeatureGrants(NamedTuple):
+    codes: frozenset[str]
+    sidebar: tuple[SidebarFeature, ...]
+
+
+_local: dict[int, tuple[float, FeatureGrants]] = {}
+_local_lock = threading.Lock()
+
+
+def _cache_key(company_id: int) -> str:
+    return f"companies:feature-grants:{company_id}"
+
+
+def _granted_features(company_id: int):
+    return (
+        CompanyFeature.objects.filter(
+            company_id=company_id,
+            enabled=True,
+            feature__is_active=True,
+        )
+        .values_list("feature__code", "feature__name")
+        .order_by("feature__code")
+    )
+
+
+def _feature_grants_from_rows(rows: list[tuple[str, str]]) -> FeatureGrants:
+    codes = []
+    sidebar = []
+    for code, name in rows:
+        codes.append(code)
+        route_name = FEATURE_ROUTE_NAMES.get(code)
+        if route_name is None:
+            continue
+        try:
+            sidebar.append(SidebarFeature(name=name, url=reverse(route_name)))
+        except NoReverseMatch:
+            continue
+    return FeatureGrants(codes=frozenset(codes), sidebar=tuple(sidebar))
+
+
+def _build_feature_grants(company_id: int) -> FeatureGrants:
+    return _feature_grants_from_rows(list(_granted_features(company_id)))
+
+
+async def _abuild_feature_grants(company_id: int) -> FeatureGrants:
+    return _feature_grants_from_rows([row async for row in _granted_features(company_id)])
+
+
+def _local_feature_grants(company_id: int, now: float) -> FeatureGrants | None:
+    with _local_lock:
+        entry = _local.get(company_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    return None
+
+
+def _store_local_feature_grants(company_id: int, now: float, grants: FeatureGrants) -> None:
+    with _local_lock:
+        _local[company_id] = (now + FEATURE_LOCAL_TTL, grants)
+
+
+def get_feature_grants(company_id: int) -> FeatureGrants:
+    now = time.monotonic()
+    grants = _local_feature_grants(company_id, now)
+    if grants is not None:
+        return grants
+
+    key = _cache_key(company_id)
+    grants = cache.get(key)
+    if grants is None:
+        grants = _build_feature_grants(company_id)
+        cache.set(key, grants, FEATURE_CACHE_TIMEOUT)
+    _store_local_feature_grants(company_id, now, grants)
+    return grants
+
+
+async def aget_feature_grants(company_id: int) -> FeatureGrants:
+    now = time.monotonic()
+    grants = _local_feature_grants(company_id, now)
+    if grants is not None:
+        return grants
+
+    key = _cache_key(company_id)
+    grants = await cache.aget(key)
+    if grants is None:
+        grants = await _abuild_feature_grants(company_id)
+        await cache.aset(key, grants, FEATURE_CACHE_TIMEOUT)
+    _store_local_feature_grants(company_id, now, grants)
+    return grants
+
+
+def _drop_feature_grants(company_ids: list[int]) -> None:
+    with _local_lock:
+        for company_id in company_ids:
+            _local.pop(company_id, None)
+    cache.delete_many([_cache_key(company_id) for company_id in company_ids])
+
+
+def invalidate_feature_grants(company_ids: Iterable[int]) -> None:
+    # Dropped again on commit in case a read re-cached the pre-write grants
+    # in between.
+    company_ids = list(company_ids)
+    if not company_ids:
+        return
+    _drop_feature_grants(company_ids)
+    transaction.on_commit(lambda: _drop_feature_grants(company_ids))
@@ -2,3 +2,7 @@ FEATURE_ROUTE_NAMES = {
     "companies": "companies:home",
     "warehouse": "warehouse:home",
 }
+
+# The companies feature also serves login, signup and the feature settings
+# themselves, so it is never gated.
+UNGATED_FEATURES = {"companies"}
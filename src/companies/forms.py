@@ -113,9 +113,17 @@ class EmployeeGroupsForm(forms.Form):
         label="Groups",
     )
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, group_choices: list[tuple[int, str]] | None = None, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields["groups"].queryset = Group.objects.order_by("name")
+        if group_choices is not None:
+            # Lists of forms share one precomputed choice list instead of
+            # querying the groups once per form.
+            self.fields["groups"].choices = group_choices
+
+
+def get_group_choices() -> list[tuple[int, str]]:
+    return list(Group.objects.order_by("name").values_list("id", "name"))
 
 
 class CompanyUpdateForm(forms.ModelForm):  # type: ignore
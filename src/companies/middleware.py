@@ -0,0 +1,146 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import PermissionDenied
+from django.http import HttpRequest
+from django.utils.decorators import sync_and_async_middleware
+from .feature_cache import aget_feature_grants, get_feature_grants
+from .feature_routes import FEATURE_ROUTE_NAMES, UNGATED_FEATURES
+from .models import Company, Employee
+
+
+TENANT_SESSION_KEY = "_tenant"
+
+
+def _session_company_filter(cached: dict | None, user) -> dict | None:
+    if not cached or cached.get("user_id") != user.pk:
+        return None
+    # Matching the cached employee in the same query keeps a stale entry
+    # (employee removed or moved to another company) from resolving.
+    return {
+        "pk": cached["company_id"],
+        "employees__pk": cached["employee_id"],
+        "employees__user_id": user.pk,
+    }
+
+
+def _session_entry(user, employee: Employee) -> dict:
+    return {
+        "user_id": user.pk,
+        "employee_id": employee.pk,
+        "company_id": employee.company_id,
+    }
+
+
+def resolve_request_company(request: HttpRequest) -> Company | None:
+    user = request.user
+    if not getattr(user, "is_authenticated", False):
+        return None
+
+    lookup = _session_company_filter(request.session.get(TENANT_SESSION_KEY), user)
+    if lookup is not None:
+        company = Company.objects.filter(**lookup).first()
+        if company is not None:
+            return company
+
+    employee = Employee.objects.select_related("company").filter(user=user).first()
+    if employee is None:
+        request.session.pop(TENANT_SESSION_KEY, None)
+        return None
+    request.session[TENANT_SESSION_KEY] = _session_entry(user, employee)
+    return employee.company
+
+
+async def aresolve_request_company(request: HttpRequest) -> Company | None:
+    user = await request.auser()
+    if not getattr(user, "is_authenticated", False):
+        return None
+
+    lookup = _session_company_filter(await request.session.aget(TENANT_SESSION_KEY), user)
+    if lookup is not None:
+        company = await Company.objects.filter(**lookup).afirst()
+        if company is not None:
+            return company
+
+    employee = await Employee.objects.select_related("company").filter(user=user).afirst()
+    if employee is None:
+        await request.session.apop(TENANT_SESSION_KEY, None)
+        return None
+    await request.session.aset(TENANT_SESSION_KEY, _session_entry(user, employee))
+    return employee.company
+
+
+@sync_and_async_middleware
+class TenantMiddleware:
+    # Resolves the user's company once per request as request.company, for
+    # views and context processors alike. Under ASGI it stays async so async
+    # views are not run through async_to_sync.
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.company = resolve_request_company(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest):
+        request.company = await aresolve_request_company(request)
+        return await self.get_response(request)
+
+
+@sync_and_async_middleware
+class FeatureGateMiddleware:
+    # Denies views in a feature's URL namespace to companies without that
+    # feature enabled. The namespace map is built once at startup and grants
+    # come from the feature cache, so the check costs no query.
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # The handler adapts process_view to the stack's mode; binding the
+            # coroutine here keeps it from being wrapped in sync_to_async.
+            self.process_view = self.aprocess_view
+        self.namespace_features = {
+            route_name.split(":", 1)[0]: feature_code
+            for feature_code, route_name in FEATURE_ROUTE_NAMES.items()
+            if ":" in route_name and feature_code not in UNGATED_FEATURES
+        }
+
+    def __call__(self, request: HttpRequest):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest):
+        return await self.get_response(request)
+
+    def _gated_feature(self, request: HttpRequest) -> tuple[Company, str] | None:
+        company = getattr(request, "company", None)
+        namespaces = request.resolver_match.namespaces
+        if company is None or not namespaces:
+            return None
+        feature_code = self.namespace_features.get(namespaces[0])
+        if feature_code is None:
+            return None
+        return company, feature_code
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        gated = self._gated_feature(request)
+        if gated is None:
+            return None
+        company, feature_code = gated
+        if feature_code in get_feature_grants(company.pk).codes:
+            return None
+        raise PermissionDenied(f"The {feature_code} feature is not enabled for this company.")
+
+    async def aprocess_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        gated = self._gated_feature(request)
+        if gated is None:
+            return None
+        company, feature_code = gated
+        if feature_code in (await aget_feature_grants(company.pk)).codes:
+            return None
+        raise PermissionDenied(f"The {feature_code} feature is not enabled for this company.")
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0006_alter_company_options'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['company', 'user'], name='employee_company_user_idx'),
+        ),
+    ]
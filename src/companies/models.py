@@ -24,11 +24,9 @@ class Company(models.Model):
         return self.name
 
     def has_feature(self, feature_code: str) -> bool:
-        return self.feature_grants.filter(
-            enabled=True,
-            feature__is_active=True,
-            feature__code=feature_code,
-        ).exists()
+        from .feature_cache import get_feature_grants
+
+        return feature_code in get_feature_grants(self.pk).codes
 
 
 class Employee(models.Model):
@@ -42,6 +40,14 @@ class Employee(models.Model):
 
     class Meta:
         ordering = ["user__username"]
+        indexes = [
+            # Employee lists seek by company and join users on the covered
+            # user_id; the username sort then only touches that company's rows.
+            models.Index(
+                fields=["company", "user"],
+                name="employee_company_user_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user.username} - {self.company.name}"
@@ -1,6 +1,9 @@
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group, Permission
-from django.db.models.signals import post_migrate, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
 from django.dispatch import receiver
+from .backends import bump_permission_version
+from .feature_cache import invalidate_feature_grants
 from .models import Company, CompanyFeature, Feature
 
 
@@ -20,6 +23,47 @@ def ensure_companies_feature_enabled(sender, instance: Company, created: bool, *
     )
 
 
+@receiver(post_save, sender=CompanyFeature)
+@receiver(post_delete, sender=CompanyFeature)
+def invalidate_company_feature_grants(sender, instance: CompanyFeature, **kwargs):
+    invalidate_feature_grants([instance.company_id])
+
+
+@receiver(post_save, sender=Feature)
+def invalidate_feature_grants_on_feature_save(sender, instance: Feature, **kwargs):
+    # Deleting a feature cascades to its grants, which invalidate themselves.
+    invalidate_feature_grants(
+        CompanyFeature.objects.filter(feature=instance).values_list("company_id", flat=True)
+    )
+
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_cached_permissions(sender, action: str, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_permission_version()
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def invalidate_cached_permissions_on_delete(sender, **kwargs):
+    # Cascaded deletes of the m2m rows send no m2m_changed.
+    bump_permission_version()
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_permissions_on_user_create(sender, created: bool, **kwargs):
+    # A user created under a reused primary key must not pick up the cached
+    # permissions of the one it replaces.
+    if created:
+        bump_permission_version()
+
+
 @receiver(post_migrate)
 def configure_standard_groups(sender, app_config, **kwargs):
     if app_config is None or app_config.label != "companies":
@@ -95,3 +139,4 @@ def configure_standard_groups(sender, app_config, **kwargs):
             if permission is not None:
                 permission_ids.append(permission.id)
         group.permissions.set(permission_ids)
+    bump_permission_version()
@@ -1,12 +1,20 @@
+from asgiref.sync import async_to_sync, iscoroutinefunction
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth.models import Group, Permission, User
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.sessions.backends.db import SessionStore
 from django.core.exceptions import ValidationError
-from django.test import RequestFactory
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from .admin import CompanyFeatureAdmin
+from .backends import get_permission_version
+from .views import EMPLOYEES_PAGE_SIZE
 from .forms import EmployeeRegisterForm
+from .middleware import TENANT_SESSION_KEY, FeatureGateMiddleware, TenantMiddleware
 from .models import Company, CompanyFeature, Employee, Feature
 
 
@@ -204,6 +212,134 @@ class CompanyFeatureToggleViewTests(TestCase):
         self.assertIn(reverse("companies:login"), response.url)
 
 
+class FeatureGrantCacheTests(TestCase):
+    def setUp(self) -> None:
+        self.company = Company.objects.create(
+            name="Cache Co", cnpj="99999999000199")
+        self.user = User.objects.create_superuser(
+            username="cache-admin",
+            email="cache@example.com",
+            password="StrongPassword1",
+        )
+        Employee.objects.create(user=self.user, company=self.company)
+        self.client.login(username="cache-admin", password="StrongPassword1")
+
+        self.feature, _ = Feature.objects.get_or_create(
+            code="warehouse",
+            defaults={"name": "Warehouse"},
+        )
+        CompanyFeature.objects.update_or_create(
+            company=self.company,
+            feature=self.feature,
+            defaults={"enabled": True},
+        )
+        self.sidebar_link = f'<a href="{reverse("warehouse:home")}" class="text-dark">'
+
+    def test_sidebar_is_served_from_cache(self) -> None:
+        self.client.get(reverse("companies:employees"))
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("companies:employees"))
+        self.assertContains(response, self.sidebar_link)
+        self.assertFalse(
+            any(
+                '"companies_companyfeature"' in query["sql"]
+                for query in context.captured_queries
+            )
+        )
+
+    def test_toggling_features_refreshes_sidebar(self) -> None:
+        response = self.client.get(reverse("companies:employees"))
+        self.assertContains(response, self.sidebar_link)
+
+        self.client.post(
+            reverse("companies:company_configuration"),
+            data={"action": "toggle_features"},
+        )
+
+        response = self.client.get(reverse("companies:employees"))
+        self.assertNotContains(response, self.sidebar_link)
+        self.assertFalse(self.company.has_feature("warehouse"))
+
+    def test_deactivating_feature_invalidates_grants(self) -> None:
+        self.assertTrue(self.company.has_feature("warehouse"))
+
+        self.feature.is_active = False
+        self.feature.save()
+
+        self.assertFalse(self.company.has_feature("warehouse"))
+        self.assertTrue(self.company.has_feature("companies"))
+
+
+async def view_stub(request):
+    return HttpResponse()
+
+
+class FeatureGateMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        self.company = Company.objects.create(
+            name="Gate Co", cnpj="12121212000112")
+        self.user = User.objects.create_user(
+            username="gate-user", password="StrongPassword1")
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="view_item"))
+        Employee.objects.create(user=self.user, company=self.company)
+        self.client.login(username="gate-user", password="StrongPassword1")
+        self.feature, _ = Feature.objects.get_or_create(
+            code="warehouse",
+            defaults={"name": "Warehouse"},
+        )
+
+    def test_feature_without_grant_is_denied(self) -> None:
+        response = self.client.get(reverse("warehouse:items"))
+        self.assertEqual(response.status_code, 403)
+
+    def test_enabled_feature_is_served_without_grant_queries(self) -> None:
+        CompanyFeature.objects.create(company=self.company, feature=self.feature)
+        self.client.get(reverse("warehouse:items"))
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("warehouse:items"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(
+            any(
+                '"companies_companyfeature"' in query["sql"]
+                for query in context.captured_queries
+            )
+        )
+
+    def test_disabling_feature_denies_access(self) -> None:
+        grant = CompanyFeature.objects.create(
+            company=self.company, feature=self.feature)
+        self.assertEqual(
+            self.client.get(reverse("warehouse:items")).status_code, 200)
+
+        grant.enabled = False
+        grant.save()
+
+        self.assertEqual(
+            self.client.get(reverse("warehouse:items")).status_code, 403)
+
+    async def test_async_requests_are_gated_natively(self) -> None:
+        self.assertTrue(iscoroutinefunction(FeatureGateMiddleware(TenantMiddleware(view_stub))))
+        await self.user.user_permissions.aadd(
+            await Permission.objects.aget(codename="view_financial_dashboard"))
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse("warehouse:dashboard_data"))
+        self.assertEqual(response.status_code, 403)
+
+        await CompanyFeature.objects.acreate(company=self.company, feature=self.feature)
+        response = await self.async_client.get(reverse("warehouse:dashboard_data"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_companies_pages_are_never_gated(self) -> None:
+        CompanyFeature.objects.filter(company=self.company).delete()
+
+        response = self.client.get(reverse("companies:home"))
+        self.assertEqual(response.status_code, 200)
+
+
 class CompanyHomeViewTests(TestCase):
     def setUp(self) -> None:
         self.company = Company.objects.create(
@@ -275,6 +411,84 @@ class CompanyHomeViewTests(TestCase):
         self.assertNotContains(response, reverse("warehouse:home"))
 
 
+class TenantMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        self.company = Company.objects.create(
+            name="Tenant Co", cnpj="77777777000177")
+        self.user = User.objects.create_user(
+            username="tenant-user", password="StrongPassword1")
+        self.employee = Employee.objects.create(
+            user=self.user, company=self.company)
+        self.client.login(username="tenant-user", password="StrongPassword1")
+
+    def tenancy_queries(self, url: str) -> list[str]:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        # Company lookups for the current user; the employee list on the
+        # page filters by company instead.
+        return [
+            query["sql"] for query in context.captured_queries
+            if f'"companies_employee"."user_id" = {self.user.pk}' in query["sql"]
+        ]
+
+    def test_page_view_resolves_company_in_one_query(self) -> None:
+        self.client.get(reverse("companies:home"))
+        self.assertEqual(
+            self.client.session[TENANT_SESSION_KEY],
+            {
+                "user_id": self.user.pk,
+                "employee_id": self.employee.pk,
+                "company_id": self.company.pk,
+            },
+        )
+
+        queries = self.tenancy_queries(reverse("companies:home"))
+        self.assertEqual(len(queries), 1, queries)
+
+    def test_stale_session_resolves_current_company(self) -> None:
+        self.client.get(reverse("companies:home"))
+        other = Company.objects.create(name="Other Co", cnpj="88888888000188")
+        self.employee.delete()
+        Employee.objects.create(user=self.user, company=other)
+
+        response = self.client.get(reverse("companies:home"))
+        self.assertContains(response, "Other Co")
+        self.assertEqual(
+            self.client.session[TENANT_SESSION_KEY]["company_id"], other.pk)
+
+    async def test_async_stack_resolves_company_natively(self) -> None:
+        companies = []
+
+        async def view(request):
+            companies.append(request.company)
+            return HttpResponse()
+
+        async def auser():
+            return self.user
+
+        middleware = TenantMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = AsyncRequestFactory().get("/")
+        request.session = SessionStore()
+        request.auser = auser
+
+        await middleware(request)
+        await middleware(request)
+
+        self.assertEqual([company.pk for company in companies], [self.company.pk] * 2)
+        self.assertEqual(
+            (await request.session.aget(TENANT_SESSION_KEY))["employee_id"], self.employee.pk)
+
+    def test_user_without_employee_is_denied(self) -> None:
+        self.client.get(reverse("companies:home"))
+        self.employee.delete()
+
+        response = self.client.get(reverse("companies:home"))
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn(TENANT_SESSION_KEY, self.client.session)
+
+
 class CompanyEmployeesViewTests(TestCase):
     def setUp(self) -> None:
         self.company = Company.objects.create(
@@ -426,6 +640,63 @@ class CompanyEmployeesViewTests(TestCase):
         self.employee_user.refresh_from_db()
         self.assertIn(viewer_group, self.employee_user.groups.all())
 
+    def grant_group_management(self) -> None:
+        self.user.user_permissions.add(
+            *Permission.objects.filter(
+                content_type__app_label__in=["auth", "companies"],
+                codename__in=["change_user", "view_group", "change_employee"],
+            )
+        )
+
+    def add_employees(self, count: int, group: Group) -> None:
+        start = Employee.objects.count()
+        for index in range(start, start + count):
+            user = User.objects.create_user(
+                username=f"bulk-{index:03d}", email=f"bulk-{index:03d}@example.com")
+            user.groups.add(group)
+            Employee.objects.create(user=user, company=self.company)
+
+    def test_employees_page_query_count_does_not_grow_with_employees(self) -> None:
+        self.grant_group_management()
+        group = Group.objects.create(name="bulk_group")
+        self.add_employees(3, group)
+        self.client.get(reverse("companies:employees"))
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(reverse("companies:employees"))
+
+        self.add_employees(EMPLOYEES_PAGE_SIZE, group)
+        self.client.get(reverse("companies:employees"))
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(reverse("companies:employees"))
+
+        self.assertEqual(len(many.captured_queries), len(few.captured_queries))
+        self.assertContains(response, "bulk_group")
+        self.assertEqual(len(response.context["employee_rows"]), EMPLOYEES_PAGE_SIZE)
+        self.assertEqual(
+            response.context["employee_rows"][0]["groups_form"]["groups"].value(),
+            [group.pk],
+        )
+
+    def test_employees_page_is_paginated(self) -> None:
+        self.add_employees(EMPLOYEES_PAGE_SIZE, Group.objects.create(name="paged"))
+
+        response = self.client.get(reverse("companies:employees"))
+        self.assertEqual(response.context["next_page_url"], "?page=2")
+        self.assertIsNone(response.context["previous_page_url"])
+
+        response = self.client.get(reverse("companies:employees"), {"page": 2})
+        self.assertEqual(len(response.context["employee_rows"]), 2)
+        self.assertContains(response, "employees-operator")
+
+    def test_employees_page_searches_username_and_email(self) -> None:
+        def usernames(search: str) -> list[str]:
+            response = self.client.get(reverse("companies:employees"), {"q": search})
+            return [row["employee"].user.username for row in response.context["employee_rows"]]
+
+        self.assertEqual(usernames("PAULA@"), ["employees-operator"])
+        self.assertEqual(usernames("admin"), ["employees-admin"])
+        self.assertEqual(usernames("missing"), [])
+
 
 class CompanyConfigurationViewTests(TestCase):
     def setUp(self) -> None:
@@ -666,3 +937,68 @@ class StandardGroupsTests(TestCase):
                 codename="change_user",
             ).exists()
         )
+
+
+class CachedPermissionBackendTests(TestCase):
+    def setUp(self) -> None:
+        self.company = Company.objects.create(
+            name="Perm Co", cnpj="13131313000113")
+        self.user = User.objects.create_user(
+            username="perm-user", password="StrongPassword1")
+        Employee.objects.create(user=self.user, company=self.company)
+        self.group = Group.objects.create(name="perm-group")
+        self.group.permissions.add(
+            Permission.objects.get(codename="change_company"))
+        self.client.login(username="perm-user", password="StrongPassword1")
+
+    def fresh_user(self) -> User:
+        return User.objects.get(pk=self.user.pk)
+
+    def test_permissions_are_cached_across_requests(self) -> None:
+        self.user.groups.add(self.group)
+        self.client.get(reverse("companies:company_configuration"))
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("companies:company_configuration"))
+        self.assertContains(response, "Salvar empresa")
+        self.assertFalse(
+            any(
+                '"auth_permission"' in query["sql"]
+                for query in context.captured_queries
+            )
+        )
+
+    def test_async_permission_checks_read_the_cache(self) -> None:
+        self.user.groups.add(self.group)
+        self.assertTrue(async_to_sync(self.fresh_user().ahas_perm)("companies.change_company"))
+
+        user = self.fresh_user()
+        with CaptureQueriesContext(connection) as context:
+            self.assertTrue(async_to_sync(user.ahas_perm)("companies.change_company"))
+            self.assertFalse(async_to_sync(user.ahas_perm)("companies.delete_company"))
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_group_membership_change_bumps_version(self) -> None:
+        self.assertFalse(self.fresh_user().has_perm("companies.change_company"))
+        version = get_permission_version()
+
+        self.user.groups.add(self.group)
+
+        self.assertNotEqual(get_permission_version(), version)
+        self.assertTrue(self.fresh_user().has_perm("companies.change_company"))
+
+    def test_group_permission_change_bumps_version(self) -> None:
+        self.user.groups.add(self.group)
+        self.assertTrue(self.fresh_user().has_perm("companies.change_company"))
+
+        self.group.permissions.clear()
+
+        self.assertFalse(self.fresh_user().has_perm("companies.change_company"))
+
+    def test_direct_permission_change_bumps_version(self) -> None:
+        self.assertFalse(self.fresh_user().has_perm("companies.add_employee"))
+
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="add_employee"))
+
+        self.assertTrue(self.fresh_user().has_perm("companies.add_employee"))
@@ -1,6 +1,9 @@
 from django.contrib.auth.decorators import login_required, permission_required, user_passes_test
 from django.contrib.auth import login
+from django.contrib.auth.models import Group
 from django.core.exceptions import PermissionDenied
+from django.core.paginator import Page, Paginator
+from django.db.models import Prefetch, Q
 from django.http import HttpRequest, HttpResponse
 from django.urls import NoReverseMatch, reverse
 from .feature_routes import FEATURE_ROUTE_NAMES
@@ -11,13 +14,95 @@ from .forms import (
     EmployeeGroupsForm,
     EmployeeRegisterForm,
     EmployeeUpdateForm,
+    get_group_choices,
 )
-from .models import CompanyFeature, Feature, get_user_company
+from .feature_cache import invalidate_feature_grants
+from .models import Company, CompanyFeature, Feature
+
+
+EMPLOYEES_PAGE_SIZE = 25
+
+
+def _employee_page(request: HttpRequest, company: Company) -> tuple[Page, str]:
+    # Groups come in one prefetch for the whole page; the rows' badges and
+    # group form initials read from it.
+    search = request.GET.get("q", "").strip()
+    employees = (
+        company.employees.select_related("user")
+        .prefetch_related(
+            Prefetch("user__groups", queryset=Group.objects.order_by("name"))
+        )
+        .order_by("user__username")
+    )
+    if search:
+        employees = employees.filter(
+            Q(user__username__icontains=search) | Q(user__email__icontains=search)
+        )
+    page = Paginator(employees, EMPLOYEES_PAGE_SIZE).get_page(request.GET.get("page"))
+    return page, search
+
+
+def _employee_page_urls(request: HttpRequest, page: Page) -> dict[str, str | None]:
+    def page_url(number: int) -> str:
+        query = request.GET.copy()
+        query["page"] = number
+        return f"?{query.urlencode()}"
+
+    return {
+        "next_page_url": page_url(page.next_page_number()) if page.has_next() else None,
+        "previous_page_url": (
+            page_url(page.previous_page_number()) if page.has_previous() else None
+        ),
+    }
+
+
+def _build_employee_rows(
+    employees,
+    can_change_employee: bool,
+    can_change_employee_groups: bool,
+    bound_update_form: EmployeeUpdateForm | None = None,
+    bound_update_form_employee_id: int | None = None,
+    bound_group_form: EmployeeGroupsForm | None = None,
+    bound_group_form_employee_id: int | None = None,
+) -> list[dict]:
+    group_choices = get_group_choices() if can_change_employee_groups else None
+    employee_rows = []
+    for employee in employees:
+        edit_form = None
+        if can_change_employee:
+            if (
+                bound_update_form_employee_id == employee.id
+                and bound_update_form is not None
+            ):
+                edit_form = bound_update_form
+            else:
+                edit_form = EmployeeUpdateForm(
+                    instance=employee.user,
+                    prefix=f"edit-{employee.id}",
+                )
+
+        groups_form = None
+        if can_change_employee_groups:
+            if (
+                bound_group_form_employee_id == employee.id
+                and bound_group_form is not None
+            ):
+                groups_form = bound_group_form
+            else:
+                groups_form = EmployeeGroupsForm(
+                    prefix=f"groups-{employee.id}",
+                    initial={"groups": [group.pk for group in employee.user.groups.all()]},
+                    group_choices=group_choices,
+                )
+        employee_rows.append(
+            {"employee": employee, "edit_form": edit_form, "groups_form": groups_form}
+        )
+    return employee_rows
 
 
 @login_required
 def home(request: HttpRequest) -> HttpResponse:
-    company = get_user_company(request.user)
+    company = request.company
     if company is None:
         raise PermissionDenied("User is not associated with a company.")
 
@@ -66,7 +151,7 @@ def home(request: HttpRequest) -> HttpResponse:
 
 @login_required
 def employees(request: HttpRequest) -> HttpResponse:
-    company = get_user_company(request.user)
+    company = request.company
     if company is None:
         raise PermissionDenied("User is not associated with a company.")
 
@@ -143,39 +228,16 @@ def employees(request: HttpRequest) -> HttpResponse:
                     employee.user.groups.set(bound_group_form.cleaned_data["groups"])
                     return redirect("companies:employees")
 
-    employees = list(
-        company.employees.select_related("user").order_by("user__username")
+    page, search = _employee_page(request, company)
+    employee_rows = _build_employee_rows(
+        page.object_list,
+        can_change_employee,
+        can_change_employee_groups,
+        bound_update_form,
+        bound_update_form_employee_id,
+        bound_group_form,
+        bound_group_form_employee_id,
     )
-    employee_rows = []
-    for employee in employees:
-        edit_form = None
-        if can_change_employee:
-            if (
-                bound_update_form_employee_id == employee.id
-                and bound_update_form is not None
-            ):
-                edit_form = bound_update_form
-            else:
-                edit_form = EmployeeUpdateForm(
-                    instance=employee.user,
-                    prefix=f"edit-{employee.id}",
-                )
-
-        groups_form = None
-        if can_change_employee_groups:
-            if (
-                bound_group_form_employee_id == employee.id
-                and bound_group_form is not None
-            ):
-                groups_form = bound_group_form
-            else:
-                groups_form = EmployeeGroupsForm(
-                    prefix=f"groups-{employee.id}",
-                    initial={"groups": employee.user.groups.all()},
-                )
-        employee_rows.append(
-            {"employee": employee, "edit_form": edit_form, "groups_form": groups_form}
-        )
 
     return render(
         request,
@@ -183,7 +245,9 @@ def employees(request: HttpRequest) -> HttpResponse:
         {
             "title": "Funcionários",
             "company": company,
-            "employees": employees,
+            "employees": page.object_list,
+            "employee_search": search,
+            **_employee_page_urls(request, page),
             "can_add_employee": can_add_employee,
             "can_change_employee": can_change_employee,
             "can_delete_employee": can_delete_employee,
@@ -217,7 +281,7 @@ def signup_company(request: HttpRequest) -> HttpResponse:
 @login_required
 @permission_required("companies.manage_company_features", raise_exception=True)
 def company_features(request: HttpRequest) -> HttpResponse:
-    company = get_user_company(request.user)
+    company = request.company
     if company is None:
         raise PermissionDenied("User is not associated with a company.")
 
@@ -231,6 +295,7 @@ def company_features(request: HttpRequest) -> HttpResponse:
         for grant in grants:
             grant.enabled = f"feature_{grant.id}" in request.POST
         CompanyFeature.objects.bulk_update(grants, ["enabled", "updated_at"])
+        invalidate_feature_grants([company.pk])
         return redirect("companies:company_features")
 
     return render(
@@ -242,7 +307,7 @@ def company_features(request: HttpRequest) -> HttpResponse:
 
 @login_required
 def company_configuration(request: HttpRequest) -> HttpResponse:
-    company = get_user_company(request.user)
+    company = request.company
     if company is None:
         raise PermissionDenied("User is not associated with a company.")
 
@@ -291,6 +356,7 @@ def company_configuration(request: HttpRequest) -> HttpResponse:
                 grant.enabled = f"feature_{grant.id}" in request.POST
             CompanyFeature.objects.bulk_update(
                 grants, ["enabled", "updated_at"])
+            invalidate_feature_grants([company.pk])
             return redirect("companies:company_configuration")
 
         elif action == "add_employee":
@@ -346,38 +412,16 @@ def company_configuration(request: HttpRequest) -> HttpResponse:
                 employee.user.groups.set(bound_group_form.cleaned_data["groups"])
                 return redirect("companies:company_configuration")
 
-    employees = list(
-        company.employees.select_related("user").order_by("user__username")
+    page, search = _employee_page(request, company)
+    employee_rows = _build_employee_rows(
+        page.object_list,
+        can_change_employee,
+        can_change_employee_groups,
+        bound_update_form,
+        bound_update_form_employee_id,
+        bound_group_form,
+        bound_group_form_employee_id,
     )
-    employee_rows = []
-    for employee in employees:
-        edit_form = None
-        groups_form = None
-        if can_change_employee:
-            if (
-                bound_update_form_employee_id == employee.id
-                and bound_update_form is not None
-            ):
-                edit_form = bound_update_form
-            else:
-                edit_form = EmployeeUpdateForm(
-                    instance=employee.user,
-                    prefix=f"edit-{employee.id}",
-                )
-        if can_change_employee_groups:
-            if (
-                bound_group_form_employee_id == employee.id
-                and bound_group_form is not None
-            ):
-                groups_form = bound_group_form
-            else:
-                groups_form = EmployeeGroupsForm(
-                    prefix=f"groups-{employee.id}",
-                    initial={"groups": employee.user.groups.all()},
-                )
-        employee_rows.append(
-            {"employee": employee, "edit_form": edit_form, "groups_form": groups_form}
-        )
 
     return render(
         request,
@@ -387,8 +431,10 @@ def company_configuration(request: HttpRequest) -> HttpResponse:
             "company": company,
             "company_form": company_form,
             "employee_form": employee_form,
-            "employees": employees,
+            "employees": page.object_list,
             "employee_rows": employee_rows,
+            "employee_search": search,
+            **_employee_page_urls(request, page),
             "grants": grants,
             "can_change_company": can_change_company,
             "can_manage_company_features": can_manage_company_features,
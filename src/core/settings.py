@@ -51,6 +51,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'companies.middleware.TenantMiddleware',
+    'companies.middleware.FeatureGateMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -70,6 +72,7 @@ TEMPLATES: list[dict[str, Any]] = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'companies.context_processors.enabled_sidebar_features',
+                'warehouse.context_processors.low_stock_alerts',
             ],
         },
     },
@@ -85,10 +88,48 @@ DATABASES: dict[str, dict[str, Any]] = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # The job worker writes from several threads or processes at once:
+        # IMMEDIATE transactions take the write lock up front (a deferred
+        # read-then-write transaction fails instead of waiting), WAL lets
+        # readers carry on meanwhile, and timeout is how long writers wait.
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            'init_command': 'PRAGMA journal_mode=WAL;',
+        },
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Per-process memory cache for development. Deployments running several
+# processes should point this at a shared backend (Redis, Memcached) so that
+# versioned cache invalidation is seen by every worker.
+
+CACHES: dict[str, dict[str, Any]] = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'avante-management',
     }
 }
 
 
+# Warehouse item search backend. SQLiteFTS5SearchBackend requires the SQLite
+# database above; warehouse.search.DatabaseSearchBackend works on any database.
+
+WAREHOUSE_SEARCH_BACKEND = 'warehouse.search.SQLiteFTS5SearchBackend'
+
+# Uploads waiting for a background job (python manage.py run_worker).
+
+WAREHOUSE_JOB_FILES_DIR = BASE_DIR / 'job_files'
+
+
+AUTHENTICATION_BACKENDS = [
+    'companies.backends.CachedPermissionBackend',
+]
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
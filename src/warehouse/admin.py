@@ -1,26 +1,110 @@
 from django.contrib import admin
-from .models import Item, ItemUnit, ItemType, Manufacturer
+from django.forms.models import BaseInlineFormSet
+from companies.models import Company
+from .models import (
+    InventorySummary, Item, ItemCode, ItemState, ItemUnit, ItemUnitStateCount, ItemType, Job,
+    LowStockAlert, Manufacturer, StockMovement, StockMovementReason, StockSnapshot,
+)
+from .stock import attribute_stock_change
+from .units import bulk_transition_units
+
+
+class ItemCodeInlineFormSet(BaseInlineFormSet):
+    # company is not an inline field, so model validation skips the
+    # (company, code) constraint; it is checked here against the item's
+    # company instead of failing on save.
+    def clean(self):
+        super().clean()
+        codes = {}
+        for form in self.forms:
+            if self._should_delete_form(form) or not form.has_changed():
+                continue
+            code = form.cleaned_data.get("code")
+            if not code:
+                continue
+            if code in codes:
+                form.add_error("code", "This code is repeated.")
+            codes[code] = form
+
+        own_ids = [form.instance.pk for form in self.forms if form.instance.pk]
+        taken = (
+            ItemCode.objects.filter(company_id=self.instance.company_id, code__in=codes)
+            .exclude(pk__in=own_ids)
+            .values_list("code", flat=True)
+        )
+        for code in taken:
+            codes[code].add_error("code", "This code is already used in this company.")
+
+
+class ItemCodeInline(admin.TabularInline):
+    model = ItemCode
+    formset = ItemCodeInlineFormSet
+    fields = ("code", "kind")
+    extra = 1
 
 
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
-    list_display = ("name", "company", "type", "manufacturer", "quantity", "market_value")
+    list_display = (
+        "name", "company", "type", "manufacturer", "quantity", "market_value", "reorder_level",
+    )
     list_filter = ("company", "type", "manufacturer")
-    search_fields = ("name", "model", "description")
+    search_fields = ("name", "model", "description", "codes__code")
+    inlines = [ItemCodeInline]
+
+    def save_model(self, request, obj, form, change):
+        attribute_stock_change(
+            obj,
+            request.user,
+            StockMovementReason.ADJUSTMENT if change else StockMovementReason.INITIAL,
+        )
+        super().save_model(request, obj, form, change)
+
+    def save_formset(self, request, form, formset, change):
+        # Codes are unique per company, so they take the item's company.
+        for code in formset.save(commit=False):
+            code.company_id = form.instance.company_id
+            code.save()
+        for code in formset.deleted_objects:
+            code.delete()
 
 
 @admin.register(ItemType)
 class ItemTypeAdmin(admin.ModelAdmin):
-    list_display = ("name", "company")
+    list_display = ("name", "company", "reorder_level")
     list_filter = ("company",)
     search_fields = ("name",)
 
 
+def _transition_action(state: ItemState):
+    def action(modeladmin, request, queryset):
+        updated = 0
+        for company_id in queryset.values_list("item__company", flat=True).distinct():
+            updated += bulk_transition_units(
+                Company(pk=company_id),
+                queryset.filter(item__company=company_id).values_list("id", flat=True),
+                state.value,
+            )
+        modeladmin.message_user(request, f"{updated} unit(s) marked as {state.value}.")
+
+    action.__name__ = f"mark_{state.value}"
+    action.short_description = f"Mark selected units as {state.value}"
+    return action
+
+
 @admin.register(ItemUnit)
 class ItemUnitAdmin(admin.ModelAdmin):
     list_display = ("item", "state")
     list_filter = ("state", "item__company")
     search_fields = ("item__name", "remark")
+    actions = [_transition_action(state) for state in ItemState]
+
+
+@admin.register(ItemUnitStateCount)
+class ItemUnitStateCountAdmin(admin.ModelAdmin):
+    list_display = ("item", "state", "count")
+    list_filter = ("state", "item__company")
+    readonly_fields = ("item", "state", "count")
 
 
 @admin.register(Manufacturer)
@@ -28,3 +112,46 @@ class ManufacturerAdmin(admin.ModelAdmin):
     list_display = ("name", "company")
     list_filter = ("company",)
     search_fields = ("name",)
+
+
+@admin.register(InventorySummary)
+class InventorySummaryAdmin(admin.ModelAdmin):
+    list_display = (
+        "company", "type", "manufacturer", "item_count", "total_quantity", "total_value",
+    )
+    list_filter = ("company",)
+    readonly_fields = (
+        "company", "type", "manufacturer", "item_count", "total_quantity", "total_value",
+    )
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ("item", "delta", "reason", "timestamp", "user")
+    list_filter = ("reason", "company")
+    search_fields = ("item__name",)
+    readonly_fields = ("company", "item", "delta", "reason", "timestamp", "user")
+
+
+@admin.register(LowStockAlert)
+class LowStockAlertAdmin(admin.ModelAdmin):
+    list_display = ("item", "company", "quantity", "threshold", "created_at")
+    list_filter = ("company",)
+    readonly_fields = ("company", "item", "quantity", "threshold", "created_at")
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("item", "taken_at", "quantity")
+    list_filter = ("item__company",)
+    readonly_fields = ("item", "taken_at", "quantity")
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "company", "status", "progress", "created_at", "finished_at")
+    list_filter = ("status", "kind", "company")
+    readonly_fields = (
+        "company", "kind", "payload", "status", "progress", "result", "error",
+        "worker", "created_by", "created_at", "started_at", "finished_at",
+    )
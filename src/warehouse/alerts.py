@@ -0,0 +1,75 @@
+from django.db.models import F, QuerySet
+from django.db.models.functions import Coalesce
+from companies.models import Company
+from .models import Item, ItemType, LowStockAlert
+
+
+# An item's own reorder level wins over its type's.
+REORDER_THRESHOLD = Coalesce("reorder_level", "type__reorder_level")
+
+
+def evaluate_low_stock(company_id: int, item_ids: list[int] | QuerySet) -> None:
+    # Re-checks only the given items against their threshold and updates the
+    # alert set to match, so writes never scan the rest of the inventory.
+    low = {
+        item_id: (quantity, threshold)
+        for item_id, quantity, threshold in (
+            Item.objects.filter(company_id=company_id, pk__in=item_ids)
+            .annotate(threshold=REORDER_THRESHOLD)
+            .filter(quantity__lte=F("threshold"))
+            .values_list("id", "quantity", "threshold")
+        )
+    }
+    LowStockAlert.objects.filter(
+        company_id=company_id, item_id__in=item_ids
+    ).exclude(item_id__in=low.keys()).delete()
+    if not low:
+        return
+
+    existing = {
+        alert.item_id: alert
+        for alert in LowStockAlert.objects.filter(item_id__in=low.keys())
+    }
+    changed = []
+    for item_id, (quantity, threshold) in low.items():
+        alert = existing.get(item_id)
+        if alert is None:
+            continue
+        if (alert.quantity, alert.threshold) != (quantity, threshold):
+            alert.quantity, alert.threshold = quantity, threshold
+            changed.append(alert)
+    LowStockAlert.objects.bulk_update(changed, ["quantity", "threshold"])
+    LowStockAlert.objects.bulk_create(
+        LowStockAlert(
+            company_id=company_id, item_id=item_id, quantity=quantity, threshold=threshold
+        )
+        for item_id, (quantity, threshold) in low.items()
+        if item_id not in existing
+    )
+
+
+def record_item_low_stock(item: Item, previous: dict | None) -> None:
+    if previous is not None and all(
+        previous[field] == getattr(item, field)
+        for field in ("quantity", "type_id", "reorder_level")
+    ):
+        return
+    evaluate_low_stock(item.company_id, [item.pk])
+
+
+def record_item_type_low_stock(item_type: ItemType, previous_reorder_level: int | None) -> None:
+    if item_type.reorder_level == previous_reorder_level:
+        return
+    evaluate_low_stock(
+        item_type.company_id,
+        Item.objects.filter(type=item_type, reorder_level__isnull=True).values("id"),
+    )
+
+
+def rebuild_low_stock_alerts(company: Company) -> int:
+    evaluate_low_stock(company.id, Item.objects.filter(company=company).values("id"))
+    return LowStockAlert.objects.filter(company=company).count()
+
+
+def get_low_stock_alert_count(company: Company) -> int:
+    return LowStockAlert.objects.filter(company=company).count()
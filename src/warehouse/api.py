@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from django.db.models import F, QuerySet
+from companies.models import Company
+from .models import Item, ItemType, ItemUnit, Manufacturer
+
+
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class ApiResource:
+    queryset: Callable[[Company], QuerySet]
+    fields: tuple[str, ...]
+    expressions: dict[str, Any] = field(default_factory=dict)
+
+
+API_RESOURCES = {
+    "items": ApiResource(
+        lambda company: Item.objects.filter(company=company),
+        (
+            "id", "name", "type_id", "manufacturer_id", "model", "quantity",
+            "market_value", "description",
+        ),
+        {"type_name": F("type__name"), "manufacturer_name": F("manufacturer__name")},
+    ),
+    "types": ApiResource(
+        lambda company: ItemType.objects.filter(company=company), ("id", "name")
+    ),
+    "manufacturers": ApiResource(
+        lambda company: Manufacturer.objects.filter(company=company), ("id", "name")
+    ),
+    "units": ApiResource(
+        lambda company: ItemUnit.objects.filter(item__company=company),
+        ("id", "item_id", "state", "remark"),
+    ),
+}
+
+
+def _resource_page_query(resource: ApiResource, company: Company, after: int, limit: int) -> QuerySet:
+    # Rows are read as dicts straight from values(); no model instances are
+    # built. Pages follow the primary key so deep pages cost the same as the
+    # first one.
+    return (
+        resource.queryset(company)
+        .filter(pk__gt=after)
+        .order_by("pk")
+        .values(*resource.fields, **resource.expressions)[: limit + 1]
+    )
+
+
+def _resource_page(rows: list[dict[str, Any]], limit: int) -> tuple[list[dict[str, Any]], int | None]:
+    next_after = rows[limit - 1]["id"] if len(rows) > limit else None
+    return rows[:limit], next_after
+
+
+def list_resource(
+    resource: ApiResource,
+    company: Company,
+    after: int,
+    limit: int,
+) -> tuple[list[dict[str, Any]], int | None]:
+    return _resource_page(list(_resource_page_query(resource, company, after, limit)), limit)
+
+
+async def alist_resource(
+    resource: ApiResource,
+    company: Company,
+    after: int,
+    limit: int,
+) -> tuple[list[dict[str, Any]], int | None]:
+    rows = [row async for row in _resource_page_query(resource, company, after, limit)]
+    return _resource_page(rows, limit)
@@ -7,6 +7,7 @@ class WarehouseConfig(AppConfig):
     name = "warehouse"
 
     def ready(self):
+        import warehouse.signals  # noqa: F401
         post_migrate.connect(create_warehouse_groups, sender=self)
 
 
@@ -0,0 +1,107 @@
+import hashlib
+from django.core.cache import cache
+from django.db.models import Value
+from django.db.models.functions import Upper
+from companies.models import Company
+from .choices import aget_item_choices_version, get_item_choices_version
+from .models import Item, ItemType, Manufacturer
+
+
+AUTOCOMPLETE_SOURCES = ("types", "manufacturers", "models")
+AUTOCOMPLETE_PAGE_SIZE = 20
+AUTOCOMPLETE_MAX_PAGE_SIZE = 50
+AUTOCOMPLETE_CACHE_TIMEOUT = 60
+# Upper bound for a prefix range: every string starting with the prefix sorts
+# before prefix + this character.
+PREFIX_RANGE_END = "\U0010ffff"
+
+
+def _prefix_range(field: str, prefix: str) -> dict:
+    # Case-insensitive prefix match written as a range over UPPER(field), so
+    # it seeks the (company, UPPER(field)) indexes instead of a LIKE scan.
+    # The prefix goes through the same database UPPER() as the indexed column.
+    return {
+        f"{field}_upper__gte": Upper(Value(prefix)),
+        f"{field}_upper__lt": Upper(Value(prefix + PREFIX_RANGE_END)),
+    }
+
+
+def _names_query(model, company: Company, prefix: str, limit: int, offset: int):
+    return (
+        model.objects.filter(company=company)
+        .annotate(name_upper=Upper("name"))
+        .filter(**_prefix_range("name", prefix))
+        .order_by("name_upper", "id")
+        .values_list("id", "name")[offset:offset + limit + 1]
+    )
+
+
+def _models_query(company: Company, prefix: str, limit: int, offset: int):
+    return (
+        Item.objects.filter(company=company)
+        .annotate(model_upper=Upper("model"))
+        .filter(**_prefix_range("model", prefix))
+        .order_by("model_upper")
+        .values_list("model", flat=True)
+        .distinct()[offset:offset + limit + 1]
+    )
+
+
+def _source_query(source: str, company: Company, prefix: str, limit: int, offset: int):
+    if source == "types":
+        return _names_query(ItemType, company, prefix, limit, offset)
+    if source == "manufacturers":
+        return _names_query(Manufacturer, company, prefix, limit, offset)
+    return _models_query(company, prefix, limit, offset)
+
+
+def _results(source: str, rows: list) -> list[dict]:
+    if source == "models":
+        return [{"id": model, "text": model} for model in rows]
+    return [{"id": row_id, "text": name} for row_id, name in rows]
+
+
+def _cache_key(source: str, company: Company, prefix: str, limit: int, offset: int, version: int) -> str:
+    # Type and manufacturer results follow the choice list version so new
+    # entries show up at once; item models rely on the short timeout.
+    digest = hashlib.sha256(prefix.upper().encode()).hexdigest()[:32]
+    return f"warehouse:autocomplete:{source}:{company.id}:{version}:{digest}:{limit}:{offset}"
+
+
+def autocomplete(
+    source: str,
+    company: Company,
+    prefix: str,
+    limit: int = AUTOCOMPLETE_PAGE_SIZE,
+    offset: int = 0,
+) -> tuple[list[dict], bool]:
+    if source not in AUTOCOMPLETE_SOURCES:
+        raise ValueError(f"Unknown autocomplete source: {source}")
+
+    version = get_item_choices_version(company.id) if source != "models" else 0
+    key = _cache_key(source, company, prefix, limit, offset, version)
+    results = cache.get(key)
+    if results is None:
+        results = _results(source, list(_source_query(source, company, prefix, limit, offset)))
+        cache.set(key, results, timeout=AUTOCOMPLETE_CACHE_TIMEOUT)
+    return results[:limit], len(results) > limit
+
+
+async def aautocomplete(
+    source: str,
+    company: Company,
+    prefix: str,
+    limit: int = AUTOCOMPLETE_PAGE_SIZE,
+    offset: int = 0,
+) -> tuple[list[dict], bool]:
+    if source not in AUTOCOMPLETE_SOURCES:
+        raise ValueError(f"Unknown autocomplete source: {source}")
+
+    version = await aget_item_choices_version(company.id) if source != "models" else 0
+    key = _cache_key(source, company, prefix, limit, offset, version)
+    results = await cache.aget(key)
+    if results is None:
+        rows = [row async for row in _source_query(source, company, prefix, limit, offset)]
+        results = _results(source, rows)
+        await cache.aset(key, results, timeout=AUTOCOMPLETE_CACHE_TIMEOUT)
+    return results[:limit], len(results) > limit
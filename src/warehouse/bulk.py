@@ -0,0 +1,155 @@
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Round
+from companies.models import Company
+from .alerts import evaluate_low_stock
+from .inventory import apply_contribution_change, compute_item_contributions
+from .models import (
+    Item,
+    ItemCode,
+    ItemType,
+    ItemUnit,
+    ItemUnitStateCount,
+    LowStockAlert,
+    Manufacturer,
+    StockMovement,
+    StockMovementReason,
+    StockSnapshot,
+)
+from .search import get_search_backend
+from .stock import record_stock_movements
+from .versioning import bump_inventory_version
+
+
+BULK_SET_TYPE = "set_type"
+BULK_SET_MANUFACTURER = "set_manufacturer"
+BULK_ADJUST_QUANTITY = "adjust_quantity"
+BULK_SCALE_VALUE = "scale_value"
+BULK_DELETE = "delete"
+BULK_MAX_ITEMS = 1000
+# Larger selections run as a background job instead of inside the request.
+BULK_INLINE_MAX_ITEMS = 200
+BULK_MAX_VALUE_PERCENT = Decimal("1000")
+# Largest Item.market_value (max_digits=10, decimal_places=2).
+MARKET_VALUE_MAX = Decimal("99999999.99")
+
+
+def _selected_items(company: Company, item_ids: list[int]):
+    return Item.objects.filter(company=company, pk__in=item_ids)
+
+
+def _update_items(company: Company, item_ids: list[int], **changes) -> int:
+    # One UPDATE for the whole selection. It bypasses the Item signals, so the
+    # summary is adjusted from the grouped totals before and after the write.
+    items = _selected_items(company, item_ids)
+    before = compute_item_contributions(items)
+    updated = items.update(**changes)
+    apply_contribution_change(company.id, before, compute_item_contributions(items))
+    if "quantity" in changes or "type" in changes:
+        evaluate_low_stock(company.id, item_ids)
+    bump_inventory_version(company.id)
+    return updated
+
+
+@transaction.atomic
+def bulk_set_type(company: Company, item_ids: list[int], item_type: ItemType) -> int:
+    if item_type.company_id != company.id:
+        raise ValueError("Item type belongs to another company.")
+    return _update_items(company, item_ids, type=item_type)
+
+
+@transaction.atomic
+def bulk_set_manufacturer(
+    company: Company,
+    item_ids: list[int],
+    manufacturer: Manufacturer,
+) -> int:
+    if manufacturer.company_id != company.id:
+        raise ValueError("Manufacturer belongs to another company.")
+    return _update_items(company, item_ids, manufacturer=manufacturer)
+
+
+@transaction.atomic
+def bulk_adjust_quantity(company: Company, item_ids: list[int], delta: int, user=None) -> int:
+    adjusted_ids = list(
+        _selected_items(company, item_ids).select_for_update().values_list("id", flat=True))
+    updated = _update_items(company, adjusted_ids, quantity=F("quantity") + delta)
+    record_stock_movements(
+        company,
+        [(item_id, delta) for item_id in adjusted_ids],
+        StockMovementReason.BULK,
+        user,
+    )
+    return updated
+
+
+def scaled_value_overflows(company: Company, item_ids: list[int], percent: Decimal) -> bool:
+    factor = 1 + percent / 100
+    return factor > 1 and _selected_items(company, item_ids).filter(
+        market_value__gt=MARKET_VALUE_MAX / factor
+    ).exists()
+
+
+@transaction.atomic
+def bulk_scale_value(company: Company, item_ids: list[int], percent: Decimal) -> int:
+    if scaled_value_overflows(company, item_ids, percent):
+        raise ValueError("Scaled market value exceeds the maximum allowed.")
+    factor = 1 + percent / 100
+    return _update_items(
+        company, item_ids, market_value=Round(F("market_value") * factor, 2)
+    )
+
+
+def _delete_rows(model, column: str, ids: list[int]) -> int:
+    # A single DELETE statement. QuerySet.delete() would load every row of a
+    # model with delete receivers (items, units, codes) to send its signals;
+    # callers keep the derived tables in step themselves instead.
+    table = connection.ops.quote_name(model._meta.db_table)
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE {connection.ops.quote_name(column)} IN ({placeholders})",
+            ids,
+        )
+        return cursor.rowcount
+
+
+@transaction.atomic
+def bulk_delete(company: Company, item_ids: list[int]) -> int:
+    items = _selected_items(company, item_ids)
+    deleted_ids = list(items.values_list("id", flat=True))
+    if not deleted_ids:
+        return 0
+    before = compute_item_contributions(items)
+
+    # Every dependent table is cleared with one DELETE before the items.
+    ItemUnitStateCount.objects.filter(item_id__in=deleted_ids).delete()
+    LowStockAlert.objects.filter(item_id__in=deleted_ids).delete()
+    StockSnapshot.objects.filter(item_id__in=deleted_ids).delete()
+    StockMovement.objects.filter(item_id__in=deleted_ids).delete()
+    _delete_rows(ItemUnit, "item_id", deleted_ids)
+    _delete_rows(ItemCode, "item_id", deleted_ids)
+    deleted = _delete_rows(Item, "id", deleted_ids)
+
+    apply_contribution_change(company.id, before, {})
+    get_search_backend().remove_items(deleted_ids)
+    bump_inventory_version(company.id)
+    return deleted
+
+
+def run_bulk_action(company: Company, cleaned_data: dict, user=None) -> int:
+    action = cleaned_data["bulk_action"]
+    item_ids = cleaned_data["item_ids"]
+    if action == BULK_SET_TYPE:
+        return bulk_set_type(company, item_ids, cleaned_data["type"])
+    if action == BULK_SET_MANUFACTURER:
+        return bulk_set_manufacturer(company, item_ids, cleaned_data["manufacturer"])
+    if action == BULK_ADJUST_QUANTITY:
+        return bulk_adjust_quantity(
+            company, item_ids, cleaned_data["quantity_delta"], user=user)
+    if action == BULK_SCALE_VALUE:
+        return bulk_scale_value(company, item_ids, cleaned_data["value_percent"])
+    if action == BULK_DELETE:
+        return bulk_delete(company, item_ids)
+    raise ValueError(f"Unknown bulk action: {action}")
@@ -0,0 +1,80 @@
+import time
+from dataclasses import dataclass
+from django.core.cache import cache
+from django.db import transaction
+from companies.models import Company
+from .models import ItemType, Manufacturer
+
+
+EMPTY_CHOICE = ("", "---------")
+ITEM_CHOICES_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+@dataclass(frozen=True)
+class ItemChoices:
+    types: list[tuple[int | str, str]]
+    manufacturers: list[tuple[int | str, str]]
+
+
+def _version_key(company_id: int | None) -> str:
+    return f"warehouse:item-choices:version:{company_id}"
+
+
+def get_item_choices_version(company_id: int | None) -> int:
+    key = _version_key(company_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a version key lost to eviction never
+        # resurrects choice lists cached under an older number.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_item_choices_version(company_id: int | None) -> int:
+    key = _version_key(company_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def _increment_item_choices_version(company_id: int | None) -> None:
+    try:
+        cache.incr(_version_key(company_id))
+    except ValueError:
+        cache.set(_version_key(company_id), time.time_ns(), timeout=None)
+
+
+def invalidate_item_choices(company_id: int | None) -> None:
+    # Bumped again on commit in case a request cached the pre-commit choices
+    # under the new version in between.
+    _increment_item_choices_version(company_id)
+    transaction.on_commit(lambda: _increment_item_choices_version(company_id))
+
+
+def _query_item_choices(company: Company | None) -> ItemChoices:
+    return ItemChoices(
+        types=[
+            EMPTY_CHOICE,
+            *ItemType.objects.filter(company=company).values_list("id", "name"),
+        ],
+        manufacturers=[
+            EMPTY_CHOICE,
+            *Manufacturer.objects.filter(company=company).values_list("id", "name"),
+        ],
+    )
+
+
+def load_item_choices(company: Company | None) -> ItemChoices:
+    company_id = company.id if company is not None else None
+    key = (
+        f"warehouse:item-choices:{company_id}:"
+        f"{get_item_choices_version(company_id)}"
+    )
+    choices = cache.get(key)
+    if choices is None:
+        choices = _query_item_choices(company)
+        cache.set(key, choices, timeout=ITEM_CHOICES_CACHE_TIMEOUT)
+    return choices
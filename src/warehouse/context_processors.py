@@ -0,0 +1,17 @@
+from companies.feature_cache import get_feature_grants
+from .alerts import get_low_stock_alert_count
+
+
+def low_stock_alerts(request):
+    if not getattr(request.user, "is_authenticated", False):
+        return {"low_stock_alert_count": None}
+    if not request.user.has_perm("warehouse.view_item"):
+        return {"low_stock_alert_count": None}
+
+    company = getattr(request, "company", None)
+    if company is None:
+        return {"low_stock_alert_count": None}
+    # The alerts page is gated by the warehouse feature.
+    if "warehouse" not in get_feature_grants(company.pk).codes:
+        return {"low_stock_alert_count": None}
+    return {"low_stock_alert_count": get_low_stock_alert_count(company)}
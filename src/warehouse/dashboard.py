@@ -0,0 +1,115 @@
+import asyncio
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from companies.models import Company
+from .models import InventorySummary, Item, ItemUnitStateCount
+from .units import UNIT_STATES
+
+
+DASHBOARD_RECENT_ITEMS = 10
+DASHBOARD_VALUATION_DAYS = 365
+
+
+def _breakdown_row(label: str, summary: InventorySummary) -> dict[str, Any]:
+    return {
+        "label": label,
+        "quantity": summary.total_quantity,
+        "value": summary.total_value,
+    }
+
+
+def get_dashboard_data(company: Company) -> dict[str, Any]:
+    summaries = InventorySummary.objects.filter(company=company).select_related(
+        "type", "manufacturer"
+    )
+
+    totals: InventorySummary | None = None
+    by_type: list[dict[str, Any]] = []
+    by_manufacturer: list[dict[str, Any]] = []
+    for summary in summaries:
+        if summary.type_id is None and summary.manufacturer_id is None:
+            totals = summary
+        elif summary.item_count <= 0:
+            continue
+        elif summary.type_id is not None:
+            by_type.append(_breakdown_row(summary.type.name, summary))
+        else:
+            by_manufacturer.append(_breakdown_row(summary.manufacturer.name, summary))
+
+    recent_items = (
+        Item.objects.filter(company=company)
+        .select_related("type", "manufacturer")
+        .order_by("-id")[:DASHBOARD_RECENT_ITEMS]
+    )
+
+    return {
+        "item_count": totals.item_count if totals else 0,
+        "total_quantity": totals.total_quantity if totals else 0,
+        "total_value": totals.total_value if totals else Decimal("0"),
+        "charts": {
+            "by_type": sorted(by_type, key=lambda row: row["label"]),
+            "by_manufacturer": sorted(by_manufacturer, key=lambda row: row["label"]),
+        },
+        "recent_items": list(recent_items),
+        "valuation_start": timezone.localdate() - timedelta(days=DASHBOARD_VALUATION_DAYS),
+    }
+
+
+async def _aget_totals(company: Company) -> InventorySummary | None:
+    try:
+        return await InventorySummary.objects.aget(
+            company=company, type__isnull=True, manufacturer__isnull=True
+        )
+    except InventorySummary.DoesNotExist:
+        return None
+
+
+async def _aget_breakdown(company: Company, dimension: str) -> list[dict[str, Any]]:
+    summaries = (
+        InventorySummary.objects.filter(company=company, item_count__gt=0)
+        .filter(**{f"{dimension}__isnull": False})
+        .select_related(dimension)
+    )
+    rows = [
+        _breakdown_row(getattr(summary, dimension).name, summary)
+        async for summary in summaries
+    ]
+    return sorted(rows, key=lambda row: row["label"])
+
+
+async def _aget_recent_items(company: Company) -> list[Item]:
+    recent_items = (
+        Item.objects.filter(company=company)
+        .select_related("type", "manufacturer")
+        .order_by("-id")[:DASHBOARD_RECENT_ITEMS]
+    )
+    return [item async for item in recent_items]
+
+
+async def aget_dashboard_data(company: Company) -> dict[str, Any]:
+    # The queries are independent, so they are issued together instead of
+    # one after another.
+    totals, by_type, by_manufacturer, recent_items, units = await asyncio.gather(
+        _aget_totals(company),
+        _aget_breakdown(company, "type"),
+        _aget_breakdown(company, "manufacturer"),
+        _aget_recent_items(company),
+        ItemUnitStateCount.objects.filter(item__company=company).aaggregate(**{
+            state: Coalesce(Sum("count", filter=Q(state=state)), 0)
+            for state in UNIT_STATES
+        }),
+    )
+
+    return {
+        "item_count": totals.item_count if totals else 0,
+        "total_quantity": totals.total_quantity if totals else 0,
+        "total_value": totals.total_value if totals else Decimal("0"),
+        "units": units,
+        "charts": {"by_type": by_type, "by_manufacturer": by_manufacturer},
+        "recent_items": recent_items,
+        "valuation_start": timezone.localdate() - timedelta(days=DASHBOARD_VALUATION_DAYS),
+    }
@@ -0,0 +1,30 @@
+import csv
+from typing import Iterator
+from django.db.models import QuerySet
+from .importers import IMPORT_COLUMNS
+
+
+EXPORT_CHUNK_SIZE = 2000
+# Same columns as the importer, so an export can be edited and re-imported.
+EXPORT_COLUMNS = IMPORT_COLUMNS
+EXPORT_FIELDS = (
+    "id", "name", "type__name", "manufacturer__name", "model", "quantity",
+    "market_value", "description",
+)
+
+
+class Echo:
+    # csv.writer target that hands each formatted line back instead of buffering it.
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_items_csv(
+    queryset: QuerySet,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    rows = queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield writer.writerow(row)
@@ -1,18 +1,312 @@
+from datetime import timedelta
+from decimal import Decimal
 from django import forms
-from .models import Item
+from django.core.exceptions import ValidationError
+from django.http import QueryDict
+from django.db.models import QuerySet
+from django.urls import reverse
+from django.utils import timezone
+from .bulk import (
+    BULK_ADJUST_QUANTITY,
+    BULK_DELETE,
+    BULK_MAX_ITEMS,
+    BULK_MAX_VALUE_PERCENT,
+    BULK_SCALE_VALUE,
+    BULK_SET_MANUFACTURER,
+    BULK_SET_TYPE,
+    scaled_value_overflows,
+)
+from .choices import ItemChoices, load_item_choices
+from .valuation import VALUATION_MAX_DAYS
+from .models import Item, ItemType, Manufacturer
 from companies.models import Company
 
 
+ITEM_AUTOCOMPLETE_THRESHOLD = 200
+ITEM_SORT_CHOICES = [
+    ("name", "Nome (A-Z)"),
+    ("-name", "Nome (Z-A)"),
+    ("quantity", "Quantidade (menor primeiro)"),
+    ("-quantity", "Quantidade (maior primeiro)"),
+    ("market_value", "Valor de mercado (menor primeiro)"),
+    ("-market_value", "Valor de mercado (maior primeiro)"),
+]
+
+
+def _apply_item_choices(
+    form: forms.BaseForm,
+    company: Company | None,
+    choices: ItemChoices | None,
+) -> None:
+    # Rendering from the cached per-company list avoids one queryset
+    # evaluation per field and per form; the scoped queryset is still used to
+    # validate submissions.
+    if choices is None:
+        choices = load_item_choices(company)
+    form.fields["type"].choices = choices.types
+    form.fields["manufacturer"].choices = choices.manufacturers
+
+
+def _use_autocomplete(form: forms.BaseForm) -> None:
+    # Past the threshold a select only carries its current option and the
+    # rest is searched through the autocomplete endpoints; the templates expose
+    # field.autocomplete_url to autocomplete.js.
+    for field_name, source in (("type", "types"), ("manufacturer", "manufacturers")):
+        field = form.fields[field_name]
+        if len(field.choices) <= ITEM_AUTOCOMPLETE_THRESHOLD:
+            continue
+        selected = str(form[field_name].value() or "")
+        field.choices = [
+            (value, label) for value, label in field.choices
+            if value == "" or str(value) == selected
+        ]
+        field.autocomplete_url = reverse("warehouse:autocomplete", args=[source])
+    form.fields["model"].autocomplete_url = reverse("warehouse:autocomplete", args=["models"])
+
+
 class ItemForm(forms.ModelForm):  # type: ignore
-    def __init__(self, *args, company: Company | None = None, **kwargs):
+    def __init__(
+        self,
+        *args,
+        company: Company | None = None,
+        choices: ItemChoices | None = None,
+        autocomplete: bool = False,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.company = company
         self.fields["type"].queryset = self.fields["type"].queryset.filter(
             company=company)
         self.fields["manufacturer"].queryset = self.fields["manufacturer"].queryset.filter(
             company=company)
+        _apply_item_choices(self, company, choices)
+        if autocomplete:
+            _use_autocomplete(self)
 
     class Meta:
         model = Item
         fields = ['name', 'type', 'manufacturer', 'model',
-                  'quantity', 'market_value', 'description']
+                  'quantity', 'market_value', 'description', 'reorder_level']
+
+
+class ItemFilterForm(forms.Form):
+    type = forms.ModelChoiceField(
+        queryset=ItemType.objects.none(), required=False, label="Tipo")
+    manufacturer = forms.ModelChoiceField(
+        queryset=Manufacturer.objects.none(), required=False, label="Fabricante")
+    min_quantity = forms.IntegerField(required=False, label="Quantidade mínima")
+    max_quantity = forms.IntegerField(required=False, label="Quantidade máxima")
+    sort = forms.ChoiceField(
+        choices=ITEM_SORT_CHOICES, required=False, label="Ordenar por")
+
+    def __init__(
+        self,
+        *args,
+        company: Company | None = None,
+        choices: ItemChoices | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.fields["type"].queryset = ItemType.objects.filter(company=company)
+        self.fields["manufacturer"].queryset = Manufacturer.objects.filter(
+            company=company)
+        _apply_item_choices(self, company, choices)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        min_quantity = cleaned_data.get("min_quantity")
+        max_quantity = cleaned_data.get("max_quantity")
+        if (
+            min_quantity is not None
+            and max_quantity is not None
+            and min_quantity > max_quantity
+        ):
+            raise ValidationError(
+                "Minimum quantity must not be greater than maximum quantity.")
+        return cleaned_data
+
+    def get_ordering(self) -> str:
+        return self.cleaned_data.get("sort") or "name"
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        if self.cleaned_data.get("type") is not None:
+            queryset = queryset.filter(type=self.cleaned_data["type"])
+        if self.cleaned_data.get("manufacturer") is not None:
+            queryset = queryset.filter(manufacturer=self.cleaned_data["manufacturer"])
+        if self.cleaned_data.get("min_quantity") is not None:
+            queryset = queryset.filter(quantity__gte=self.cleaned_data["min_quantity"])
+        if self.cleaned_data.get("max_quantity") is not None:
+            queryset = queryset.filter(quantity__lte=self.cleaned_data["max_quantity"])
+        return queryset
+
+
+class ItemImportForm(forms.ModelForm):  # type: ignore
+    # Validates one imported row with the same model rules as ItemForm. Type
+    # and manufacturer arrive as names and are resolved per chunk by the
+    # importer, and an optional id turns the row into an update.
+    id = forms.IntegerField(required=False, min_value=1)
+    type_name = forms.CharField(
+        max_length=ItemType._meta.get_field("name").max_length, label="Tipo")
+    manufacturer_name = forms.CharField(
+        max_length=Manufacturer._meta.get_field("name").max_length, label="Fabricante")
+
+    class Meta:
+        model = Item
+        fields = ['name', 'model', 'quantity', 'market_value', 'description']
+
+    def clean_type_name(self):
+        return self.cleaned_data["type_name"].strip()
+
+    def clean_manufacturer_name(self):
+        return self.cleaned_data["manufacturer_name"].strip()
+
+
+class ItemImportUploadForm(forms.Form):
+    file = forms.FileField(label="Arquivo")
+    file_format = forms.ChoiceField(
+        choices=[("csv", "CSV"), ("jsonl", "JSON Lines")],
+        initial="csv",
+        label="Formato",
+    )
+
+
+class ItemIdListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value) -> list[int]:
+        if not value:
+            return []
+        try:
+            return sorted({int(item_id) for item_id in value})
+        except (TypeError, ValueError):
+            raise ValidationError("Invalid item selection.")
+
+
+class ItemBulkActionForm(forms.Form):
+    bulk_action = forms.ChoiceField(
+        choices=[
+            (BULK_SET_TYPE, "Alterar tipo"),
+            (BULK_SET_MANUFACTURER, "Alterar fabricante"),
+            (BULK_ADJUST_QUANTITY, "Ajustar quantidade"),
+            (BULK_SCALE_VALUE, "Reajustar valor (%)"),
+            (BULK_DELETE, "Remover"),
+        ],
+        label="Ação em massa",
+    )
+    item_ids = ItemIdListField(required=False)
+    # Applies the action to every item matching the list filters in
+    # filter_query, not only the checked rows of the current page.
+    select_all = forms.BooleanField(required=False, label="Todos os itens filtrados")
+    filter_query = forms.CharField(required=False, widget=forms.HiddenInput)
+    type = forms.ModelChoiceField(
+        queryset=ItemType.objects.none(), required=False, label="Tipo")
+    manufacturer = forms.ModelChoiceField(
+        queryset=Manufacturer.objects.none(), required=False, label="Fabricante")
+    quantity_delta = forms.IntegerField(required=False, label="Quantidade (+/-)")
+    value_percent = forms.DecimalField(
+        required=False,
+        max_digits=6,
+        decimal_places=2,
+        min_value=Decimal("-99.99"),
+        max_value=BULK_MAX_VALUE_PERCENT,
+        label="Percentual",
+    )
+
+    # Rendered by hand in the template instead of as action parameters.
+    unlisted_fields = ("bulk_action", "item_ids", "select_all", "filter_query")
+
+    # Which parameter each action needs.
+    required_fields = {
+        BULK_SET_TYPE: "type",
+        BULK_SET_MANUFACTURER: "manufacturer",
+        BULK_ADJUST_QUANTITY: "quantity_delta",
+        BULK_SCALE_VALUE: "value_percent",
+    }
+
+    def __init__(
+        self,
+        *args,
+        company: Company | None = None,
+        choices: ItemChoices | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.company = company
+        self.choices = choices
+        self.fields["type"].queryset = ItemType.objects.filter(company=company)
+        self.fields["manufacturer"].queryset = Manufacturer.objects.filter(
+            company=company)
+        _apply_item_choices(self, company, choices)
+
+    def clean_item_ids(self):
+        item_ids = self.cleaned_data["item_ids"]
+        if len(item_ids) > BULK_MAX_ITEMS:
+            raise ValidationError(
+                f"Select at most {BULK_MAX_ITEMS} items per bulk action.")
+        return item_ids
+
+    def _filtered_item_ids(self) -> list[int] | None:
+        filter_form = ItemFilterForm(
+            QueryDict(self.cleaned_data.get("filter_query") or ""),
+            company=self.company,
+            choices=self.choices,
+        )
+        if not filter_form.is_valid():
+            return None
+        items = filter_form.filter_queryset(Item.objects.filter(company=self.company))
+        return list(items.order_by("id").values_list("id", flat=True)[: BULK_MAX_ITEMS + 1])
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get("select_all"):
+            item_ids = self._filtered_item_ids()
+            if item_ids is None:
+                self.add_error("filter_query", "Invalid list filters.")
+            elif len(item_ids) > BULK_MAX_ITEMS:
+                self.add_error(
+                    "item_ids", f"Select at most {BULK_MAX_ITEMS} items per bulk action.")
+            else:
+                cleaned_data["item_ids"] = item_ids
+        if not cleaned_data.get("item_ids") and "item_ids" not in self.errors:
+            self.add_error("item_ids", "Select at least one item.")
+        if (
+            cleaned_data.get("bulk_action") == BULK_SCALE_VALUE
+            and cleaned_data.get("value_percent") is not None
+            and cleaned_data.get("item_ids")
+            and scaled_value_overflows(
+                self.company, cleaned_data["item_ids"], cleaned_data["value_percent"])
+        ):
+            self.add_error(
+                "value_percent", "The new value of some items would exceed the maximum.")
+        field_name = self.required_fields.get(cleaned_data.get("bulk_action"))
+        if field_name is not None and cleaned_data.get(field_name) is None:
+            self.add_error(field_name, "This field is required for the selected action.")
+        return cleaned_data
+
+
+class ValuationSeriesForm(forms.Form):
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+    granularity = forms.ChoiceField(
+        choices=[("day", "Dia"), ("week", "Semana"), ("month", "Mês")], required=False)
+    dimension = forms.ChoiceField(
+        choices=[("total", "Total"), ("type", "Tipo"), ("manufacturer", "Fabricante")],
+        required=False,
+    )
+
+    default_days = 90
+
+    def clean(self):
+        cleaned_data = super().clean()
+        end = cleaned_data.get("end") or timezone.localdate()
+        start = cleaned_data.get("start") or end - timedelta(days=self.default_days)
+        if start > end:
+            raise ValidationError("Start date must not be after end date.")
+        if (end - start).days > VALUATION_MAX_DAYS:
+            raise ValidationError(
+                f"The date range must not exceed {VALUATION_MAX_DAYS} days.")
+        cleaned_data["start"] = start
+        cleaned_data["end"] = end
+        cleaned_data["granularity"] = cleaned_data.get("granularity") or "day"
+        cleaned_data["dimension"] = cleaned_data.get("dimension") or "total"
+        return cleaned_data
@@ -0,0 +1,47 @@
+import hashlib
+from typing import Any, Callable, Iterable
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import SafeString, mark_safe
+from companies.models import Company
+from .versioning import get_inventory_version
+
+
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _permission_key(user) -> str:
+    permissions = ",".join(sorted(user.get_all_permissions()))
+    return hashlib.sha256(permissions.encode()).hexdigest()[:16]
+
+
+def fragment_cache_key(
+    name: str, company: Company, user, vary_on: Iterable[Any] = ()
+) -> str:
+    parts = [
+        name,
+        str(company.id),
+        str(get_inventory_version(company.id)),
+        _permission_key(user),
+        *(str(value) for value in vary_on),
+    ]
+    return "warehouse:fragment:" + ":".join(parts)
+
+
+def cached_fragment(
+    name: str,
+    company: Company,
+    user,
+    template_name: str,
+    get_context: Callable[[], dict[str, Any]],
+    vary_on: Iterable[Any] = (),
+) -> SafeString:
+    # Fragments are rendered without the request, so they must not depend on
+    # csrf tokens or context processors. Any inventory write bumps the version
+    # and with it the key; stale entries simply age out.
+    key = fragment_cache_key(name, company, user, vary_on)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(template_name, get_context())
+        cache.set(key, html, timeout=FRAGMENT_CACHE_TIMEOUT)
+    return mark_safe(html)
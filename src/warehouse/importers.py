@@ -0,0 +1,226 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator
+from django.db import transaction
+from companies.models import Company
+from .alerts import evaluate_low_stock
+from .choices import invalidate_item_choices
+from .forms import ItemImportForm
+from .inventory import apply_contribution_change, compute_item_contributions
+from .models import Item, ItemType, Manufacturer, StockMovementReason
+from .search import get_search_backend
+from .stock import record_stock_movements
+from .versioning import bump_inventory_version
+
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_MAX_REPORTED_ERRORS = 1000
+IMPORT_FORMATS = ("csv", "jsonl")
+IMPORT_COLUMNS = (
+    "id", "name", "type", "manufacturer", "model", "quantity", "market_value", "description",
+)
+# Import columns whose form field has a different name.
+FORM_FIELD_BY_COLUMN = {"type": "type_name", "manufacturer": "manufacturer_name"}
+COLUMN_BY_FORM_FIELD = {value: key for key, value in FORM_FIELD_BY_COLUMN.items()}
+ITEM_UPDATE_FIELDS = [
+    "name", "type", "manufacturer", "model", "quantity", "market_value", "description",
+]
+
+RawRow = tuple[int, dict[str, Any] | None, str | None]
+
+
+@dataclass
+class ImportRowError:
+    line: int
+    errors: dict[str, list[str]]
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    updated: int = 0
+    error_count: int = 0
+    errors: list[ImportRowError] = field(default_factory=list)
+
+    def add_error(self, line: int, errors: dict[str, list[str]]) -> None:
+        self.error_count += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(line, errors))
+
+
+def iter_csv_rows(lines: Iterable[str]) -> Iterator[RawRow]:
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, row, None
+
+
+def iter_jsonl_rows(lines: Iterable[str]) -> Iterator[RawRow]:
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield line_number, None, f"Invalid JSON: {error.msg}."
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Each line must be a JSON object."
+            continue
+        yield line_number, row, None
+
+
+def _chunks(rows: Iterator[RawRow], size: int) -> Iterator[list[RawRow]]:
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _resolve_names(model, company: Company, names: set[str]) -> tuple[dict[str, int], bool]:
+    resolved = dict(
+        model.objects.filter(company=company, name__in=names).values_list("name", "id")
+    )
+    missing = names - resolved.keys()
+    if missing:
+        model.objects.bulk_create(
+            [model(company=company, name=name) for name in missing],
+            ignore_conflicts=True,
+        )
+        resolved.update(
+            model.objects.filter(company=company, name__in=missing).values_list("name", "id")
+        )
+    return resolved, bool(missing)
+
+
+class ItemImporter:
+    def __init__(
+        self,
+        company: Company,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        allow_updates: bool = True,
+        user=None,
+    ):
+        self.company = company
+        self.batch_size = batch_size
+        self.allow_updates = allow_updates
+        self.user = user
+
+    def run(
+        self,
+        lines: Iterable[str],
+        file_format: str = "csv",
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> ImportReport:
+        if file_format not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {file_format}")
+        rows = iter_csv_rows(lines) if file_format == "csv" else iter_jsonl_rows(lines)
+
+        report = ImportReport()
+        for chunk in _chunks(rows, self.batch_size):
+            self._import_chunk(chunk, report)
+            if on_chunk is not None:
+                # Reports the last line read, for progress tracking.
+                on_chunk(chunk[-1][0])
+        return report
+
+    @transaction.atomic
+    def _import_chunk(self, chunk: list[RawRow], report: ImportReport) -> None:
+        # Each chunk commits with its own summary, choice list and version
+        # updates, so a failure later in the file leaves nothing out of date.
+        valid_rows: list[tuple[int, dict[str, Any]]] = []
+        for line, row, parse_error in chunk:
+            if parse_error is not None:
+                report.add_error(line, {"__all__": [parse_error]})
+                continue
+            form = ItemImportForm(data={
+                FORM_FIELD_BY_COLUMN.get(column, column): row.get(column)
+                for column in IMPORT_COLUMNS
+            })
+            if not form.is_valid():
+                report.add_error(line, {
+                    COLUMN_BY_FORM_FIELD.get(key, key): list(value)
+                    for key, value in form.errors.items()
+                })
+                continue
+            if form.cleaned_data["id"] is not None and not self.allow_updates:
+                report.add_error(line, {"id": ["You do not have permission to change items."]})
+                continue
+            valid_rows.append((line, form.cleaned_data))
+        if not valid_rows:
+            return
+
+        type_ids, types_created = _resolve_names(
+            ItemType, self.company, {data["type_name"] for _, data in valid_rows}
+        )
+        manufacturer_ids, manufacturers_created = _resolve_names(
+            Manufacturer, self.company, {data["manufacturer_name"] for _, data in valid_rows}
+        )
+        existing = Item.objects.filter(
+            company=self.company,
+            pk__in=[data["id"] for _, data in valid_rows if data["id"] is not None],
+        ).in_bulk()
+
+        to_create: list[Item] = []
+        to_update: dict[int, Item] = {}
+        previous_quantities: dict[int, int] = {}
+        for line, data in valid_rows:
+            values = {
+                "name": data["name"],
+                "type_id": type_ids[data["type_name"]],
+                "manufacturer_id": manufacturer_ids[data["manufacturer_name"]],
+                "model": data["model"],
+                "quantity": data["quantity"],
+                "market_value": data["market_value"],
+                "description": data["description"],
+            }
+            if data["id"] is None:
+                to_create.append(Item(company=self.company, **values))
+                continue
+            item = to_update.get(data["id"]) or existing.get(data["id"])
+            if item is None:
+                report.add_error(line, {"id": ["Item not found."]})
+                continue
+            previous_quantities.setdefault(item.id, item.quantity)
+            for attribute, value in values.items():
+                setattr(item, attribute, value)
+            to_update[item.id] = item
+
+        # Bulk writes skip the Item signals that maintain the summary.
+        before = compute_item_contributions(
+            Item.objects.filter(company=self.company, pk__in=list(to_update))
+        )
+        created = Item.objects.bulk_create(to_create, batch_size=self.batch_size)
+        Item.objects.bulk_update(
+            list(to_update.values()), ITEM_UPDATE_FIELDS, batch_size=self.batch_size
+        )
+        apply_contribution_change(
+            self.company.id,
+            before,
+            compute_item_contributions(
+                Item.objects.filter(
+                    company=self.company,
+                    pk__in=[*(item.id for item in created), *to_update],
+                )
+            ),
+        )
+        get_search_backend().index_items([*created, *to_update.values()])
+        evaluate_low_stock(
+            self.company.id, [item.id for item in [*created, *to_update.values()]]
+        )
+        record_stock_movements(
+            self.company,
+            [(item.id, item.quantity) for item in created]
+            + [
+                (item.id, item.quantity - previous_quantities[item.id])
+                for item in to_update.values()
+            ],
+            StockMovementReason.IMPORT,
+            self.user,
+        )
+        if types_created or manufacturers_created:
+            invalidate_item_choices(self.company.id)
+        if created or to_update or types_created or manufacturers_created:
+            bump_inventory_version(self.company.id)
+
+        report.created += len(created)
+        report.updated += len(to_update)
@@ -0,0 +1,294 @@
+from decimal import Decimal
+from typing import NamedTuple
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, QuerySet, Sum
+from companies.models import Company
+from .models import InventorySummary, Item
+from .versioning import bump_inventory_version
+
+
+ITEM_TOTAL_VALUE = ExpressionWrapper(
+    F("quantity") * F("market_value"),
+    output_field=DecimalField(max_digits=20, decimal_places=2),
+)
+
+SummaryKey = tuple[int | None, int | None]
+
+
+class InventoryTotals(NamedTuple):
+    item_count: int
+    total_quantity: int
+    total_value: Decimal
+
+
+class InventoryDrift(NamedTuple):
+    company_id: int
+    type_id: int | None
+    manufacturer_id: int | None
+    expected: InventoryTotals
+    actual: InventoryTotals
+
+
+EMPTY_TOTALS = InventoryTotals(0, 0, Decimal("0"))
+
+
+def _summary_keys(type_id: int | None, manufacturer_id: int | None) -> list[SummaryKey]:
+    return [(None, None), (type_id, None), (None, manufacturer_id)]
+
+
+def _apply_summary_delta(company_id: int, key: SummaryKey, delta: InventoryTotals) -> None:
+    type_id, manufacturer_id = key
+    summaries = InventorySummary.objects.filter(
+        company_id=company_id,
+        type_id=type_id,
+        manufacturer_id=manufacturer_id,
+    )
+    changes = {
+        "item_count": F("item_count") + delta.item_count,
+        "total_quantity": F("total_quantity") + delta.total_quantity,
+        "total_value": F("total_value") + delta.total_value,
+    }
+    if summaries.update(**changes) or delta.item_count <= 0:
+        # A missing row is only created for a new contribution. Removals from
+        # a missing row (e.g. its type is being cascade-deleted) are dropped.
+        return
+
+    try:
+        with transaction.atomic():
+            InventorySummary.objects.create(
+                company_id=company_id,
+                type_id=type_id,
+                manufacturer_id=manufacturer_id,
+                item_count=delta.item_count,
+                total_quantity=delta.total_quantity,
+                total_value=delta.total_value,
+            )
+    except IntegrityError:
+        summaries.update(**changes)
+
+
+def apply_inventory_delta(
+    company_id: int,
+    type_id: int,
+    manufacturer_id: int,
+    delta: InventoryTotals,
+) -> None:
+    if delta == EMPTY_TOTALS:
+        return
+    for key in _summary_keys(type_id, manufacturer_id):
+        _apply_summary_delta(company_id, key, delta)
+
+
+def item_contribution(quantity: int, market_value: Decimal | str) -> InventoryTotals:
+    return InventoryTotals(1, quantity, quantity * Decimal(str(market_value)))
+
+
+def record_item_saved(item: Item, previous: dict | None) -> None:
+    current = item_contribution(item.quantity, item.market_value)
+    if previous is None:
+        apply_inventory_delta(item.company_id, item.type_id, item.manufacturer_id, current)
+        return
+
+    before = item_contribution(previous["quantity"], previous["market_value"])
+    same_dimensions = (
+        previous["company_id"] == item.company_id
+        and previous["type_id"] == item.type_id
+        and previous["manufacturer_id"] == item.manufacturer_id
+    )
+    if same_dimensions:
+        apply_inventory_delta(
+            item.company_id,
+            item.type_id,
+            item.manufacturer_id,
+            InventoryTotals(
+                0,
+                current.total_quantity - before.total_quantity,
+                current.total_value - before.total_value,
+            ),
+        )
+        return
+
+    apply_inventory_delta(
+        previous["company_id"],
+        previous["type_id"],
+        previous["manufacturer_id"],
+        InventoryTotals(-1, -before.total_quantity, -before.total_value),
+    )
+    apply_inventory_delta(item.company_id, item.type_id, item.manufacturer_id, current)
+
+
+def record_item_deleted(item: Item) -> None:
+    removed = item_contribution(item.quantity, item.market_value)
+    apply_inventory_delta(
+        item.company_id,
+        item.type_id,
+        item.manufacturer_id,
+        InventoryTotals(-1, -removed.total_quantity, -removed.total_value),
+    )
+
+
+def _summary_aggregates() -> dict:
+    return {
+        "item_count": Count("id"),
+        "total_quantity": Sum("quantity"),
+        "total_value": Sum(ITEM_TOTAL_VALUE),
+    }
+
+
+def _to_totals(row: dict) -> InventoryTotals:
+    return InventoryTotals(
+        row["item_count"],
+        row["total_quantity"] or 0,
+        row["total_value"] or Decimal("0"),
+    )
+
+
+def compute_item_contributions(items: QuerySet) -> dict[tuple[int, int], InventoryTotals]:
+    # Totals of a set of items per (type_id, manufacturer_id), so bulk writes
+    # can adjust the summary from two grouped reads instead of per-row signals.
+    return {
+        (row["type_id"], row["manufacturer_id"]): _to_totals(row)
+        for row in items.values("type_id", "manufacturer_id")
+        .annotate(**_summary_aggregates())
+        .order_by()
+    }
+
+
+def apply_contribution_change(
+    company_id: int,
+    before: dict[tuple[int, int], InventoryTotals],
+    after: dict[tuple[int, int], InventoryTotals],
+) -> None:
+    deltas: dict[SummaryKey, InventoryTotals] = {}
+
+    def add(contributions: dict[tuple[int, int], InventoryTotals], sign: int) -> None:
+        for (type_id, manufacturer_id), totals in contributions.items():
+            for key in _summary_keys(type_id, manufacturer_id):
+                current = deltas.get(key, EMPTY_TOTALS)
+                deltas[key] = InventoryTotals(
+                    current.item_count + sign * totals.item_count,
+                    current.total_quantity + sign * totals.total_quantity,
+                    current.total_value + sign * totals.total_value,
+                )
+
+    add(before, -1)
+    add(after, 1)
+    _apply_summary_deltas(
+        company_id, {key: delta for key, delta in deltas.items() if delta != EMPTY_TOTALS}
+    )
+
+
+@transaction.atomic
+def _apply_summary_deltas(company_id: int, deltas: dict[SummaryKey, InventoryTotals]) -> None:
+    # Applies a batch of deltas in a fixed number of queries: one locked read,
+    # one bulk update and one bulk insert, however many types and
+    # manufacturers the batch touches.
+    if not deltas:
+        return
+    type_ids = [type_id for type_id, _ in deltas if type_id is not None]
+    manufacturer_ids = [manufacturer_id for _, manufacturer_id in deltas if manufacturer_id is not None]
+    existing = {
+        (summary.type_id, summary.manufacturer_id): summary
+        for summary in InventorySummary.objects.select_for_update().filter(
+            Q(type_id__isnull=True, manufacturer_id__isnull=True)
+            | Q(type_id__in=type_ids, manufacturer_id__isnull=True)
+            | Q(type_id__isnull=True, manufacturer_id__in=manufacturer_ids),
+            company_id=company_id,
+        )
+    }
+
+    changed = []
+    missing = {}
+    for key, delta in deltas.items():
+        summary = existing.get(key)
+        if summary is None:
+            # Same rule as _apply_summary_delta: removals from a missing row
+            # are dropped.
+            if delta.item_count > 0:
+                missing[key] = delta
+            continue
+        summary.item_count += delta.item_count
+        summary.total_quantity += delta.total_quantity
+        summary.total_value += delta.total_value
+        changed.append(summary)
+    InventorySummary.objects.bulk_update(
+        changed, ["item_count", "total_quantity", "total_value"]
+    )
+    if not missing:
+        return
+
+    try:
+        with transaction.atomic():
+            InventorySummary.objects.bulk_create(
+                InventorySummary(
+                    company_id=company_id,
+                    type_id=type_id,
+                    manufacturer_id=manufacturer_id,
+                    item_count=delta.item_count,
+                    total_quantity=delta.total_quantity,
+                    total_value=delta.total_value,
+                )
+                for (type_id, manufacturer_id), delta in missing.items()
+            )
+    except IntegrityError:
+        # Another writer created some of the rows first.
+        for key, delta in missing.items():
+            _apply_summary_delta(company_id, key, delta)
+
+
+def compute_inventory_summary(company: Company) -> dict[SummaryKey, InventoryTotals]:
+    items = Item.objects.filter(company=company)
+    aggregates = _summary_aggregates()
+
+    expected = {(None, None): _to_totals(items.aggregate(**aggregates))}
+    for row in items.values("type_id").annotate(**aggregates).order_by():
+        expected[(row["type_id"], None)] = _to_totals(row)
+    for row in items.values("manufacturer_id").annotate(**aggregates).order_by():
+        expected[(None, row["manufacturer_id"])] = _to_totals(row)
+    return expected
+
+
+@transaction.atomic
+def rebuild_inventory_summary(company: Company, dry_run: bool = False) -> list[InventoryDrift]:
+    expected = compute_inventory_summary(company)
+    current = {
+        (summary.type_id, summary.manufacturer_id): InventoryTotals(
+            summary.item_count,
+            summary.total_quantity,
+            summary.total_value,
+        )
+        for summary in InventorySummary.objects.select_for_update().filter(company=company)
+    }
+
+    drift = [
+        InventoryDrift(
+            company.id,
+            type_id,
+            manufacturer_id,
+            expected.get((type_id, manufacturer_id), EMPTY_TOTALS),
+            current.get((type_id, manufacturer_id), EMPTY_TOTALS),
+        )
+        for type_id, manufacturer_id in sorted(
+            expected.keys() | current.keys(),
+            key=lambda key: (key[0] or 0, key[1] or 0),
+        )
+        if expected.get((type_id, manufacturer_id), EMPTY_TOTALS)
+        != current.get((type_id, manufacturer_id), EMPTY_TOTALS)
+    ]
+
+    if not dry_run:
+        InventorySummary.objects.filter(company=company).delete()
+        InventorySummary.objects.bulk_create(
+            InventorySummary(
+                company=company,
+                type_id=type_id,
+                manufacturer_id=manufacturer_id,
+                item_count=totals.item_count,
+                total_quantity=totals.total_quantity,
+                total_value=totals.total_value,
+            )
+            for (type_id, manufacturer_id), totals in expected.items()
+        )
+        if drift:
+            bump_inventory_version(company.id)
+    return drift
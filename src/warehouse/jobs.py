@@ -0,0 +1,246 @@
+import dataclasses
+import logging
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+from companies.models import Company
+from .bulk import BULK_SET_MANUFACTURER, BULK_SET_TYPE, run_bulk_action
+from .importers import ItemImporter
+from .models import ItemType, Job, JobStatus, Manufacturer
+from .stock import take_stock_snapshots
+from .valuation import record_valuation_buckets
+
+
+logger = logging.getLogger(__name__)
+
+# Workers touch their running jobs every JOB_HEARTBEAT_INTERVAL seconds; a job
+# not touched for JOB_STALE_AFTER belongs to a worker that died. Kinds
+# registered as retryable are queued again, up to JOB_MAX_ATTEMPTS claims;
+# the others may have committed part of their work and are failed.
+JOB_HEARTBEAT_INTERVAL = 30
+JOB_STALE_AFTER = timedelta(minutes=5)
+JOB_MAX_ATTEMPTS = 3
+
+JobHandler = Callable[[Job], dict[str, Any] | None]
+JOB_HANDLERS: dict[str, JobHandler] = {}
+RETRYABLE_JOB_KINDS: set[str] = set()
+
+
+class JobError(Exception):
+    # Expected failures; the message is shown to the user.
+    pass
+
+
+def get_job_files_dir() -> Path:
+    return Path(getattr(settings, "WAREHOUSE_JOB_FILES_DIR", settings.BASE_DIR / "job_files"))
+
+
+def register_job(kind: str, retryable: bool = False) -> Callable[[JobHandler], JobHandler]:
+    # retryable marks handlers that can safely run again from the start.
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        if retryable:
+            RETRYABLE_JOB_KINDS.add(kind)
+        return handler
+    return decorator
+
+
+def enqueue_job(
+    kind: str,
+    company: Company,
+    payload: dict[str, Any] | None = None,
+    user=None,
+) -> Job:
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return Job.objects.create(
+        company=company, kind=kind, payload=payload or {}, created_by=user
+    )
+
+
+def save_job_file(upload: UploadedFile) -> str:
+    directory = get_job_files_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"{uuid.uuid4().hex}{Path(upload.name or '').suffix.lower()}"
+    with (directory / name).open("wb") as destination:
+        for chunk in upload.chunks():
+            destination.write(chunk)
+    return name
+
+
+def reclaim_stale_jobs() -> int:
+    now = timezone.now()
+    cutoff = now - JOB_STALE_AFTER
+    stale = Job.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=JobStatus.RUNNING.value,
+    )
+    # Both updates repeat the stale filter, so a heartbeat that lands in
+    # between keeps its job.
+    failed = stale.filter(
+        Q(attempts__gte=JOB_MAX_ATTEMPTS) | ~Q(kind__in=RETRYABLE_JOB_KINDS)
+    ).update(
+        status=JobStatus.FAILED.value,
+        error="The worker running this job stopped responding.",
+        finished_at=now,
+    )
+    requeued = stale.update(
+        status=JobStatus.QUEUED.value, worker="", progress=0,
+        started_at=None, heartbeat_at=None,
+    )
+    return failed + requeued
+
+
+def touch_jobs(job_ids: list[int]) -> None:
+    if job_ids:
+        Job.objects.filter(pk__in=job_ids, status=JobStatus.RUNNING.value).update(
+            heartbeat_at=timezone.now()
+        )
+
+
+def claim_job(worker: str) -> Job | None:
+    reclaim_stale_jobs()
+    # A conditional UPDATE instead of SELECT ... FOR UPDATE, which SQLite
+    # lacks: only one worker's update can match a row that is still queued.
+    while True:
+        job_id = (
+            Job.objects.filter(status=JobStatus.QUEUED.value)
+            .order_by("id")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=job_id, status=JobStatus.QUEUED.value).update(
+            status=JobStatus.RUNNING.value, worker=worker, started_at=now,
+            heartbeat_at=now, attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+
+
+def update_job_progress(job: Job, progress: int) -> None:
+    job.progress = max(0, min(progress, 100))
+    Job.objects.filter(pk=job.pk).update(progress=job.progress)
+
+
+def run_job(job: Job) -> Job:
+    try:
+        handler = JOB_HANDLERS.get(job.kind)
+        if handler is None:
+            raise JobError(f"Unknown job kind: {job.kind}")
+        job.result = handler(job)
+    except JobError as error:
+        job.status = JobStatus.FAILED.value
+        job.error = str(error)
+    except Exception:
+        logger.exception("Job %s (%s) failed.", job.pk, job.kind)
+        job.status = JobStatus.FAILED.value
+        job.error = "Unexpected error."
+    else:
+        job.status = JobStatus.SUCCEEDED.value
+        job.progress = 100
+    job.finished_at = timezone.now()
+    # Only the claim that is still current records the outcome; a worker
+    # whose job was reclaimed while it ran must not overwrite the new run.
+    recorded = Job.objects.filter(
+        pk=job.pk, worker=job.worker, attempts=job.attempts, status=JobStatus.RUNNING.value
+    ).update(
+        status=job.status, progress=job.progress, result=job.result, error=job.error,
+        finished_at=job.finished_at,
+    )
+    if not recorded:
+        logger.warning("Job %s was reclaimed while running; its outcome is discarded.", job.pk)
+        job.refresh_from_db()
+    return job
+
+
+def run_job_by_id(job_id: int) -> str:
+    # Entry point for worker threads and processes, which hold their own
+    # database connections.
+    close_old_connections()
+    try:
+        return run_job(Job.objects.get(pk=job_id)).status
+    finally:
+        close_old_connections()
+
+
+@register_job("import_items")
+def import_items_job(job: Job) -> dict[str, Any]:
+    path = get_job_files_dir() / Path(job.payload["file"]).name
+    importer = ItemImporter(
+        job.company,
+        allow_updates=job.payload.get("allow_updates", False),
+        user=job.created_by,
+    )
+    try:
+        with path.open(encoding="utf-8-sig", newline="") as lines:
+            total_lines = sum(1 for _ in lines) or 1
+            lines.seek(0)
+            report = importer.run(
+                lines,
+                job.payload["file_format"],
+                on_chunk=lambda line: update_job_progress(job, line * 100 // total_lines),
+            )
+    except UnicodeDecodeError:
+        raise JobError("The file must be UTF-8 encoded.")
+    finally:
+        path.unlink(missing_ok=True)
+    return dataclasses.asdict(report)
+
+
+def bulk_action_payload(cleaned_data: dict[str, Any]) -> dict[str, Any]:
+    value_percent = cleaned_data.get("value_percent")
+    return {
+        "bulk_action": cleaned_data["bulk_action"],
+        "item_ids": cleaned_data["item_ids"],
+        "type": cleaned_data["type"].pk if cleaned_data.get("type") else None,
+        "manufacturer": (
+            cleaned_data["manufacturer"].pk if cleaned_data.get("manufacturer") else None
+        ),
+        "quantity_delta": cleaned_data.get("quantity_delta"),
+        "value_percent": str(value_percent) if value_percent is not None else None,
+    }
+
+
+@register_job("bulk_action")
+def bulk_action_job(job: Job) -> dict[str, Any]:
+    payload = job.payload
+    cleaned_data = {
+        **payload,
+        "type": ItemType.objects.filter(company=job.company, pk=payload["type"]).first(),
+        "manufacturer": Manufacturer.objects.filter(
+            company=job.company, pk=payload["manufacturer"]
+        ).first(),
+        "value_percent": (
+            Decimal(payload["value_percent"]) if payload["value_percent"] is not None else None
+        ),
+    }
+    if payload["bulk_action"] == BULK_SET_TYPE and cleaned_data["type"] is None:
+        raise JobError("The selected type no longer exists.")
+    if payload["bulk_action"] == BULK_SET_MANUFACTURER and cleaned_data["manufacturer"] is None:
+        raise JobError("The selected manufacturer no longer exists.")
+    try:
+        return {"affected": run_bulk_action(job.company, cleaned_data, job.created_by)}
+    except ValueError as error:
+        # Checks the form already ran, failing on data changed since.
+        raise JobError(str(error))
+
+
+@register_job("record_valuation_buckets", retryable=True)
+def record_valuation_buckets_job(job: Job) -> dict[str, Any]:
+    day = date.fromisoformat(job.payload["day"])
+    return {"buckets": record_valuation_buckets(job.company, day)}
+
+
+@register_job("take_stock_snapshots", retryable=True)
+def take_stock_snapshots_job(job: Job) -> dict[str, Any]:
+    return {"snapshots": take_stock_snapshots(job.company)}
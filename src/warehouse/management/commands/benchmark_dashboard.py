@@ -0,0 +1,105 @@
+# python manage.py benchmark_dashboard --username USER [--requests N] [--concurrency N]
+# Serves the async dashboard_data view through Django's ASGI handler and
+# through the WSGI handler (threads, like a threaded WSGI server) in process,
+# against the configured database. A real deployment (e.g. uvicorn vs
+# gunicorn) adds network overhead but follows the same shape.
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = "Compare dashboard_data latency and throughput under ASGI and WSGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username",
+            required=True,
+            help="User to authenticate as. Needs the financial dashboard permission.",
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=20)
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User {options['username']!r} does not exist.")
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        # The test clients send Host: testserver.
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            self._benchmark(user, options["requests"], options["concurrency"])
+
+    def _benchmark(self, user, requests, concurrency):
+        login = Client()
+        login.force_login(user)
+        self.cookies = login.cookies
+        self.url = reverse("warehouse:dashboard_data")
+
+        self.stdout.write(
+            f"{'handler':<6} {'concurrency':>11} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+        results = {}
+        for level in sorted({1, concurrency}):
+            for handler, run in (("wsgi", self._run_wsgi), ("asgi", self._run_asgi)):
+                elapsed, latencies = run(requests, level)
+                results[handler, level] = requests / elapsed
+                self._report(handler, level, requests / elapsed, latencies)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"ASGI/WSGI throughput at concurrency {concurrency}: "
+            f"{results['asgi', concurrency] / results['wsgi', concurrency]:.2f}x"
+        ))
+
+    def _report(self, handler, concurrency, throughput, latencies):
+        latencies = sorted(latencies)
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        self.stdout.write(
+            f"{handler:<6} {concurrency:>11} {throughput:>9.1f} "
+            f"{statistics.median(latencies) * 1000:>8.1f} {p95 * 1000:>8.1f}"
+        )
+
+    def _check(self, response):
+        if response.status_code != 200:
+            raise CommandError(f"{self.url} answered {response.status_code}.")
+
+    def _run_wsgi(self, requests, concurrency):
+        local = threading.local()
+
+        def timed_get(_):
+            if not hasattr(local, "client"):
+                local.client = Client()
+                local.client.cookies = self.cookies
+            started = time.perf_counter()
+            self._check(local.client.get(self.url))
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(timed_get, range(requests)))
+        return time.perf_counter() - started, latencies
+
+    def _run_asgi(self, requests, concurrency):
+        async def run():
+            client = AsyncClient()
+            client.cookies = self.cookies
+            slots = asyncio.Semaphore(concurrency)
+
+            async def timed_get():
+                async with slots:
+                    started = time.perf_counter()
+                    self._check(await client.get(self.url))
+                    return time.perf_counter() - started
+
+            started = time.perf_counter()
+            latencies = await asyncio.gather(*(timed_get() for _ in range(requests)))
+            return time.perf_counter() - started, latencies
+
+        return asyncio.run(run())
@@ -0,0 +1,57 @@
+# python manage.py import_items <company_id> <path> [--format csv|jsonl] [--batch-size N]
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from companies.models import Company
+from warehouse.importers import IMPORT_BATCH_SIZE, IMPORT_FORMATS, ItemImporter
+
+
+class Command(BaseCommand):
+    help = "Stream items from a CSV or JSON Lines file into a company's inventory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("company_id", type=int)
+        parser.add_argument("path", type=Path)
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=IMPORT_FORMATS,
+            help="File format. Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Rows validated and written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        company = Company.objects.filter(pk=options["company_id"]).first()
+        if company is None:
+            raise CommandError(f"Company {options['company_id']} does not exist.")
+        path: Path = options["path"]
+        file_format = options["file_format"] or path.suffix.lstrip(".").lower()
+        if file_format not in IMPORT_FORMATS:
+            raise CommandError("Use --format to choose between csv and jsonl.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        importer = ItemImporter(company, batch_size=options["batch_size"])
+        try:
+            with path.open(encoding="utf-8-sig", newline="") as lines:
+                report = importer.run(lines, file_format)
+        except UnicodeDecodeError as error:
+            # Chunks before the bad byte are already committed.
+            raise CommandError(f"The file must be UTF-8 encoded: {error.reason}.")
+
+        for row_error in report.errors:
+            for field_name, messages in row_error.errors.items():
+                self.stdout.write(self.style.WARNING(
+                    f"line {row_error.line} [{field_name}]: {' '.join(messages)}"))
+        if report.error_count > len(report.errors):
+            self.stdout.write(self.style.WARNING(
+                f"... {report.error_count - len(report.errors)} more row error(s)."))
+        self.stdout.write(self.style.SUCCESS(
+            f"Import finished: {report.created} created, {report.updated} updated, "
+            f"{report.error_count} rejected."))
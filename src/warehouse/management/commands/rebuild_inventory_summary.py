@@ -0,0 +1,50 @@
+# python manage.py rebuild_inventory_summary [--company ID ...] [--dry-run]
+from django.core.management.base import BaseCommand
+
+from companies.models import Company
+from warehouse.inventory import rebuild_inventory_summary
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized inventory summary from items and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company",
+            dest="company_ids",
+            type=int,
+            action="append",
+            help="Only rebuild the given company id. May be repeated.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without rewriting the summary rows.",
+        )
+
+    def handle(self, *args, **options):
+        companies = Company.objects.order_by("id")
+        if options["company_ids"]:
+            companies = companies.filter(pk__in=options["company_ids"])
+
+        drift_count = 0
+        for company in companies:
+            drift = rebuild_inventory_summary(company, dry_run=options["dry_run"])
+            drift_count += len(drift)
+            for entry in drift:
+                if entry.type_id is not None:
+                    scope = f"type={entry.type_id}"
+                elif entry.manufacturer_id is not None:
+                    scope = f"manufacturer={entry.manufacturer_id}"
+                else:
+                    scope = "total"
+                self.stdout.write(self.style.WARNING(
+                    f"{company} [{scope}]: expected {tuple(entry.expected)}, "
+                    f"found {tuple(entry.actual)}"
+                ))
+
+        if drift_count:
+            self.stdout.write(self.style.WARNING(
+                f"{drift_count} drifted summary row(s) found."))
+        action = "checked" if options["dry_run"] else "rebuilt"
+        self.stdout.write(self.style.SUCCESS(f"Inventory summary {action}."))
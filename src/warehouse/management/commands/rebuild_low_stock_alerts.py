@@ -0,0 +1,28 @@
+# python manage.py rebuild_low_stock_alerts [--company ID ...]
+# Alerts are kept current by the item write paths; this re-evaluates every
+# item, e.g. after thresholds were changed with raw SQL.
+from django.core.management.base import BaseCommand
+
+from companies.models import Company
+from warehouse.alerts import rebuild_low_stock_alerts
+
+
+class Command(BaseCommand):
+    help = "Re-evaluate every item against its reorder level and rebuild the alert set."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company",
+            dest="company_ids",
+            type=int,
+            action="append",
+            help="Only rebuild the given company id. May be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        companies = Company.objects.order_by("id")
+        if options["company_ids"]:
+            companies = companies.filter(pk__in=options["company_ids"])
+
+        total = sum(rebuild_low_stock_alerts(company) for company in companies)
+        self.stdout.write(self.style.SUCCESS(f"{total} low-stock alert(s) active."))
@@ -0,0 +1,14 @@
+# python manage.py rebuild_search_index
+from django.core.management.base import BaseCommand
+
+from warehouse.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the warehouse item search index from the items table."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Search index rebuilt with {type(backend).__name__}."))
@@ -0,0 +1,28 @@
+# python manage.py rebuild_unit_state_counts [--company ID ...]
+from django.core.management.base import BaseCommand
+
+from companies.models import Company
+from warehouse.units import rebuild_unit_state_counts
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-item unit state counters from the item units."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company",
+            dest="company_ids",
+            type=int,
+            action="append",
+            help="Only rebuild the given company id. May be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        companies = Company.objects.order_by("id")
+        if options["company_ids"]:
+            companies = companies.filter(pk__in=options["company_ids"])
+
+        for company in companies:
+            rows = rebuild_unit_state_counts(company)
+            self.stdout.write(f"{company}: {rows} counter row(s).")
+        self.stdout.write(self.style.SUCCESS("Unit state counters rebuilt."))
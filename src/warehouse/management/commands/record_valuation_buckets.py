@@ -0,0 +1,46 @@
+# python manage.py record_valuation_buckets [--company ID ...] [--enqueue]
+# Meant to run once a day from a scheduler; re-running replaces the day.
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from companies.models import Company
+from warehouse.jobs import enqueue_job
+from warehouse.valuation import record_all_valuation_buckets, record_valuation_buckets
+
+
+class Command(BaseCommand):
+    help = "Record today's inventory valuation buckets from the inventory summary."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company",
+            dest="company_ids",
+            type=int,
+            action="append",
+            help="Only record the given company id. May be repeated.",
+        )
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Queue one job per company for run_worker instead of recording now.",
+        )
+
+    def handle(self, *args, **options):
+        day = timezone.localdate()
+        if options["enqueue"]:
+            companies = Company.objects.order_by("id")
+            if options["company_ids"]:
+                companies = companies.filter(pk__in=options["company_ids"])
+            jobs = [
+                enqueue_job("record_valuation_buckets", company, {"day": day.isoformat()})
+                for company in companies
+            ]
+            self.stdout.write(self.style.SUCCESS(f"{len(jobs)} job(s) queued."))
+            return
+        if options["company_ids"]:
+            companies = Company.objects.filter(pk__in=options["company_ids"]).order_by("id")
+            total = sum(record_valuation_buckets(company, day) for company in companies)
+        else:
+            total = record_all_valuation_buckets(day)
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} valuation bucket(s) recorded for {day.isoformat()}."))
@@ -0,0 +1,93 @@
+# python manage.py run_worker [--workers N] [--pool thread|process] [--poll-interval S] [--once]
+# Runs queued warehouse jobs. Several workers may run side by side; each job
+# is claimed by exactly one of them. Jobs left running by a worker that died
+# are queued again once their heartbeat goes stale.
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from warehouse.jobs import (
+    JOB_HEARTBEAT_INTERVAL, claim_job, reclaim_stale_jobs, run_job_by_id, touch_jobs,
+)
+
+
+class Command(BaseCommand):
+    help = "Claim and run queued warehouse jobs in a thread or process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=2,
+            help="Jobs run at the same time.",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=("thread", "process"),
+            default="thread",
+            help="Run jobs in threads or in separate processes.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty or every worker is busy.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is drained instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be a positive integer.")
+
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        reclaimed = reclaim_stale_jobs()
+        if reclaimed:
+            self.stdout.write(f"Reclaimed {reclaimed} stale job(s).")
+        if options["pool"] == "process":
+            # Spawned children start without the parent's database connections.
+            executor: Executor = ProcessPoolExecutor(
+                max_workers=options["workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=options["workers"])
+
+        running: dict[Future, int] = {}
+        finished = 0
+        last_heartbeat = time.monotonic()
+        try:
+            while True:
+                if time.monotonic() - last_heartbeat >= JOB_HEARTBEAT_INTERVAL:
+                    touch_jobs(list(running.values()))
+                    last_heartbeat = time.monotonic()
+
+                for future in [future for future in running if future.done()]:
+                    job_id = running.pop(future)
+                    finished += 1
+                    try:
+                        self.stdout.write(f"Job {job_id}: {future.result()}")
+                    except Exception as error:
+                        self.stderr.write(f"Job {job_id}: worker error: {error}")
+
+                job = claim_job(worker) if len(running) < options["workers"] else None
+                if job is not None:
+                    running[executor.submit(run_job_by_id, job.id)] = job.id
+                    continue
+                if options["once"] and not running:
+                    break
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Waiting for running jobs to finish...")
+        finally:
+            executor.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS(f"{finished} job(s) run."))
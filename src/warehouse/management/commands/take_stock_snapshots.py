@@ -0,0 +1,43 @@
+# python manage.py take_stock_snapshots [--company ID ...] [--enqueue]
+# Meant to run periodically (e.g. nightly from cron) so point-in-time stock
+# only has to replay the movements since the last run.
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from companies.models import Company
+from warehouse.jobs import enqueue_job
+from warehouse.stock import take_stock_snapshots
+
+
+class Command(BaseCommand):
+    help = "Snapshot the on-hand quantity of every item that moved since its last snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company",
+            dest="company_ids",
+            type=int,
+            action="append",
+            help="Only snapshot the given company id. May be repeated.",
+        )
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Queue one job per company for run_worker instead of snapshotting now.",
+        )
+
+    def handle(self, *args, **options):
+        companies = Company.objects.order_by("id")
+        if options["company_ids"]:
+            companies = companies.filter(pk__in=options["company_ids"])
+
+        if options["enqueue"]:
+            jobs = [enqueue_job("take_stock_snapshots", company) for company in companies]
+            self.stdout.write(self.style.SUCCESS(f"{len(jobs)} job(s) queued."))
+            return
+
+        taken_at = timezone.now()
+        total = 0
+        for company in companies:
+            total += take_stock_snapshots(company, at=taken_at)
+        self.stdout.write(self.style.SUCCESS(f"{total} stock snapshot(s) taken."))
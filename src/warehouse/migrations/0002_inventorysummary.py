@@ -0,0 +1,69 @@
+# Generated by Django 6.0.1 on 2026-10-17 19:56
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def backfill_inventory_summary(apps, schema_editor):
+    Item = apps.get_model("warehouse", "Item")
+    InventorySummary = apps.get_model("warehouse", "InventorySummary")
+
+    totals: dict[tuple[int, int | None, int | None], list] = {}
+    for item in Item.objects.only(
+        "company_id", "type_id", "manufacturer_id", "quantity", "market_value"
+    ).iterator():
+        value = item.quantity * Decimal(item.market_value)
+        for key in (
+            (item.company_id, None, None),
+            (item.company_id, item.type_id, None),
+            (item.company_id, None, item.manufacturer_id),
+        ):
+            row = totals.setdefault(key, [0, 0, Decimal("0")])
+            row[0] += 1
+            row[1] += item.quantity
+            row[2] += value
+
+    InventorySummary.objects.bulk_create(
+        InventorySummary(
+            company_id=company_id,
+            type_id=type_id,
+            manufacturer_id=manufacturer_id,
+            item_count=item_count,
+            total_quantity=total_quantity,
+            total_value=total_value,
+        )
+        for (company_id, type_id, manufacturer_id), (item_count, total_quantity, total_value)
+        in totals.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0006_alter_company_options'),
+        ('warehouse', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_count', models.IntegerField(default=0)),
+                ('total_quantity', models.BigIntegerField(default=0)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_summaries', to='companies.company')),
+                ('manufacturer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='inventory_summaries', to='warehouse.manufacturer')),
+                ('type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='inventory_summaries', to='warehouse.itemtype')),
+            ],
+            options={
+                'verbose_name_plural': 'inventory summaries',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('manufacturer__isnull', True), ('type__isnull', True)), fields=('company',), name='unique_inventory_summary_per_company'), models.UniqueConstraint(condition=models.Q(('manufacturer__isnull', True)), fields=('company', 'type'), name='unique_inventory_summary_per_company_type'), models.UniqueConstraint(condition=models.Q(('type__isnull', True)), fields=('company', 'manufacturer'), name='unique_inventory_summary_per_company_manufacturer'), models.CheckConstraint(condition=models.Q(('type__isnull', True), ('manufacturer__isnull', True), _connector='OR'), name='inventory_summary_single_dimension')],
+            },
+        ),
+        migrations.RunPython(
+            backfill_inventory_summary,
+            migrations.RunPython.noop,
+        ),
+    ]
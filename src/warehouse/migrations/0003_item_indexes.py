@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-17 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0006_alter_company_options'),
+        ('warehouse', '0002_inventorysummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['company', 'name', 'id'], name='item_company_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['company', 'quantity', 'id'], name='item_company_quantity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['company', 'market_value', 'id'], name='item_company_value_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated manually on 2026-10-17
+
+from django.db import migrations
+
+
+def create_item_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS warehouse_item_search USING fts5("
+        "name, model, description, company_id UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO warehouse_item_search "
+        "(rowid, name, model, description, company_id) "
+        "SELECT id, name, model, COALESCE(description, ''), company_id "
+        "FROM warehouse_item"
+    )
+
+
+def drop_item_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS warehouse_item_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouse", "0003_item_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_item_search_index,
+            drop_item_search_index,
+        ),
+    ]
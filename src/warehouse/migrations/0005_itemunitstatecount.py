@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_unit_state_counts(apps, schema_editor):
+    ItemUnit = apps.get_model("warehouse", "ItemUnit")
+    ItemUnitStateCount = apps.get_model("warehouse", "ItemUnitStateCount")
+    ItemUnitStateCount.objects.bulk_create(
+        ItemUnitStateCount(item_id=row["item_id"], state=row["state"], count=row["units"])
+        for row in ItemUnit.objects.values("item_id", "state")
+        .annotate(units=Count("id"))
+        .order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warehouse', '0004_item_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemUnitStateCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[('new', 'new'), ('used', 'used'), ('damaged', 'damaged'), ('sold', 'sold')], max_length=10)),
+                ('count', models.IntegerField(default=0)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unit_state_counts', to='warehouse.item')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('item', 'state'), name='unique_unit_state_count_per_item')],
+            },
+        ),
+        migrations.RunPython(
+            backfill_unit_state_counts,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:13
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def record_opening_balances(apps, schema_editor):
+    # Existing quantities become the first ledger entry of each item.
+    Item = apps.get_model("warehouse", "Item")
+    StockMovement = apps.get_model("warehouse", "StockMovement")
+    timestamp = django.utils.timezone.now()
+    StockMovement.objects.bulk_create(
+        (
+            StockMovement(
+                company_id=company_id,
+                item_id=item_id,
+                delta=quantity,
+                reason="initial",
+                timestamp=timestamp,
+            )
+            for item_id, company_id, quantity in Item.objects.exclude(quantity=0)
+            .values_list("id", "company_id", "quantity")
+            .iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0006_alter_company_options'),
+        ('warehouse', '0005_itemunitstatecount'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.IntegerField()),
+                ('reason', models.CharField(choices=[('initial', 'initial'), ('adjustment', 'adjustment'), ('import', 'import'), ('bulk', 'bulk')], max_length=20)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='companies.company')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='warehouse.item')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', 'timestamp'], name='stock_movement_item_time_idx'), models.Index(fields=['company', 'timestamp'], name='stock_movement_company_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField()),
+                ('quantity', models.IntegerField()),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='warehouse.item')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('item', 'taken_at'), name='unique_stock_snapshot_per_item_time')],
+            },
+        ),
+        migrations.RunPython(
+            record_opening_balances,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0006_alter_company_options'),
+        ('warehouse', '0006_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ValuationBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('item_count', models.IntegerField(default=0)),
+                ('total_quantity', models.BigIntegerField(default=0)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='valuation_buckets', to='companies.company')),
+                ('manufacturer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='valuation_buckets', to='warehouse.manufacturer')),
+                ('type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='valuation_buckets', to='warehouse.itemtype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'date'], name='valuation_bucket_company_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('manufacturer__isnull', True), ('type__isnull', True)), fields=('company', 'date'), name='unique_valuation_bucket_per_company_day'), models.UniqueConstraint(condition=models.Q(('manufacturer__isnull', True)), fields=('company', 'type', 'date'), name='unique_valuation_bucket_per_type_day'), models.UniqueConstraint(condition=models.Q(('type__isnull', True)), fields=('company', 'manufacturer', 'date'), name='unique_valuation_bucket_per_manufacturer_day'), models.CheckConstraint(condition=models.Q(('type__isnull', True), ('manufacturer__isnull', True), _connector='OR'), name='valuation_bucket_single_dimension')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warehouse', '0007_valuationbucket'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='itemunit',
+            index=models.Index(fields=['item', 'state'], name='item_unit_item_state_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_employee_indexes'),
+        ('warehouse', '0008_itemunit_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(models.F('company'), django.db.models.functions.text.Upper('model'), name='item_company_model_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemtype',
+            index=models.Index(models.F('company'), django.db.models.functions.text.Upper('name'), name='item_type_company_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manufacturer',
+            index=models.Index(models.F('company'), django.db.models.functions.text.Upper('name'), name='manufacturer_company_upper_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_employee_indexes'),
+        ('warehouse', '0009_autocomplete_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryVersion',
+            fields=[
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inventory_version', serialize=False, to='companies.company')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_employee_indexes'),
+        ('warehouse', '0011_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='reorder_level',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='itemtype',
+            name='reorder_level',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='LowStockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField()),
+                ('threshold', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alerts', to='companies.company')),
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alert', to='warehouse.item')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'quantity'], name='low_stock_alert_company_idx')],
+            },
+        ),
+    ]
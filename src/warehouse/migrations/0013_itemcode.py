@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_employee_indexes'),
+        ('warehouse', '0012_low_stock_alerts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=64)),
+                ('kind', models.CharField(choices=[('sku', 'sku'), ('barcode', 'barcode')], default='barcode', max_length=10)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_codes', to='companies.company')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='codes', to='warehouse.item')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('company', 'code'), name='unique_item_code_per_company')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated manually on 2026-10-17
+
+from django.db import migrations
+
+
+def create_company_token_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS warehouse_item_search")
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE warehouse_item_search USING fts5("
+        "name, model, description, company, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO warehouse_item_search "
+        "(rowid, name, model, description, company) "
+        "SELECT id, name, model, COALESCE(description, ''), 'c' || company_id "
+        "FROM warehouse_item"
+    )
+
+
+def restore_unindexed_company_id(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS warehouse_item_search")
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE warehouse_item_search USING fts5("
+        "name, model, description, company_id UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO warehouse_item_search "
+        "(rowid, name, model, description, company_id) "
+        "SELECT id, name, model, COALESCE(description, ''), company_id "
+        "FROM warehouse_item"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouse", "0014_job_heartbeat"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_company_token_index,
+            restore_unindexed_company_id,
+        ),
+    ]
@@ -1,5 +1,8 @@
 from enum import Enum
+from django.conf import settings
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
 from companies.models import Company
 
 
@@ -10,6 +13,25 @@ class ItemState(Enum):
     SOLD = "sold"
 
 
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ItemCodeKind(Enum):
+    SKU = "sku"
+    BARCODE = "barcode"
+
+
+class StockMovementReason(Enum):
+    INITIAL = "initial"
+    ADJUSTMENT = "adjustment"
+    IMPORT = "import"
+    BULK = "bulk"
+
+
 class ItemType(models.Model):
     name = models.CharField(max_length=50)
     company = models.ForeignKey(
@@ -17,6 +39,8 @@ class ItemType(models.Model):
         on_delete=models.CASCADE,
         related_name="item_types",
     )
+    # Default reorder level for items of this type without their own.
+    reorder_level = models.PositiveIntegerField(null=True, blank=True)
 
     class Meta:
         ordering = ["name"]
@@ -26,6 +50,10 @@ class ItemType(models.Model):
                 name="unique_item_type_name_per_company",
             )
         ]
+        indexes = [
+            # Case-insensitive prefix search for autocomplete.
+            models.Index("company", Upper("name"), name="item_type_company_upper_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -47,6 +75,10 @@ class Manufacturer(models.Model):
                 name="unique_manufacturer_name_per_company",
             )
         ]
+        indexes = [
+            # Case-insensitive prefix search for autocomplete.
+            models.Index("company", Upper("name"), name="manufacturer_company_upper_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -65,21 +97,369 @@ class Item(models.Model):
     quantity = models.IntegerField()
     market_value = models.DecimalField(max_digits=10, decimal_places=2)
     description = models.TextField(blank=True, null=True)
+    reorder_level = models.PositiveIntegerField(null=True, blank=True)
 
     class Meta:
         permissions = [
             ("view_financial_dashboard", "Can view warehouse financial dashboard"),
         ]
+        indexes = [
+            models.Index(
+                fields=["company", "name", "id"],
+                name="item_company_name_idx",
+            ),
+            models.Index(
+                fields=["company", "quantity", "id"],
+                name="item_company_quantity_idx",
+            ),
+            models.Index(
+                fields=["company", "market_value", "id"],
+                name="item_company_value_idx",
+            ),
+            models.Index("company", Upper("model"), name="item_company_model_upper_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class ItemCode(models.Model):
+    # SKUs and barcodes resolved by the scan endpoint; an item may have many.
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="item_codes",
+    )
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        related_name="codes",
+    )
+    code = models.CharField(max_length=64)
+    kind = models.CharField(
+        max_length=10,
+        choices=[(tag.value, tag.value) for tag in ItemCodeKind],
+        default=ItemCodeKind.BARCODE.value,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "code"],
+                name="unique_item_code_per_company",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.code} ({self.kind})"
+
+
 class ItemUnit(models.Model):
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
     state = models.CharField(max_length=10, choices=[
                              (tag.value, tag.value) for tag in ItemState])
     remark = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["item", "state"],
+                name="item_unit_item_state_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.item.name}"
+
+
+class ItemUnitStateCount(models.Model):
+    # Number of units of an item in each state. Maintained by warehouse.units.
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        related_name="unit_state_counts",
+    )
+    state = models.CharField(max_length=10, choices=[
+                             (tag.value, tag.value) for tag in ItemState])
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["item", "state"],
+                name="unique_unit_state_count_per_item",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} - {self.state}: {self.count}"
+
+
+class StockMovement(models.Model):
+    # Append-only ledger of quantity changes; Item.quantity is the running
+    # total. Written through warehouse.stock.
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="stock_movements",
+    )
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        related_name="stock_movements",
+    )
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=[
+                              (tag.value, tag.value) for tag in StockMovementReason])
+    timestamp = models.DateTimeField(default=timezone.now)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="stock_movements",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["item", "timestamp"],
+                name="stock_movement_item_time_idx",
+            ),
+            models.Index(
+                fields=["company", "timestamp"],
+                name="stock_movement_company_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id}: {self.delta:+d} ({self.reason})"
+
+
+class LowStockAlert(models.Model):
+    # Materialized set of items at or below their reorder level, maintained
+    # by warehouse.alerts as quantities and thresholds change.
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="low_stock_alerts",
+    )
+    item = models.OneToOneField(
+        Item,
+        on_delete=models.CASCADE,
+        related_name="low_stock_alert",
+    )
+    quantity = models.IntegerField()
+    threshold = models.PositiveIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["company", "quantity"],
+                name="low_stock_alert_company_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id}: {self.quantity} <= {self.threshold}"
+
+
+class StockSnapshot(models.Model):
+    # On-hand quantity of an item as of taken_at, so point-in-time stock only
+    # replays the movements recorded after the latest snapshot.
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        related_name="stock_snapshots",
+    )
+    taken_at = models.DateTimeField()
+    quantity = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["item", "taken_at"],
+                name="unique_stock_snapshot_per_item_time",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} @ {self.taken_at:%Y-%m-%d %H:%M}: {self.quantity}"
+
+
+class InventorySummary(models.Model):
+    # One row per company (type and manufacturer unset), one per company x type
+    # and one per company x manufacturer. Maintained by warehouse.inventory.
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="inventory_summaries",
+    )
+    type = models.ForeignKey(
+        ItemType,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="inventory_summaries",
+    )
+    manufacturer = models.ForeignKey(
+        Manufacturer,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="inventory_summaries",
+    )
+    item_count = models.IntegerField(default=0)
+    total_quantity = models.BigIntegerField(default=0)
+    total_value = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "inventory summaries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company"],
+                condition=models.Q(type__isnull=True, manufacturer__isnull=True),
+                name="unique_inventory_summary_per_company",
+            ),
+            models.UniqueConstraint(
+                fields=["company", "type"],
+                condition=models.Q(manufacturer__isnull=True),
+                name="unique_inventory_summary_per_company_type",
+            ),
+            models.UniqueConstraint(
+                fields=["company", "manufacturer"],
+                condition=models.Q(type__isnull=True),
+                name="unique_inventory_summary_per_company_manufacturer",
+            ),
+            models.CheckConstraint(
+                condition=models.Q(type__isnull=True) | models.Q(manufacturer__isnull=True),
+                name="inventory_summary_single_dimension",
+            ),
+        ]
+
+    def __str__(self):
+        if self.type_id is not None:
+            return f"{self.company} - {self.type}"
+        if self.manufacturer_id is not None:
+            return f"{self.company} - {self.manufacturer}"
+        return f"{self.company}"
+
+
+class ValuationBucket(models.Model):
+    # Daily copy of the inventory summary rows, kept for trend charts. Same
+    # dimensions as InventorySummary; written by warehouse.valuation.
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="valuation_buckets",
+    )
+    date = models.DateField()
+    type = models.ForeignKey(
+        ItemType,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="valuation_buckets",
+    )
+    manufacturer = models.ForeignKey(
+        Manufacturer,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="valuation_buckets",
+    )
+    item_count = models.IntegerField(default=0)
+    total_quantity = models.BigIntegerField(default=0)
+    total_value = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "date"],
+                condition=models.Q(type__isnull=True, manufacturer__isnull=True),
+                name="unique_valuation_bucket_per_company_day",
+            ),
+            models.UniqueConstraint(
+                fields=["company", "type", "date"],
+                condition=models.Q(manufacturer__isnull=True),
+                name="unique_valuation_bucket_per_type_day",
+            ),
+            models.UniqueConstraint(
+                fields=["company", "manufacturer", "date"],
+                condition=models.Q(type__isnull=True),
+                name="unique_valuation_bucket_per_manufacturer_day",
+            ),
+            models.CheckConstraint(
+                condition=models.Q(type__isnull=True) | models.Q(manufacturer__isnull=True),
+                name="valuation_bucket_single_dimension",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["company", "date"],
+                name="valuation_bucket_company_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.company} {self.date}: {self.total_value}"
+
+
+class InventoryVersion(models.Model):
+    # Bumped in the same transaction as every write to a company's items,
+    # types, manufacturers or units; drives the read API ETags.
+    company = models.OneToOneField(
+        Company,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="inventory_version",
+    )
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.company}: {self.version}"
+
+
+class Job(models.Model):
+    # Background work claimed and run by the run_worker command. Handlers are
+    # registered by kind in warehouse.jobs.
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name="jobs",
+    )
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10,
+        choices=[(tag.value, tag.value) for tag in JobStatus],
+        default=JobStatus.QUEUED.value,
+    )
+    progress = models.PositiveSmallIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="warehouse_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Touched by the claiming worker while the job runs; a running job whose
+    # heartbeat stops is reclaimed by the next worker.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="job_status_idx"),
+            models.Index(fields=["company", "created_at"], name="job_company_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
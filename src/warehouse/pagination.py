@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any
+from django.core import signing
+from django.db.models import Q, QuerySet
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    object_list: list[Any]
+    next_cursor: str | None
+    previous_cursor: str | None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+
+def _encode_cursor(salt: str, ordering: str, direction: str, obj: Any) -> str:
+    value = getattr(obj, ordering.lstrip("-"))
+    if isinstance(value, Decimal):
+        value = str(value)
+    return signing.dumps(
+        {"ordering": ordering, "direction": direction, "value": value, "pk": obj.pk},
+        salt=salt,
+    )
+
+
+def _decode_cursor(salt: str, ordering: str, cursor: str | None) -> dict[str, Any] | None:
+    if not cursor:
+        return None
+    try:
+        payload = signing.loads(cursor, salt=salt)
+    except signing.BadSignature:
+        return None
+    if not isinstance(payload, dict) or payload.get("ordering") != ordering:
+        return None
+    if payload.get("direction") not in {"after", "before"}:
+        return None
+    return payload
+
+
+def _seek(field: str, value: Any, pk: Any, forward: bool) -> Q:
+    # The first term is a plain range on the leading sort column so the
+    # (company, field, id) index can seek instead of scanning.
+    if forward:
+        return Q(**{f"{field}__gte": value}) & (
+            Q(**{f"{field}__gt": value}) | Q(pk__gt=pk)
+        )
+    return Q(**{f"{field}__lte": value}) & (
+        Q(**{f"{field}__lt": value}) | Q(pk__lt=pk)
+    )
+
+
+def paginate_keyset(
+    queryset: QuerySet,
+    ordering: str,
+    cursor: str | None,
+    page_size: int,
+    salt: str,
+) -> KeysetPage:
+    field = ordering.lstrip("-")
+    descending = ordering.startswith("-")
+    payload = _decode_cursor(salt, ordering, cursor)
+
+    backwards = payload is not None and payload["direction"] == "before"
+    # Walking backwards reads the reversed ordering and flips the page after.
+    reverse_order = descending != backwards
+    order_by = (f"-{field}", "-pk") if reverse_order else (field, "pk")
+
+    if payload is not None:
+        queryset = queryset.filter(
+            _seek(field, payload["value"], payload["pk"], forward=not reverse_order)
+        )
+
+    rows = list(queryset.order_by(*order_by)[: page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    if not rows:
+        return KeysetPage([], None, None)
+
+    if backwards:
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, payload is not None
+
+    return KeysetPage(
+        rows,
+        _encode_cursor(salt, ordering, "after", rows[-1]) if has_next else None,
+        _encode_cursor(salt, ordering, "before", rows[0]) if has_previous else None,
+    )
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from django.db.models import IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from companies.models import Company
+from .models import ItemCode, ItemState, ItemUnitStateCount
+
+
+SCAN_CACHE_MAX_ENTRIES = 4096
+# Writes clear this process's entries at once; the TTL bounds how long other
+# processes can serve a stale result.
+SCAN_CACHE_TTL = 30
+
+
+class ScanCache:
+    # LRU of scan results per process. Each company has a generation counter;
+    # invalidating bumps it, which orphans every entry stored under the old
+    # one without walking the cache.
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[int, str], tuple[float, int, dict]] = OrderedDict()
+        self._generations: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, company_id: int) -> int:
+        with self._lock:
+            return self._generations.get(company_id, 0)
+
+    def get(self, company_id: int, code: str) -> dict[str, Any] | None:
+        key = (company_id, code)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, generation, value = entry
+            if (
+                expires_at < time.monotonic()
+                or generation != self._generations.get(company_id, 0)
+            ):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, company_id: int, code: str, value: dict[str, Any], generation: int) -> None:
+        # generation is read before the lookup query, so a write that lands
+        # while the query runs leaves this entry already invalid.
+        with self._lock:
+            self._entries[(company_id, code)] = (
+                time.monotonic() + self.ttl, generation, value
+            )
+            self._entries.move_to_end((company_id, code))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, company_id: int) -> None:
+        with self._lock:
+            self._generations[company_id] = self._generations.get(company_id, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+scan_cache = ScanCache(SCAN_CACHE_MAX_ENTRIES, SCAN_CACHE_TTL)
+
+
+def _unit_count(state: str) -> Coalesce:
+    return Coalesce(
+        Subquery(
+            ItemUnitStateCount.objects.filter(item=OuterRef("item"), state=state)
+            .values("count")[:1]
+        ),
+        Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _item_code_query(company: Company, code: str):
+    # Item, type, manufacturer and unit counts in one query. The item's own
+    # company is matched too, so a code left behind after its item moved to
+    # another company never resolves across tenants.
+    return (
+        ItemCode.objects.filter(company=company, code=code, item__company=company)
+        .select_related("item__type", "item__manufacturer")
+        .annotate(**{f"units_{state.value}": _unit_count(state.value) for state in ItemState})
+    )
+
+
+def _scan_result(item_code: ItemCode) -> dict[str, Any]:
+    item = item_code.item
+    return {
+        "code": item_code.code,
+        "kind": item_code.kind,
+        "item": {
+            "id": item.id,
+            "name": item.name,
+            "model": item.model,
+            "type": item.type.name,
+            "manufacturer": item.manufacturer.name,
+            "quantity": item.quantity,
+            "market_value": str(item.market_value),
+        },
+        "units": {
+            state.value: getattr(item_code, f"units_{state.value}") for state in ItemState
+        },
+    }
+
+
+def scan_item(company: Company, code: str) -> dict[str, Any] | None:
+    code = code.strip()
+    cached = scan_cache.get(company.id, code)
+    if cached is not None:
+        return cached
+
+    generation = scan_cache.generation(company.id)
+    item_code = _item_code_query(company, code).first()
+    if item_code is None:
+        return None
+    result = _scan_result(item_code)
+    scan_cache.set(company.id, code, result, generation)
+    return result
+
+
+async def ascan_item(company: Company, code: str) -> dict[str, Any] | None:
+    code = code.strip()
+    cached = scan_cache.get(company.id, code)
+    if cached is not None:
+        return cached
+
+    generation = scan_cache.generation(company.id)
+    item_code = await _item_code_query(company, code).afirst()
+    if item_code is None:
+        return None
+    result = _scan_result(item_code)
+    scan_cache.set(company.id, code, result, generation)
+    return result
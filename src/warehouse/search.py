@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+from companies.models import Company
+from .models import Item
+
+
+DEFAULT_SEARCH_BACKEND = "warehouse.search.DatabaseSearchBackend"
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    item_ids: list[int]
+    has_next: bool
+
+
+class BaseSearchBackend:
+    def index_items(self, items: Iterable[Item]) -> None:
+        raise NotImplementedError
+
+    def remove_items(self, item_ids: Iterable[int]) -> None:
+        raise NotImplementedError
+
+    def rebuild(self) -> None:
+        raise NotImplementedError
+
+    def search(self, company: Company, query: str, limit: int, offset: int) -> SearchPage:
+        raise NotImplementedError
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    # Portable fallback: no index to maintain, LIKE scan at query time.
+    def index_items(self, items: Iterable[Item]) -> None:
+        return
+
+    def remove_items(self, item_ids: Iterable[int]) -> None:
+        return
+
+    def rebuild(self) -> None:
+        return
+
+    def search(self, company: Company, query: str, limit: int, offset: int) -> SearchPage:
+        condition = Q()
+        for term in query.split():
+            condition &= (
+                Q(name__icontains=term)
+                | Q(model__icontains=term)
+                | Q(description__icontains=term)
+            )
+        item_ids = list(
+            Item.objects.filter(condition, company=company)
+            .order_by("name", "id")
+            .values_list("id", flat=True)[offset:offset + limit + 1]
+        )
+        return SearchPage(item_ids[:limit], len(item_ids) > limit)
+
+
+class SQLiteFTS5SearchBackend(BaseSearchBackend):
+    # The FTS5 table is created by migration 0004; its rowid is the item id.
+    # The company column (migration 0015) holds one c<company id> token per
+    # row, so the tenant is matched through the index along with the terms.
+    table_name = "warehouse_item_search"
+    text_columns = ("name", "model", "description")
+    # bm25 weights for (name, model, description, company): model numbers
+    # matter most and the tenant token, shared by every match, not at all.
+    column_weights = (5.0, 10.0, 1.0, 0.0)
+
+    @staticmethod
+    def company_token(company_id: int) -> str:
+        return f"c{company_id}"
+
+    def index_items(self, items: Iterable[Item]) -> None:
+        rows = [
+            (
+                item.id, item.name, item.model, item.description or "",
+                self.company_token(item.company_id),
+            )
+            for item in items
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table_name} WHERE rowid = %s",
+                [(row[0],) for row in rows],
+            )
+            cursor.executemany(
+                f"INSERT INTO {self.table_name} "
+                "(rowid, name, model, description, company) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove_items(self, item_ids: Iterable[int]) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table_name} WHERE rowid = %s",
+                [(item_id,) for item_id in item_ids],
+            )
+
+    def rebuild(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table_name}")
+            cursor.execute(
+                f"INSERT INTO {self.table_name} "
+                "(rowid, name, model, description, company) "
+                "SELECT id, name, model, COALESCE(description, ''), 'c' || company_id "
+                "FROM warehouse_item"
+            )
+
+    @classmethod
+    def build_match_expression(cls, query: str) -> str:
+        # Every term becomes a quoted prefix phrase, so punctuation in model
+        # numbers such as "S7-200" cannot be parsed as FTS5 query syntax.
+        # Terms are limited to the text columns so none can match a tenant
+        # token.
+        columns = " ".join(cls.text_columns)
+        terms = [term.replace('"', '""') for term in query.split()]
+        return " AND ".join(
+            f'{{{columns}}} : "{term}"*' for term in terms if term.strip('"')
+        )
+
+    def search(self, company: Company, query: str, limit: int, offset: int) -> SearchPage:
+        match = self.build_match_expression(query)
+        if not match:
+            return SearchPage([], False)
+        match = f'company : "{self.company_token(company.id)}" AND {match}'
+        weights = ", ".join(str(weight) for weight in self.column_weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table_name} "
+                f"WHERE {self.table_name} MATCH %s "
+                f"ORDER BY bm25({self.table_name}, {weights}), rowid "
+                "LIMIT %s OFFSET %s",
+                [match, limit + 1, offset],
+            )
+            item_ids = [row[0] for row in cursor.fetchall()]
+        return SearchPage(item_ids[:limit], len(item_ids) > limit)
+
+
+@lru_cache(maxsize=None)
+def get_search_backend() -> BaseSearchBackend:
+    backend_path = getattr(settings, "WAREHOUSE_SEARCH_BACKEND", DEFAULT_SEARCH_BACKEND)
+    return import_string(backend_path)()
+
+
+def _page_items_query(company: Company, page: SearchPage):
+    return Item.objects.filter(company=company, pk__in=page.item_ids).select_related(
+        "type", "manufacturer"
+    )
+
+
+def _ordered_items(page: SearchPage, items_by_id: dict[int, Item]) -> list[Item]:
+    return [items_by_id[item_id] for item_id in page.item_ids if item_id in items_by_id]
+
+
+def search_items(
+    company: Company,
+    query: str,
+    limit: int,
+    offset: int = 0,
+) -> tuple[list[Item], bool]:
+    page = get_search_backend().search(company, query, limit, offset)
+    items_by_id = _page_items_query(company, page).in_bulk()
+    return _ordered_items(page, items_by_id), page.has_next
+
+
+async def asearch_items(
+    company: Company,
+    query: str,
+    limit: int,
+    offset: int = 0,
+) -> tuple[list[Item], bool]:
+    # Backends run raw cursor queries, which have no async API.
+    page = await sync_to_async(get_search_backend().search)(company, query, limit, offset)
+    items_by_id = await _page_items_query(company, page).ain_bulk()
+    return _ordered_items(page, items_by_id), page.has_next
@@ -0,0 +1,145 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .alerts import record_item_low_stock, record_item_type_low_stock
+from .choices import invalidate_item_choices
+from .inventory import record_item_deleted, record_item_saved
+from .models import Item, ItemCode, ItemType, ItemUnit, Manufacturer
+from .search import get_search_backend
+from .stock import record_item_stock_change
+from .units import record_unit_deleted, record_unit_saved
+from .versioning import bump_inventory_version
+
+
+@receiver(pre_save, sender=Item)
+def remember_previous_item_state(sender, instance: Item, **kwargs):
+    instance._inventory_previous = None
+    if instance.pk is None:
+        return
+    instance._inventory_previous = (
+        Item.objects.filter(pk=instance.pk)
+        .values(
+            "company_id", "type_id", "manufacturer_id", "quantity", "market_value",
+            "reorder_level",
+        )
+        .first()
+    )
+
+
+@receiver(post_save, sender=Item)
+def update_inventory_summary_on_save(sender, instance: Item, **kwargs):
+    record_item_saved(instance, getattr(instance, "_inventory_previous", None))
+
+
+@receiver(post_save, sender=Item)
+def record_stock_movement_on_save(sender, instance: Item, **kwargs):
+    record_item_stock_change(instance, getattr(instance, "_inventory_previous", None))
+
+
+@receiver(post_save, sender=Item)
+def evaluate_low_stock_on_save(sender, instance: Item, **kwargs):
+    record_item_low_stock(instance, getattr(instance, "_inventory_previous", None))
+
+
+@receiver(pre_save, sender=ItemType)
+def remember_previous_reorder_level(sender, instance: ItemType, **kwargs):
+    instance._previous_reorder_level = None
+    if instance.pk is None:
+        return
+    instance._previous_reorder_level = (
+        ItemType.objects.filter(pk=instance.pk).values_list("reorder_level", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=ItemType)
+def evaluate_low_stock_on_type_save(sender, instance: ItemType, **kwargs):
+    record_item_type_low_stock(instance, getattr(instance, "_previous_reorder_level", None))
+
+
+@receiver(post_delete, sender=Item)
+def update_inventory_summary_on_delete(sender, instance: Item, **kwargs):
+    record_item_deleted(instance)
+
+
+@receiver(post_save, sender=Item)
+def index_item_for_search(sender, instance: Item, **kwargs):
+    get_search_backend().index_items([instance])
+
+
+@receiver(post_delete, sender=Item)
+def remove_item_from_search(sender, instance: Item, **kwargs):
+    get_search_backend().remove_items([instance.pk])
+
+
+@receiver(post_save, sender=ItemType)
+@receiver(post_delete, sender=ItemType)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_delete, sender=Manufacturer)
+def invalidate_item_choices_on_change(sender, instance, **kwargs):
+    invalidate_item_choices(instance.company_id)
+
+
+@receiver(pre_save, sender=ItemUnit)
+def remember_previous_unit_state(sender, instance: ItemUnit, **kwargs):
+    instance._state_previous = None
+    if instance.pk is None:
+        return
+    instance._state_previous = (
+        ItemUnit.objects.filter(pk=instance.pk).values("item_id", "state").first()
+    )
+
+
+@receiver(post_save, sender=ItemUnit)
+def update_unit_state_counts_on_save(sender, instance: ItemUnit, **kwargs):
+    record_unit_saved(instance, getattr(instance, "_state_previous", None))
+
+
+def is_direct_unit_delete(origin) -> bool:
+    # Units removed along with their item (or company) need no bookkeeping:
+    # their counter rows are cascade-deleted too.
+    if isinstance(origin, QuerySet):
+        return origin.model is ItemUnit
+    return isinstance(origin, ItemUnit)
+
+
+@receiver(post_delete, sender=ItemUnit)
+def update_unit_state_counts_on_delete(sender, instance: ItemUnit, origin=None, **kwargs):
+    if is_direct_unit_delete(origin):
+        record_unit_deleted(instance)
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+@receiver(post_save, sender=ItemType)
+@receiver(post_delete, sender=ItemType)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_delete, sender=Manufacturer)
+@receiver(post_save, sender=ItemCode)
+@receiver(post_delete, sender=ItemCode)
+def bump_inventory_version_on_change(sender, instance, **kwargs):
+    bump_inventory_version(instance.company_id)
+
+
+@receiver(post_save, sender=ItemUnit)
+def bump_inventory_version_on_unit_save(sender, instance: ItemUnit, **kwargs):
+    bump_inventory_version(instance.item.company_id)
+
+
+@receiver(post_delete, sender=ItemUnit)
+def bump_inventory_version_on_unit_delete(sender, instance: ItemUnit, origin=None, **kwargs):
+    # A cascade from an item delete is covered by the item's own bump. A
+    # queryset delete sends this once per unit, so companies are resolved
+    # once per item and bumped once per company for the whole call.
+    if not is_direct_unit_delete(origin):
+        return
+    if not hasattr(origin, "_unit_delete_companies"):
+        origin._unit_delete_companies = {}
+    companies = origin._unit_delete_companies
+    if instance.item_id in companies:
+        return
+    company_id = (
+        Item.objects.filter(pk=instance.item_id).values_list("company_id", flat=True).first()
+    )
+    companies[instance.item_id] = company_id
+    if company_id is not None and list(companies.values()).count(company_id) == 1:
+        bump_inventory_version(company_id)
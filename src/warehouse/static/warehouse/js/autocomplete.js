@@ -0,0 +1,92 @@
+(function () {
+    const DEBOUNCE_MS = 200;
+
+    function fetchSuggestions(url, query) {
+        const target = new URL(url, window.location.origin);
+        target.searchParams.set('q', query);
+        return fetch(target, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Failed to load suggestions');
+                }
+                return response.json();
+            });
+    }
+
+    function debounce(callback) {
+        let timer = null;
+        return function (...args) {
+            clearTimeout(timer);
+            timer = setTimeout(() => callback(...args), DEBOUNCE_MS);
+        };
+    }
+
+    // Large selects only render their current option; a search box above
+    // them replaces the options with the matches from the server.
+    function attachSelect(select) {
+        const search = document.createElement('input');
+        search.type = 'search';
+        search.className = 'form-control form-control-sm mb-1';
+        search.placeholder = 'Buscar...';
+        search.setAttribute('aria-label', 'Buscar opções');
+        select.parentNode.insertBefore(search, select);
+
+        search.addEventListener('input', debounce(function () {
+            fetchSuggestions(select.dataset.autocompleteUrl, search.value.trim())
+                .then(data => {
+                    const selected = select.value;
+                    Array.from(select.options).forEach(option => {
+                        if (option.value !== '' && option.value !== selected) {
+                            option.remove();
+                        }
+                    });
+                    data.results.forEach(result => {
+                        if (String(result.id) === selected) {
+                            return;
+                        }
+                        select.add(new Option(result.text, result.id));
+                    });
+                })
+                .catch(() => {});
+        }));
+    }
+
+    // Free-text inputs get suggestions through a datalist.
+    function attachInput(input) {
+        const list = document.createElement('datalist');
+        list.id = `${input.id}-suggestions`;
+        input.setAttribute('list', list.id);
+        input.setAttribute('autocomplete', 'off');
+        input.parentNode.appendChild(list);
+
+        input.addEventListener('input', debounce(function () {
+            const query = input.value.trim();
+            if (!query) {
+                return;
+            }
+            fetchSuggestions(input.dataset.autocompleteUrl, query)
+                .then(data => {
+                    list.replaceChildren(...data.results.map(result => new Option(result.text)));
+                })
+                .catch(() => {});
+        }));
+    }
+
+    window.initAutocomplete = function (root) {
+        root.querySelectorAll('[data-autocomplete-url]').forEach(function (element) {
+            if (element.dataset.autocompleteReady) {
+                return;
+            }
+            element.dataset.autocompleteReady = 'true';
+            if (element.tagName === 'SELECT') {
+                attachSelect(element);
+            } else {
+                attachInput(element);
+            }
+        });
+    };
+
+    document.addEventListener('DOMContentLoaded', function () {
+        window.initAutocomplete(document);
+    });
+})();
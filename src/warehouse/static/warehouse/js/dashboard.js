@@ -1,41 +1,25 @@
 document.addEventListener('DOMContentLoaded', function () {
-    const itemsDataElement = document.getElementById('items-data');
-    if (!itemsDataElement) {
+    const dashboardDataElement = document.getElementById('dashboard-data');
+    if (!dashboardDataElement) {
         return;
     }
 
-    const itemsData = JSON.parse(itemsDataElement.textContent);
+    // Aggregates are computed server-side, one entry per type / manufacturer
+    const dashboardData = JSON.parse(dashboardDataElement.textContent);
 
-    if (itemsData.length === 0) {
+    if (dashboardData.by_type.length === 0) {
         return;
     }
 
-    // Parse market_value as float
-    itemsData.forEach(item => {
-        item.market_value = parseFloat(item.market_value);
-    });
-
-    // Calculate totals
-    const totalQuantity = itemsData.reduce((sum, item) => sum + item.quantity, 0);
-    const totalMarketValue = itemsData.reduce((sum, item) => sum + (item.quantity * item.market_value), 0);
-
-    document.getElementById('total-quantity').textContent = totalQuantity;
-    document.getElementById('total-market-value').textContent = 'R$' + totalMarketValue.toLocaleString('pt-BR', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
-
     // Item Type Chart (Pie)
-    const typeCounts = itemsData.reduce((acc, item) => {
-        acc[item.type] = (acc[item.type] || 0) + item.quantity;
-        return acc;
-    }, {});
-
     const itemTypeCtx = document.getElementById('item-type-chart').getContext('2d');
     new Chart(itemTypeCtx, {
         type: 'pie',
         data: {
-            labels: Object.keys(typeCounts),
+            labels: dashboardData.by_type.map(row => row.label),
             datasets: [{
                 label: 'Quantidade por Tipo',
-                data: Object.values(typeCounts),
+                data: dashboardData.by_type.map(row => row.quantity),
                 backgroundColor: [
                     'rgba(255, 99, 132, 0.8)',
                     'rgba(54, 162, 235, 0.8)',
@@ -61,19 +45,14 @@ document.addEventListener('DOMContentLoaded', function () {
     });
 
     // Manufacturer Chart (Bar)
-    const manufacturerCounts = itemsData.reduce((acc, item) => {
-        acc[item.manufacturer] = (acc[item.manufacturer] || 0) + item.quantity;
-        return acc;
-    }, {});
-
     const manufacturerCtx = document.getElementById('manufacturer-chart').getContext('2d');
     new Chart(manufacturerCtx, {
         type: 'bar',
         data: {
-            labels: Object.keys(manufacturerCounts),
+            labels: dashboardData.by_manufacturer.map(row => row.label),
             datasets: [{
                 label: 'Quantidade por Fabricante',
-                data: Object.values(manufacturerCounts),
+                data: dashboardData.by_manufacturer.map(row => row.quantity),
                 backgroundColor: 'rgba(75, 192, 192, 0.8)',
             }]
         },
@@ -98,4 +77,54 @@ document.addEventListener('DOMContentLoaded', function () {
             }
         }
     });
-});
\ No newline at end of file
+});
+
+document.addEventListener('DOMContentLoaded', function () {
+    const valuationCanvas = document.getElementById('valuation-chart');
+    if (!valuationCanvas) {
+        return;
+    }
+
+    // Weekly closing values from the precomputed valuation buckets
+    fetch(valuationCanvas.dataset.url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Failed to load valuation series');
+            }
+            return response.json();
+        })
+        .then(data => {
+            if (data.series.length === 0) {
+                valuationCanvas.hidden = true;
+                return;
+            }
+            const points = data.series[0].points;
+            new Chart(valuationCanvas.getContext('2d'), {
+                type: 'line',
+                data: {
+                    labels: points.map(point => point.period),
+                    datasets: [{
+                        label: 'Valor de Mercado Total',
+                        data: points.map(point => Number(point.total_value)),
+                        borderColor: 'rgba(54, 162, 235, 0.8)',
+                        fill: false,
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    plugins: {
+                        legend: {
+                            display: false,
+                        },
+                        title: {
+                            display: true,
+                            text: 'Evolução do Valor de Mercado'
+                        }
+                    }
+                }
+            });
+        })
+        .catch(() => {
+            valuationCanvas.hidden = true;
+        });
+});
@@ -0,0 +1,66 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // Edit forms are fetched on demand instead of being rendered for every row
+    document.querySelectorAll('[data-edit-url]').forEach(function (button) {
+        button.addEventListener('click', function (event) {
+            event.preventDefault();
+
+            const editRow = document.getElementById(button.dataset.editTarget);
+            if (!editRow) {
+                return;
+            }
+            if (editRow.dataset.loaded || editRow.querySelector('form')) {
+                editRow.hidden = !editRow.hidden;
+                return;
+            }
+
+            fetch(button.dataset.editUrl, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error('Failed to load edit form');
+                    }
+                    return response.text();
+                })
+                .then(html => {
+                    editRow.querySelector('td').innerHTML = html;
+                    if (window.initAutocomplete) {
+                        window.initAutocomplete(editRow);
+                    }
+                    editRow.dataset.loaded = 'true';
+                    editRow.hidden = false;
+                })
+                .catch(() => {
+                    window.location.href = button.href;
+                });
+        });
+    });
+});
+
+document.addEventListener('DOMContentLoaded', function () {
+    const selectAll = document.getElementById('bulk-select-all');
+    if (selectAll) {
+        selectAll.addEventListener('change', function () {
+            document.querySelectorAll('input[name="item_ids"][form="bulk-action-form"]').forEach(function (checkbox) {
+                checkbox.checked = selectAll.checked;
+            });
+        });
+    }
+
+    // Only show the parameter the selected bulk action needs
+    const actionSelect = document.querySelector('#bulk-action-form select[name="bulk_action"]');
+    if (!actionSelect) {
+        return;
+    }
+    const parameterByAction = {
+        set_type: 'type',
+        set_manufacturer: 'manufacturer',
+        adjust_quantity: 'quantity_delta',
+        scale_value: 'value_percent',
+    };
+    const toggleParameters = function () {
+        document.querySelectorAll('[data-bulk-parameter]').forEach(function (element) {
+            element.hidden = element.dataset.bulkParameter !== parameterByAction[actionSelect.value];
+        });
+    };
+    actionSelect.addEventListener('change', toggleParameters);
+    toggleParameters();
+});
@@ -0,0 +1,32 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // Follows a queued or running job and reloads the page once it finishes
+    const status = document.querySelector('[data-job-url]');
+    if (!status) {
+        return;
+    }
+    const bar = status.querySelector('.progress-bar');
+
+    function poll() {
+        fetch(status.dataset.jobUrl, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Failed to load job status');
+                }
+                return response.json();
+            })
+            .then(job => {
+                if (bar) {
+                    bar.style.width = job.progress + '%';
+                    bar.textContent = job.progress + '%';
+                }
+                if (job.status === 'queued' || job.status === 'running') {
+                    setTimeout(poll, 2000);
+                } else {
+                    window.location.reload();
+                }
+            })
+            .catch(error => console.error(error));
+    }
+
+    setTimeout(poll, 2000);
+});
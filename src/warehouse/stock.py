@@ -0,0 +1,138 @@
+from datetime import datetime, timezone as dt_timezone
+from typing import Iterable
+from django.db import transaction
+from django.db.models import Exists, IntegerField, OuterRef, QuerySet, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from companies.models import Company
+from .models import Item, StockMovement, StockMovementReason, StockSnapshot
+
+
+# Lower bound for the movement tail of items that have no snapshot yet.
+LEDGER_START = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def attribute_stock_change(
+    item: Item,
+    user,
+    reason: StockMovementReason = StockMovementReason.ADJUSTMENT,
+) -> None:
+    # Attribution for the movement the Item post_save signal records.
+    item._stock_user = user
+    item._stock_reason = reason
+
+
+def record_item_stock_change(item: Item, previous: dict | None) -> StockMovement | None:
+    delta = item.quantity - (previous["quantity"] if previous is not None else 0)
+    default_reason = (
+        StockMovementReason.INITIAL if previous is None else StockMovementReason.ADJUSTMENT
+    )
+    reason = item.__dict__.pop("_stock_reason", default_reason)
+    user = item.__dict__.pop("_stock_user", None)
+    if not delta:
+        return None
+    return StockMovement.objects.create(
+        company_id=item.company_id,
+        item=item,
+        delta=delta,
+        reason=reason.value,
+        user=user,
+    )
+
+
+def record_stock_movements(
+    company: Company,
+    deltas: Iterable[tuple[int, int]],
+    reason: StockMovementReason,
+    user=None,
+) -> list[StockMovement]:
+    # Ledger rows for writes that bypass Item.save(), such as bulk updates.
+    timestamp = timezone.now()
+    return StockMovement.objects.bulk_create(
+        StockMovement(
+            company=company,
+            item_id=item_id,
+            delta=delta,
+            reason=reason.value,
+            timestamp=timestamp,
+            user=user,
+        )
+        for item_id, delta in deltas
+        if delta
+    )
+
+
+def _latest_snapshot(at: datetime) -> QuerySet:
+    return StockSnapshot.objects.filter(item=OuterRef("pk"), taken_at__lte=at).order_by(
+        "-taken_at")
+
+
+def stock_on_hand(
+    company: Company,
+    at: datetime,
+    item_ids: Iterable[int] | QuerySet | None = None,
+) -> dict[int, int]:
+    # Latest snapshot at or before `at` plus the movements recorded after it.
+    # Both lookups are correlated subqueries served by the (item, time)
+    # indexes, so the cost is bounded by the snapshot interval, not the
+    # ledger size.
+    items = Item.objects.filter(company=company)
+    if item_ids is not None:
+        items = items.filter(pk__in=item_ids)
+
+    items = items.annotate(
+        snapshot_quantity=Subquery(_latest_snapshot(at).values("quantity")[:1]),
+        tail_start=Coalesce(
+            Subquery(_latest_snapshot(at).values("taken_at")[:1]), Value(LEDGER_START)
+        ),
+    )
+    tail = (
+        StockMovement.objects.filter(
+            item=OuterRef("pk"),
+            timestamp__gt=OuterRef("tail_start"),
+            timestamp__lte=at,
+        )
+        .values("item")
+        .annotate(total=Sum("delta"))
+        .values("total")
+    )
+    items = items.annotate(
+        on_hand=Coalesce("snapshot_quantity", 0)
+        + Coalesce(Subquery(tail, output_field=IntegerField()), 0)
+    )
+    return dict(items.values_list("pk", "on_hand"))
+
+
+@transaction.atomic
+def take_stock_snapshots(company: Company, at: datetime | None = None) -> int:
+    at = at or timezone.now()
+    # Items without movements since their last snapshot already have an
+    # empty tail and are skipped.
+    last_snapshot = StockSnapshot.objects.filter(item=OuterRef("pk")).order_by("-taken_at")
+    moved = (
+        Item.objects.filter(company=company)
+        .annotate(
+            last_snapshot_at=Coalesce(
+                Subquery(last_snapshot.values("taken_at")[:1]), Value(LEDGER_START)
+            )
+        )
+        .filter(
+            Exists(
+                StockMovement.objects.filter(
+                    item=OuterRef("pk"),
+                    timestamp__gt=OuterRef("last_snapshot_at"),
+                    timestamp__lte=at,
+                )
+            ),
+            last_snapshot_at__lt=at,
+        )
+        .values("pk")
+    )
+    snapshots = StockSnapshot.objects.bulk_create(
+        [
+            StockSnapshot(item_id=item_id, taken_at=at, quantity=quantity)
+            for item_id, quantity in stock_on_hand(company, at, item_ids=moved).items()
+        ],
+        ignore_conflicts=True,
+    )
+    return len(snapshots)
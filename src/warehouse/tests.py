@@ -1,14 +1,73 @@
+import csv
+import re
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase
-from django.contrib.auth.models import Permission, User
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import Group, Permission, User
 from django.urls import reverse
-from companies.models import Company, Employee
-from .models import Item, ItemType, Manufacturer
+from django.utils import timezone
+from django.utils.html import escape
+from companies.models import Company, CompanyFeature, Employee, Feature
+from .alerts import rebuild_low_stock_alerts
+from .autocomplete import autocomplete
+from .bulk import (
+    BULK_INLINE_MAX_ITEMS, MARKET_VALUE_MAX, bulk_adjust_quantity, bulk_delete, bulk_scale_value, bulk_set_type,
+)
+from .choices import get_item_choices_version, load_item_choices
+from .dashboard import aget_dashboard_data, get_dashboard_data
+from .forms import ItemBulkActionForm, ItemForm
+from .fragments import fragment_cache_key
+from .importers import IMPORT_COLUMNS, ItemImporter
+from .jobs import (
+    JOB_HANDLERS, JOB_MAX_ATTEMPTS, JOB_STALE_AFTER, JobError, claim_job, enqueue_job,
+    reclaim_stale_jobs, run_job, touch_jobs, update_job_progress,
+)
+from .inventory import InventoryTotals, compute_inventory_summary, rebuild_inventory_summary
+from .models import (
+    InventorySummary,
+    Item,
+    ItemCode,
+    ItemType,
+    ItemUnit,
+    ItemUnitStateCount,
+    Job,
+    LowStockAlert,
+    Manufacturer,
+    StockMovement,
+    StockSnapshot,
+    ValuationBucket,
+)
+from .pagination import paginate_keyset
+from .scan import scan_cache
+from .search import SQLiteFTS5SearchBackend, get_search_backend
+from .stock import stock_on_hand, take_stock_snapshots
+from .units import bulk_transition_units, get_unit_state_counts, rebuild_unit_state_counts
+from .valuation import get_valuation_series, record_valuation_buckets
+from .versioning import get_inventory_version
+
+
+def create_company(name: str) -> Company:
+    company = Company.objects.create(name=name)
+    feature, _ = Feature.objects.get_or_create(
+        code="warehouse", defaults={"name": "Warehouse"})
+    CompanyFeature.objects.create(company=company, feature=feature)
+    return company
 
 
 class WarehouseTenantTests(TestCase):
     def setUp(self) -> None:
-        self.company_a = Company.objects.create(name="Company A")
-        self.company_b = Company.objects.create(name="Company B")
+        self.company_a = create_company(name="Company A")
+        self.company_b = create_company(name="Company B")
 
         self.user = User.objects.create_user(
             username="employee-a",
@@ -193,3 +252,1958 @@ class WarehouseTenantTests(TestCase):
         self.assertEqual(response.status_code, 302)
         other_company_item.refresh_from_db()
         self.assertEqual(other_company_item.name, "Hidden Item")
+
+
+class WarehouseDashboardTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.company = create_company(name="Dashboard Co")
+        self.other_company = create_company(name="Other Co")
+
+        self.user = User.objects.create_user(
+            username="dashboard-user",
+            password="strong-password-123",
+        )
+        Employee.objects.create(user=self.user, company=self.company)
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="view_financial_dashboard"),
+        )
+        self.client.login(username="dashboard-user", password="strong-password-123")
+
+        plc = ItemType.objects.create(name="PLC", company=self.company)
+        sensor = ItemType.objects.create(name="Sensor", company=self.company)
+        maker = Manufacturer.objects.create(name="Maker", company=self.company)
+        other_type = ItemType.objects.create(name="PLC", company=self.other_company)
+        other_maker = Manufacturer.objects.create(
+            name="Maker", company=self.other_company
+        )
+
+        Item.objects.create(
+            company=self.company, name="CPU", type=plc, manufacturer=maker,
+            model="C-1", quantity=2, market_value="100.00",
+        )
+        Item.objects.create(
+            company=self.company, name="IO", type=plc, manufacturer=maker,
+            model="I-1", quantity=3, market_value="10.50",
+        )
+        Item.objects.create(
+            company=self.company, name="Probe", type=sensor, manufacturer=maker,
+            model="P-1", quantity=4, market_value="5.00",
+        )
+        Item.objects.create(
+            company=self.other_company, name="Hidden", type=other_type,
+            manufacturer=other_maker, model="H-1", quantity=99,
+            market_value="1000.00",
+        )
+
+    def test_dashboard_data_is_aggregated_per_company(self) -> None:
+        data = get_dashboard_data(self.company)
+
+        self.assertEqual(data["item_count"], 3)
+        self.assertEqual(data["total_quantity"], 9)
+        self.assertEqual(data["total_value"], Decimal("251.50"))
+        self.assertEqual(
+            [(row["label"], row["quantity"], row["value"])
+             for row in data["charts"]["by_type"]],
+            [("PLC", 5, Decimal("231.50")), ("Sensor", 4, Decimal("20.00"))],
+        )
+        self.assertEqual(
+            [(row["label"], row["quantity"])
+             for row in data["charts"]["by_manufacturer"]],
+            [("Maker", 9)],
+        )
+        self.assertEqual(data["recent_items"][0].name, "Probe")
+
+    def test_dashboard_page_ships_only_aggregates(self) -> None:
+        response = self.client.get(reverse("warehouse:home"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["dashboard"]["item_count"], 3)
+        self.assertContains(response, 'id="dashboard-data"')
+        self.assertNotContains(response, "items-data")
+        self.assertNotContains(response, "Hidden")
+
+    def test_async_dashboard_data_matches_sync_aggregates(self) -> None:
+        ItemUnit.objects.create(item=Item.objects.get(name="CPU"), state="new")
+        ItemUnit.objects.create(item=Item.objects.get(name="IO"), state="used")
+
+        data = async_to_sync(aget_dashboard_data)(self.company)
+        expected = get_dashboard_data(self.company)
+
+        for key in ("item_count", "total_quantity", "total_value", "charts", "valuation_start"):
+            self.assertEqual(data[key], expected[key])
+        self.assertEqual(data["recent_items"], expected["recent_items"])
+        self.assertEqual(data["units"], {"new": 1, "used": 1, "damaged": 0, "sold": 0})
+
+    async def test_dashboard_data_endpoint_serves_company_aggregates(self) -> None:
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse("warehouse:dashboard_data"))
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["item_count"], 3)
+        self.assertEqual(payload["total_value"], "251.50")
+        self.assertEqual(
+            [row["label"] for row in payload["charts"]["by_type"]], ["PLC", "Sensor"])
+        self.assertNotIn("Hidden", [item["name"] for item in payload["recent_items"]])
+
+    def test_dashboard_data_endpoint_requires_financial_permission(self) -> None:
+        self.user.user_permissions.clear()
+
+        response = self.client.get(reverse("warehouse:dashboard_data"))
+
+        self.assertEqual(response.status_code, 403)
+
+
+class InventorySummaryTests(TestCase):
+    def setUp(self) -> None:
+        self.company = create_company(name="Summary Co")
+        self.plc = ItemType.objects.create(name="PLC", company=self.company)
+        self.hmi = ItemType.objects.create(name="HMI", company=self.company)
+        self.maker = Manufacturer.objects.create(name="Maker", company=self.company)
+        self.item = Item.objects.create(
+            company=self.company, name="CPU", type=self.plc, manufacturer=self.maker,
+            model="C-1", quantity=2, market_value="100.00",
+        )
+
+    def summary_totals(self) -> dict:
+        return {
+            (summary.type_id, summary.manufacturer_id): InventoryTotals(
+                summary.item_count, summary.total_quantity, summary.total_value
+            )
+            for summary in InventorySummary.objects.filter(company=self.company)
+            if summary.item_count
+        }
+
+    def assertSummaryMatchesItems(self) -> None:
+        self.assertEqual(self.summary_totals(), compute_inventory_summary(self.company))
+
+    def test_summary_tracks_create_update_and_delete(self) -> None:
+        self.assertEqual(
+            self.summary_totals()[(None, None)],
+            InventoryTotals(1, 2, Decimal("200.00")),
+        )
+
+        self.item.quantity = 5
+        self.item.market_value = Decimal("10.00")
+        self.item.save()
+        self.assertSummaryMatchesItems()
+
+        self.item.type = self.hmi
+        self.item.save()
+        self.assertSummaryMatchesItems()
+        self.assertNotIn((self.plc.id, None), self.summary_totals())
+
+        self.item.delete()
+        self.assertEqual(
+            self.summary_totals(),
+            {},
+        )
+
+    def test_rebuild_command_reports_and_fixes_drift(self) -> None:
+        InventorySummary.objects.filter(
+            company=self.company, type__isnull=True, manufacturer__isnull=True
+        ).update(total_quantity=999)
+
+        output = StringIO()
+        call_command("rebuild_inventory_summary", "--dry-run", stdout=output)
+        self.assertIn("1 drifted summary row(s) found.", output.getvalue())
+        self.assertEqual(self.summary_totals()[(None, None)].total_quantity, 999)
+
+        output = StringIO()
+        call_command("rebuild_inventory_summary", stdout=output)
+        self.assertIn("Inventory summary rebuilt.", output.getvalue())
+        self.assertSummaryMatchesItems()
+
+        output = StringIO()
+        call_command("rebuild_inventory_summary", stdout=output)
+        self.assertNotIn("drifted", output.getvalue())
+
+
+class ItemListPaginationTests(TestCase):
+    def setUp(self) -> None:
+        self.company = create_company(name="Paging Co")
+        self.user = User.objects.create_user(
+            username="paging-user",
+            password="strong-password-123",
+        )
+        Employee.objects.create(user=self.user, company=self.company)
+        self.user.user_permissions.add(Permission.objects.get(codename="view_item"))
+        self.client.login(username="paging-user", password="strong-password-123")
+
+        self.plc = ItemType.objects.create(name="PLC", company=self.company)
+        self.sensor = ItemType.objects.create(name="Sensor", company=self.company)
+        maker = Manufacturer.objects.create(name="Maker", company=self.company)
+        for index, (name, quantity) in enumerate(
+            [("Alpha", 5), ("Bravo", 1), ("Charlie", 5), ("Delta", 9), ("Echo", 3)]
+        ):
+            Item.objects.create(
+                company=self.company,
+                name=name,
+                type=self.plc if index % 2 == 0 else self.sensor,
+                manufacturer=maker,
+                model=f"M-{index}",
+                quantity=quantity,
+                market_value="10.00",
+            )
+
+    def test_keyset_pages_forward_and_back(self) -> None:
+        queryset = Item.objects.filter(company=self.company)
+
+        first = paginate_keyset(queryset, "-quantity", None, 2, salt="test")
+        self.assertEqual([item.name for item in first.object_list], ["Delta", "Charlie"])
+        self.assertFalse(first.has_previous)
+
+        second = paginate_keyset(queryset, "-quantity", first.next_cursor, 2, salt="test")
+        self.assertEqual([item.name for item in second.object_list], ["Alpha", "Echo"])
+
+        third = paginate_keyset(queryset, "-quantity", second.next_cursor, 2, salt="test")
+        self.assertEqual([item.name for item in third.object_list], ["Bravo"])
+        self.assertFalse(third.has_next)
+
+        back = paginate_keyset(queryset, "-quantity", third.previous_cursor, 2, salt="test")
+        self.assertEqual([item.name for item in back.object_list], ["Alpha", "Echo"])
+        self.assertTrue(back.has_previous)
+        self.assertTrue(back.has_next)
+
+    def test_invalid_or_mismatched_cursor_falls_back_to_first_page(self) -> None:
+        queryset = Item.objects.filter(company=self.company)
+        first = paginate_keyset(queryset, "name", None, 2, salt="test")
+
+        tampered = paginate_keyset(queryset, "name", "garbage", 2, salt="test")
+        other_sort = paginate_keyset(queryset, "-name", first.next_cursor, 2, salt="test")
+
+        self.assertEqual(tampered.object_list, first.object_list)
+        self.assertEqual(other_sort.object_list[0].name, "Echo")
+
+    def test_items_view_filters_and_paginates(self) -> None:
+        with patch("warehouse.views.ITEMS_PAGE_SIZE", 1):
+            response = self.client.get(
+                reverse("warehouse:items"),
+                {"type": self.plc.id, "min_quantity": 4, "sort": "name"},
+            )
+            self.assertEqual([item.name for item in response.context["items"]], ["Alpha"])
+            next_page_url = response.context["next_page_url"]
+            self.assertIsNotNone(next_page_url)
+
+            response = self.client.get(reverse("warehouse:items") + next_page_url)
+            self.assertEqual([item.name for item in response.context["items"]], ["Charlie"])
+            self.assertIsNone(response.context["next_page_url"])
+            self.assertIsNotNone(response.context["previous_page_url"])
+
+    def test_items_view_rejects_inverted_quantity_range(self) -> None:
+        response = self.client.get(
+            reverse("warehouse:items"), {"min_quantity": 9, "max_quantity": 1}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["filter_form"].errors)
+        self.assertEqual(len(response.context["items"]), 5)
+
+
+class ItemInlineEditTests(TestCase):
+    def setUp(self) -> None:
+        self.company = create_company(name="Edit Co")
+        self.other_company = create_company(name="Other Edit Co")
+        self.user = User.objects.create_user(
+            username="edit-user",
+            password="strong-password-123",
+        )
+        Employee.objects.create(user=self.user, company=self.company)
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="view_item"),
+            Permission.objects.get(codename="change_item"),
+        )
+        self.client.login(username="edit-user", password="strong-password-123")
+
+        self.item_type = ItemType.objects.create(name="PLC", company=self.company)
+        self.maker = Manufacturer.objects.create(name="Maker", company=self.company)
+        self.item = self.create_item("First")
+        other_type = ItemType.objects.create(name="PLC", company=self.other_company)
+        other_maker = Manufacturer.objects.create(
+            name="Maker", company=self.other_company
+        )
+        self.other_item = Item.objects.create(
+            company=self.other_company, name="Other", type=other_type,
+            manufacturer=other_maker, model="O-1", quantity=1, market_value="1.00",
+        )
+
+    def create_item(self, name: str) -> Item:
+        return Item.objects.create(
+            company=self.company, name=name, type=self.item_type,
+            manufacturer=self.maker, model="M-1", quantity=1, market_value="1.00",
+        )
+
+    def test_items_page_renders_rows_without_edit_forms(self) -> None:
+        response = self.client.get(reverse("warehouse:items"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context["item_rows"][0]["edit_form"])
+        self.assertNotContains(response, "Salvar alterações")
+        self.assertContains(
+            response, reverse("warehouse:item_edit_form", args=[self.item.id])
+        )
+
+    def test_items_page_query_count_does_not_grow_with_rows(self) -> None:
+        self.client.get(reverse("warehouse:items"))
+        with CaptureQueriesContext(connection) as single_row:
+            self.client.get(reverse("warehouse:items"))
+
+        for index in range(10):
+            self.create_item(f"Extra {index}")
+        with self.assertNumQueries(len(single_row)):
+            self.client.get(reverse("warehouse:items"))
+
+    def test_edit_query_parameter_renders_single_form(self) -> None:
+        second = self.create_item("Second")
+        response = self.client.get(reverse("warehouse:items"), {"edit": second.id})
+
+        forms_by_item = {
+            row["item"].id: row["edit_form"] for row in response.context["item_rows"]
+        }
+        self.assertIsNone(forms_by_item[self.item.id])
+        self.assertIsNotNone(forms_by_item[second.id])
+
+    def test_invalid_edit_on_a_later_page_keeps_the_list_query(self) -> None:
+        second = self.create_item("Second")
+        with patch("warehouse.views.ITEMS_PAGE_SIZE", 1):
+            next_page_url = self.client.get(
+                reverse("warehouse:items"), {"sort": "name"}).context["next_page_url"]
+            page_url = reverse("warehouse:items") + next_page_url
+            page = self.client.get(page_url)
+            self.assertEqual([row["item"].id for row in page.context["item_rows"]], [second.id])
+            self.assertEqual(
+                page.context["item_rows"][0]["edit_url"], f"{next_page_url}&edit={second.id}")
+
+            fragment = self.client.get(
+                reverse("warehouse:item_edit_form", args=[second.id]) + next_page_url)
+            self.assertContains(fragment, f'action="{escape(page_url)}"')
+
+            response = self.client.post(page_url, {
+                "action": "update_item",
+                "item_id": second.id,
+                f"edit-{second.id}-name": "",
+                f"edit-{second.id}-type": self.item_type.id,
+                f"edit-{second.id}-manufacturer": self.maker.id,
+                f"edit-{second.id}-model": "M-1",
+                f"edit-{second.id}-quantity": 1,
+                f"edit-{second.id}-market_value": "1.00",
+            })
+
+        self.assertEqual(response.status_code, 200)
+        edit_form = response.context["item_rows"][0]["edit_form"]
+        self.assertTrue(edit_form.errors)
+        self.assertContains(response, "is-invalid")
+
+    def test_edit_form_fragment(self) -> None:
+        response = self.client.get(
+            reverse("warehouse:item_edit_form", args=[self.item.id])
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f'name="edit-{self.item.id}-name"')
+        self.assertContains(response, "Salvar alterações")
+        self.assertNotContains(response, "<html")
+
+    def test_edit_form_fragment_is_company_scoped_and_requires_permission(self) -> None:
+        response = self.client.get(
+            reverse("warehouse:item_edit_form", args=[self.other_item.id])
+        )
+        self.assertEqual(response.status_code, 404)
+
+        self.user.user_permissions.remove(
+            Permission.objects.get(codename="change_item"),
+        )
+        response = self.client.get(
+            reverse("warehouse:item_edit_form", args=[self.item.id])
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class ItemChoicesCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.company = create_company(name="Choices Co")
+        self.other_company = create_company(name="Other Choices Co")
+        self.item_type = ItemType.objects.create(name="PLC", company=self.company)
+        self.maker = Manufacturer.objects.create(name="Maker", company=self.company)
+        ItemType.objects.create(name="Hidden", company=self.other_company)
+
+    def test_choices_are_cached_per_company(self) -> None:
+        choices = load_item_choices(self.company)
+        self.assertEqual(choices.types, [("", "---------"), (self.item_type.id, "PLC")])
+        self.assertEqual(
+            choices.manufacturers, [("", "---------"), (self.maker.id, "Maker")]
+        )
+
+        with self.assertNumQueries(0):
+            form = ItemForm(company=self.company)
+            rendered_choices = list(form.fields["type"].choices)
+        self.assertEqual(rendered_choices, choices.types)
+
+    def test_item_type_and_manufacturer_writes_invalidate_choices(self) -> None:
+        load_item_choices(self.company)
+
+        sensor = ItemType.objects.create(name="Sensor", company=self.company)
+        self.assertIn((sensor.id, "Sensor"), load_item_choices(self.company).types)
+
+        self.maker.name = "Renamed Maker"
+        self.maker.save()
+        self.assertIn(
+            (self.maker.id, "Renamed Maker"),
+            load_item_choices(self.company).manufacturers,
+        )
+
+        sensor.delete()
+        self.assertNotIn((sensor.id, "Sensor"), load_item_choices(self.company).types)
+
+    def test_choice_version_is_bumped_again_on_commit(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            ItemType.objects.create(name="Servo", company=self.company)
+            version = get_item_choices_version(self.company.id)
+        self.assertNotEqual(get_item_choices_version(self.company.id), version)
+
+    def test_cached_choices_still_validate_against_company(self) -> None:
+        other_type = ItemType.objects.get(company=self.other_company)
+        form = ItemForm(
+            data={
+                "name": "Item",
+                "type": other_type.id,
+                "manufacturer": self.maker.id,
+                "model": "M-1",
+                "quantity": 1,
+                "market_value": "1.00",
+            },
+            company=self.company,
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("type", form.errors)
+
+
+class ItemSearchTests(TestCase):
+    def setUp(self) -> None:
+        self.company = create_company(name="Search Co")
+        self.other_company = create_company(name="Other Search Co")
+        self.user = User.objects.create_user(
+            username="search-user",
+            password="strong-password-123",
+        )
+        Employee.objects.create(user=self.user, company=self.company)
+        self.user.user_permissions.add(Permission.objects.get(codename="view_item"))
+        self.client.login(username="search-user", password="strong-password-123")
+
+        plc = ItemType.objects.create(name="PLC", company=self.company)
+        maker = Manufacturer.objects.create(name="Siemens", company=self.company)
+        self.cpu = Item.objects.create(
+            company=self.company, name="CPU compacta", type=plc, manufacturer=maker,
+            model="S7-200", quantity=3, market_value="500.00",
+        )
+        self.module = Item.objects.create(
+            company=self.company, name="Módulo de expansão", type=plc,
+            manufacturer=maker, model="EM-231",
+            description="Expansão analógica para S7-200", quantity=1,
+            market_value="150.00",
+        )
+        other_type = ItemType.objects.create(name="PLC", company=self.other_company)
+        other_maker = Manufacturer.objects.create(
+            name="Siemens", company=self.other_company
+        )
+        Item.objects.create(
+            company=self.other_company, name="Hidden CPU", type=other_type,
+            manufacturer=other_maker, model="S7-200", quantity=1,
+            market_value="1.00",
+        )
+
+    def search(self, query: str, **params) -> dict:
+        response = self.client.get(
+            reverse("warehouse:search_items"), {"q": query, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_backend_is_sqlite_fts5(self) -> None:
+        self.assertIsInstance(get_search_backend(), SQLiteFTS5SearchBackend)
+
+    def test_search_ranks_model_matches_first_and_is_company_scoped(self) -> None:
+        data = self.search("S7-200")
+
+        self.assertEqual(
+            [result["id"] for result in data["results"]],
+            [self.cpu.id, self.module.id],
+        )
+        self.assertFalse(data["has_next"])
+
+    def test_search_matches_the_tenant_token_in_the_index(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            self.search("CPU")
+        search_sql = [query["sql"] for query in queries if "warehouse_item_search" in query["sql"]]
+        self.assertEqual(len(search_sql), 1)
+        self.assertNotIn("company_id", search_sql[0])
+        self.assertIn(f'company : "c{self.company.id}"', search_sql[0])
+
+        self.assertEqual(self.search(f"c{self.company.id}")["results"], [])
+
+    def test_search_matches_prefixes_and_ignores_accents(self) -> None:
+        self.assertEqual(
+            [result["id"] for result in self.search("modulo expan")["results"]],
+            [self.module.id],
+        )
+
+    def test_search_index_follows_item_writes(self) -> None:
+        self.cpu.model = "S7-1200"
+        self.cpu.save()
+        self.assertEqual(
+            [result["id"] for result in self.search("S7-1200")["results"]],
+            [self.cpu.id],
+        )
+
+        self.module.delete()
+        self.assertEqual(self.search("EM-231")["results"], [])
+
+    def test_search_paginates(self) -> None:
+        first = self.search("S7", page_size=1)
+        second = self.search("S7", page_size=1, page=2)
+
+        self.assertTrue(first["has_next"])
+        self.assertFalse(second["has_next"])
+        self.assertNotEqual(first["results"][0]["id"], second["results"][0]["id"])
+
+    def test_search_with_fts_syntax_characters_does_not_fail(self) -> None:
+        self.assertEqual(self.search('"unbalanced AND (')["results"], [])
+
+    def test_search_requires_view_permission(self) -> None:
+        self.user.user_permissions.clear()
+        response = self.client.get(reverse("warehouse:search_items"), {"q": "S7"})
+        self.assertEqual(response.status_code, 403)
+
+
+class ItemImportTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.company = create_company(name="Import Co")
+        self.other_company = create_company(name="Other Import Co")
+        self.existing_type = ItemType.objects.create(name="PLC", company=self.company)
+        self.maker = Manufacturer.objects.create(name="Siemens", company=self.company)
+        self.existing = Item.objects.create(
+            company=self.company, name="Existing", type=self.existing_type,
+            manufacturer=self.maker, model="E-1", quantity=1, market_value="10.00",
+        )
+        other_type = ItemType.objects.create(name="PLC", company=self.other_company)
+        other_maker = Manufacturer.objects.create(
+            name="Siemens", company=self.other_company
+        )
+        self.foreign = Item.objects.create(
+            company=self.other_company, name="Foreign", type=other_type,
+            manufacturer=other_maker, model="F-1", quantity=1, market_value="1.00",
+        )
+
+    @staticmethod
+    def csv_lines(*rows: str) -> list[str]:
+        header = "id,name,type,manufacturer,model,quantity,market_value,description"
+        return [f"{line}\n" for line in (header, *rows)]
+
+    def test_csv_import_creates_updates_and_reports_errors(self) -> None:
+        report = ItemImporter(self.company, batch_size=2).run(self.csv_lines(
+            ",CPU,PLC,Siemens,S7-200,4,500.00,",
+            ",Sensor,Sensor,Balluff,BES-1,10,35.50,Indutivo",
+            f"{self.existing.id},Existing renamed,PLC,Siemens,E-2,7,12.00,",
+            ",Broken,PLC,Siemens,B-1,many,1.00,",
+            f"{self.foreign.id},Hijack,PLC,Siemens,H-1,1,1.00,",
+        ))
+
+        self.assertEqual((report.created, report.updated, report.error_count), (2, 1, 2))
+        self.assertEqual(
+            [(error.line, list(error.errors)) for error in report.errors],
+            [(5, ["quantity"]), (6, ["id"])],
+        )
+
+        sensor = Item.objects.get(company=self.company, name="Sensor")
+        self.assertEqual(sensor.type.name, "Sensor")
+        self.assertEqual(sensor.manufacturer.name, "Balluff")
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.name, self.existing.quantity), ("Existing renamed", 7))
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.name, "Foreign")
+
+        self.assertEqual(
+            dict(compute_inventory_summary(self.company)),
+            {
+                (summary.type_id, summary.manufacturer_id): InventoryTotals(
+                    summary.item_count, summary.total_quantity, summary.total_value
+                )
+                for summary in InventorySummary.objects.filter(company=self.company)
+            },
+        )
+        self.assertIn(
+            (sensor.type_id, "Sensor"), load_item_choices(self.company).types
+        )
+        self.assertEqual(
+            get_search_backend().search(self.company, "BES-1", 10, 0).item_ids,
+            [sensor.id],
+        )
+
+    def test_lookups_are_batched_per_chunk(self) -> None:
+        def import_rows(count: int) -> int:
+            rows = [f",Item {index},T{index},M{index},X-{index},1,1.00," for index in range(count)]
+            with CaptureQueriesContext(connection) as queries:
+                ItemImporter(self.company, batch_size=100).run(self.csv_lines(*rows))
+            return len(queries)
+
+        self.assertEqual(import_rows(3), import_rows(30))
+
+    def test_jsonl_import_reports_invalid_lines(self) -> None:
+        report = ItemImporter(self.company).run([
+            '{"name": "Json", "type": "PLC", "manufacturer": "Siemens", '
+            '"model": "J-1", "quantity": 2, "market_value": "3.00"}\n',
+            "not json\n",
+            "[1, 2]\n",
+        ], file_format="jsonl")
+
+        self.assertEqual((report.created, report.error_count), (1, 2))
+        self.assertEqual([error.line for error in report.errors], [2, 3])
+
+    def test_updates_require_change_permission(self) -> None:
+        report = ItemImporter(self.company, allow_updates=False).run(self.csv_lines(
+            f"{self.existing.id},Existing renamed,PLC,Siemens,E-2,7,12.00,",
+        ))
+        self.assertEqual((report.updated, report.error_count), (0, 1))
+
+    def test_upload_view_imports_file(self) -> None:
+        user = User.objects.create_user(username="importer", password="strong-password-123")
+        Employee.objects.create(user=user, company=self.company)
+        user.user_permissions.add(Permission.objects.get(codename="add_item"))
+        self.client.login(username="importer", password="strong-password-123")
+
+        upload = SimpleUploadedFile(
+            "items.csv",
+            "".join(self.csv_lines(",Uploaded,PLC,Siemens,U-1,1,9.90,")).encode(),
+            content_type="text/csv",
+        )
+        job_files = Path(tempfile.mkdtemp())
+        with self.settings(WAREHOUSE_JOB_FILES_DIR=job_files):
+            response = self.client.post(
+                reverse("warehouse:import_items"),
+                {"file": upload, "file_format": "csv"},
+            )
+            self.assertEqual(response.status_code, 302)
+            self.assertFalse(Item.objects.filter(company=self.company, name="Uploaded").exists())
+            self.assertEqual(self.client.get(response.url).context["job"].status, "queued")
+
+            run_job(claim_job("test-worker"))
+
+        response = self.client.get(response.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["report"]["created"], 1)
+        self.assertTrue(Item.objects.filter(company=self.company, name="Uploaded").exists())
+        self.assertEqual(list(job_files.iterdir()), [])
+
+    def test_import_command(self) -> None:
+        path = Path(tempfile.mkdtemp()) / "items.csv"
+        path.write_text("".join(self.csv_lines(",Command,PLC,Siemens,C-1,1,1.00,")))
+
+        output = StringIO()
+        call_command("import_items", self.company.id, str(path), stdout=output)
+
+        self.assertIn("1 created, 0 updated, 0 rejected", output.getvalue())
+
+    def test_import_command_keeps_summary_when_decoding_fails_midway(self) -> None:
+        path = Path(tempfile.mkdtemp()) / "items.csv"
+        # Far enough past the first decoded block that earlier chunks commit.
+        rows = [f",Bulk {index},PLC,Siemens,B-{index},2,1.00," for index in range(2000)]
+        path.write_bytes(
+            "".join(self.csv_lines(*rows)).encode() + b",Bad \xff,PLC,Siemens,X,1,1.00,\n"
+        )
+
+        with self.assertRaisesMessage(CommandError, "UTF-8"):
+            call_command(
+                "import_items", self.company.id, str(path), "--batch-size", "100",
+                stdout=StringIO(),
+            )
+
+        self.assertGreater(Item.objects.filter(company=self.company).count(), 1)
+        self.assertEqual(rebuild_inventory_summary(self.company, dry_run=True), [])
+
+
+class ItemExportTests(TestCase):
+    def setUp(self) -> None:
+        self.company = create_company(name="Export Co")
+        other_company = create_company(name="Other Export Co")
+        self.user = User.objects.create_user(username="exporter", password="strong-password-123")
+        Employee.objects.create(user=self.user, company=self.company)
+        self.user.user_permissions.add(Permission.objects.get(codename="view_item"))
+
+        plc = ItemType.objects.create(name="PLC", company=self.company)
+        sensor = ItemType.objects.create(name="Sensor", company=self.company)
+        siemens = Manufacturer.objects.create(name="Siemens", company=self.company)
+        self.items = [
+            Item.objects.create(
+                company=self.company, name="CPU", type=plc, manufacturer=siemens,
+                model="S7-200", quantity=4, market_value="500.00", description="Linha, 1",
+            ),
+            Item.objects.create(
+                company=self.company, name="Sensor", type=sensor, manufacturer=siemens,
+                model="BES-1", quantity=10, market_value="35.50",
+            ),
+        ]
+        Item.objects.create(
+            company=other_company, name="Foreign",
+            type=ItemType.objects.create(name="PLC", company=other_company),
+            manufacturer=Manufacturer.objects.create(name="Siemens", company=other_company),
+            model="F-1", quantity=1, market_value="1.00",
+        )
+        self.client.login(username="exporter", password="strong-password-123")
+
+    def export(self, **params) -> list[list[str]]:
+        response = self.client.get(reverse("warehouse:export_items"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode()
+        return list(csv.reader(StringIO(content)))
+
+    def test_export_streams_company_items_in_import_format(self) -> None:
+        rows = self.export()
+
+        self.assertEqual(rows[0], list(IMPORT_COLUMNS))
+        self.assertEqual(rows[1:], [
+            [str(self.items[0].id), "CPU", "PLC", "Siemens", "S7-200", "4", "500.00", "Linha, 1"],
+            [str(self.items[1].id), "Sensor", "Sensor", "Siemens", "BES-1", "10", "35.50", ""],
+        ])
+
+    def test_export_applies_list_filters_and_sort(self) -> None:
+        rows = self.export(min_quantity=5)
+        self.assertEqual([row[1] for row in rows[1:]], ["Sensor"])
+
+        rows = self.export(sort="-quantity")
+        self.assertEqual([row[1] for row in rows[1:]], ["Sensor", "CPU"])
+
+    def test_export_round_trips_through_importer(self) -> None:
+        response = self.client.get(reverse("warehouse:export_items"))
+        content = b"".join(response.streaming_content).decode()
+
+        report = ItemImporter(self.company).run(StringIO(content))
+
+        self.assertEqual((report.created, report.updated, report.error_count), (0, 2, 0))
+
+    def test_export_requires_view_permission(self) -> None:
+        self.user.user_permissions.clear()
+        response = self.client.get(reverse("warehouse:export_items"))
+        self.assertEqual(response.status_code, 403)
+
+
+class ItemBulkActionTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.company = create_company(name="Bulk Co")
+        self.other_company = create_company(name="Other Bulk Co")
+        self.plc = ItemType.objects.create(name="PLC", company=self.company)
+        self.sensor = ItemType.objects.create(name="Sensor", company=self.company)
+        self.siemens = Manufacturer.objects.create(name="Siemens", company=self.company)
+        self.items = [
+            Item.objects.create(
+                company=self.company, name=f"Item {index}", type=self.plc,
+                manufacturer=self.siemens, model=f"M-{index}", quantity=10,
+                market_value="100.00",
+            )
+            for index in range(3)
+        ]
+        self.foreign = Item.objects.create(
+            company=self.other_company, name="Foreign",
+            type=ItemType.objects.create(name="PLC", company=self.other_company),
+            manufacturer=Manufacturer.objects.create(name="Siemens", company=self.other_company),
+            model="F-1", quantity=10, market_value="100.00",
+        )
+        self.item_ids = [item.id for item in self.items[:2]] + [self.foreign.id]
+
+    def assert_summary_matches_items(self) -> None:
+        self.assertEqual(
+            rebuild_inventory_summary(self.company, dry_run=True), []
+        )
+
+    def test_update_actions_are_company_scoped_single_updates(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            updated = bulk_adjust_quantity(self.company, self.item_ids, -3)
+        self.assertEqual(updated, 2)
+        self.assertEqual(
+            len([query for query in queries if query["sql"].startswith('UPDATE "warehouse_item"')]),
+            1,
+        )
+
+        self.assertEqual(bulk_scale_value(self.company, self.item_ids, Decimal("12.5")), 2)
+        self.assertEqual(bulk_set_type(self.company, self.item_ids, self.sensor), 2)
+
+        self.items[0].refresh_from_db()
+        self.items[2].refresh_from_db()
+        self.foreign.refresh_from_db()
+        self.assertEqual(
+            (self.items[0].quantity, self.items[0].market_value, self.items[0].type),
+            (7, Decimal("112.50"), self.sensor),
+        )
+        self.assertEqual((self.items[2].quantity, self.items[2].type), (10, self.plc))
+        self.assertEqual((self.foreign.quantity, self.foreign.market_value), (10, Decimal("100.00")))
+        self.assert_summary_matches_items()
+
+    def test_scale_value_rejects_overflowing_market_values(self) -> None:
+        Item.objects.filter(pk=self.items[0].pk).update(market_value=MARKET_VALUE_MAX)
+
+        with self.assertRaises(ValueError):
+            bulk_scale_value(self.company, self.item_ids, Decimal("10"))
+        self.assertEqual(bulk_scale_value(self.company, self.item_ids, Decimal("-10")), 2)
+
+        form = ItemBulkActionForm({
+            "bulk_action": "scale_value", "value_percent": "5000", "item_ids": self.item_ids,
+        }, company=self.company)
+        self.assertIn("value_percent", form.errors)
+
+    def test_set_type_rejects_foreign_type(self) -> None:
+        with self.assertRaises(ValueError):
+            bulk_set_type(self.company, self.item_ids, self.foreign.type)
+
+    def test_bulk_delete_removes_items_units_and_index_entries(self) -> None:
+        ItemUnit.objects.create(item=self.items[0], state="new")
+
+        deleted = bulk_delete(self.company, self.item_ids)
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(
+            list(Item.objects.filter(company=self.company)), [self.items[2]]
+        )
+        self.assertFalse(ItemUnit.objects.exists())
+        self.assertTrue(Item.objects.filter(pk=self.foreign.pk).exists())
+        self.assertEqual(
+            get_search_backend().search(self.company, "M-0", 10, 0).item_ids, []
+        )
+        self.assert_summary_matches_items()
+
+    def test_bulk_delete_query_count_does_not_grow_with_selection(self) -> None:
+        def create_items(count: int) -> list[int]:
+            ids = []
+            for index in range(count):
+                item = Item.objects.create(
+                    company=self.company, name=f"Bulk {index}", type=self.plc,
+                    manufacturer=self.siemens, model=f"B-{index}", quantity=1,
+                    market_value="1.00",
+                )
+                ItemUnit.objects.bulk_create(
+                    ItemUnit(item=item, state="new") for _ in range(5))
+                ItemCode.objects.create(company=self.company, item=item, code=f"B-{index}")
+                ids.append(item.id)
+            return ids
+
+        ids = create_items(1)
+        with CaptureQueriesContext(connection) as single:
+            self.assertEqual(bulk_delete(self.company, ids), 1)
+        ids = create_items(20)
+        with self.assertNumQueries(len(single)):
+            self.assertEqual(bulk_delete(self.company, ids), 20)
+        self.assertFalse(ItemUnit.objects.filter(item_id__in=ids).exists())
+        self.assertFalse(ItemCode.objects.filter(item_id__in=ids).exists())
+        self.assert_summary_matches_items()
+
+    def test_items_view_runs_bulk_action_with_permissions(self) -> None:
+        user = User.objects.create_user(username="bulk", password="strong-password-123")
+        Employee.objects.create(user=user, company=self.company)
+        user.user_permissions.add(
+            Permission.objects.get(codename="view_item"),
+            Permission.objects.get(codename="change_item"),
+        )
+        self.client.login(username="bulk", password="strong-password-123")
+        url = reverse("warehouse:items")
+
+        response = self.client.post(url, {
+            "action": "bulk_action", "bulk_action": "set_manufacturer",
+            "item_ids": self.item_ids,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("manufacturer", response.context["bulk_form"].errors)
+
+        response = self.client.post(url, {
+            "action": "bulk_action", "bulk_action": "adjust_quantity",
+            "quantity_delta": 5, "item_ids": self.item_ids,
+        }, follow=True)
+        self.assertContains(response, "2 item(ns) afetado(s).")
+        self.assertEqual(
+            list(Item.objects.filter(pk__in=self.item_ids).order_by("id").values_list("quantity", flat=True)),
+            [15, 15, 10],
+        )
+
+        response = self.client.post(url, {
+            "action": "bulk_action", "bulk_action": "delete", "item_ids": self.item_ids,
+        })
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Item.objects.filter(company=self.company).count(), 3)
+
+    def test_items_view_applies_bulk_action_to_all_filtered_items(self) -> None:
+        user = User.objects.create_user(username="bulk-all", password="strong-password-123")
+        Employee.objects.create(user=user, company=self.company)
+        user.user_permissions.add(
+            Permission.objects.get(codename="view_item"),
+            Permission.objects.get(codename="change_item"),
+        )
+        self.client.login(username="bulk-all", password="strong-password-123")
+        sensors = Item.objects.bulk_create(
+            Item(
+                company=self.company, name=f"Sensor {index}", type=self.sensor,
+                manufacturer=self.siemens, model=f"S-{index}", quantity=1,
+                market_value="1.00",
+            )
+            for index in range(BULK_INLINE_MAX_ITEMS + 50)
+        )
+
+        filtered_url = f"{reverse('warehouse:items')}?type={self.sensor.id}&sort=-name"
+        response = self.client.post(filtered_url, {
+            "action": "bulk_action", "bulk_action": "adjust_quantity",
+            "quantity_delta": 2, "select_all": "on",
+            "filter_query": f"type={self.sensor.id}&cursor=ignored",
+        })
+
+        self.assertRedirects(response, filtered_url, fetch_redirect_response=False)
+        job = Job.objects.get(company=self.company, kind="bulk_action")
+        self.assertEqual(job.payload["item_ids"], sorted(item.id for item in sensors))
+
+        response = self.client.post(reverse("warehouse:items"), {
+            "action": "bulk_action", "bulk_action": "adjust_quantity",
+            "quantity_delta": 2, "select_all": "on",
+            "filter_query": f"type={self.sensor.id}&min_quantity=5&max_quantity=1",
+        })
+        self.assertIn("filter_query", response.context["bulk_form"].errors)
+
+
+class ItemUnitStateCountTests(TestCase):
+    def setUp(self) -> None:
+        self.company = create_company(name="Units Co")
+        self.other_company = create_company(name="Other Units Co")
+        self.item = self.create_item(self.company, "Drive")
+        self.other_item = self.create_item(self.company, "Motor")
+        self.foreign_item = self.create_item(self.other_company, "Foreign")
+
+    @staticmethod
+    def create_item(company: Company, name: str) -> Item:
+        return Item.objects.create(
+            company=company, name=name,
+            type=ItemType.objects.get_or_create(name="PLC", company=company)[0],
+            manufacturer=Manufacturer.objects.get_or_create(name="Siemens", company=company)[0],
+            model="X", quantity=1, market_value="1.00",
+        )
+
+    def counts(self, item: Item) -> dict[str, int]:
+        return {state: count for state, count in get_unit_state_counts(item).items() if count}
+
+    def assert_counts_match_units(self) -> None:
+        stored = set(
+            ItemUnitStateCount.objects.exclude(count=0).values_list("item_id", "state", "count")
+        )
+        rebuild_unit_state_counts(self.company)
+        rebuild_unit_state_counts(self.other_company)
+        self.assertEqual(stored, set(ItemUnitStateCount.objects.values_list("item_id", "state", "count")))
+
+    def test_counters_follow_unit_writes(self) -> None:
+        units = [ItemUnit.objects.create(item=self.item, state="new") for _ in range(3)]
+        self.assertEqual(get_unit_state_counts(self.item), {"new": 3, "used": 0, "damaged": 0, "sold": 0})
+
+        units[0].state = "used"
+        units[0].save()
+        units[1].item = self.other_item
+        units[1].save()
+        units[2].delete()
+
+        self.assertEqual(self.counts(self.item), {"used": 1})
+        self.assertEqual(self.counts(self.other_item), {"new": 1})
+        self.assert_counts_match_units()
+
+    def test_item_delete_skips_counter_updates_for_cascaded_units(self) -> None:
+        ItemUnit.objects.bulk_create(ItemUnit(item=self.item, state="new") for _ in range(300))
+        rebuild_unit_state_counts(self.company)
+        ItemUnit.objects.create(item=self.other_item, state="used")
+        ItemUnit.objects.create(item=self.other_item, state="used")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.item.delete()
+        self.assertFalse(
+            [query for query in queries if query["sql"].startswith('UPDATE "warehouse_itemunitstatecount"')]
+        )
+        self.assertFalse(ItemUnitStateCount.objects.filter(item_id=self.item.id).exists())
+
+        ItemUnit.objects.filter(item=self.other_item)[:1].get().delete()
+        self.assertEqual(self.counts(self.other_item), {"used": 1})
+        ItemUnit.objects.filter(item=self.other_item).delete()
+        self.assertEqual(self.counts(self.other_item), {})
+
+    def test_bulk_transition_is_one_update_and_company_scoped(self) -> None:
+        units = [ItemUnit.objects.create(item=self.item, state="new") for _ in range(4)]
+        units.append(ItemUnit.objects.create(item=self.other_item, state="damaged"))
+        units.append(ItemUnit.objects.create(item=self.item, state="sold"))
+        foreign_unit = ItemUnit.objects.create(item=self.foreign_item, state="new")
+
+        with CaptureQueriesContext(connection) as queries:
+            updated = bulk_transition_units(
+                self.company, [unit.id for unit in units] + [foreign_unit.id], "sold"
+            )
+
+        self.assertEqual(updated, 5)
+        self.assertEqual(
+            len([query for query in queries if query["sql"].startswith('UPDATE "warehouse_itemunit"')]),
+            1,
+        )
+        self.assertEqual(self.counts(self.item), {"sold": 5})
+        self.assertEqual(self.counts(self.other_item), {"sold": 1})
+        self.assertEqual(self.counts(self.foreign_item), {"new": 1})
+        self.assert_counts_match_units()
+
+    def test_bulk_transition_rejects_unknown_state(self) -> None:
+        with self.assertRaises(ValueError):
+            bulk_transition_units(self.company, [], "lost")
+
+
+class StockLedgerTests(TestCase):
+    def setUp(self) -> None:
+        self.company = create_company(name="Ledger Co")
+        self.user = User.objects.create_user(username="stocker", password="strong-password-123")
+        Employee.objects.create(user=self.user, company=self.company)
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="view_item"),
+            Permission.objects.get(codename="change_item"),
+        )
+        self.plc = ItemType.objects.create(name="PLC", company=self.company)
+        self.siemens = Manufacturer.objects.create(name="Siemens", company=self.company)
+        self.item = Item.objects.create(
+            company=self.company, name="CPU", type=self.plc, manufacturer=self.siemens,
+            model="S7", quantity=10, market_value="1.00",
+        )
+
+    def move(self, item: Item, delta: int, at) -> None:
+        StockMovement.objects.create(
+            company=self.company, item=item, delta=delta, reason="adjustment", timestamp=at,
+        )
+
+    def assert_ledger_matches_quantities(self) -> None:
+        self.assertEqual(
+            stock_on_hand(self.company, timezone.now()),
+            dict(Item.objects.filter(company=self.company).values_list("id", "quantity")),
+        )
+
+    def test_item_writes_go_through_the_ledger(self) -> None:
+        self.client.login(username="stocker", password="strong-password-123")
+        self.client.post(reverse("warehouse:items"), {
+            "action": "update_item",
+            "item_id": self.item.id,
+            f"edit-{self.item.id}-name": "CPU",
+            f"edit-{self.item.id}-type": self.plc.id,
+            f"edit-{self.item.id}-manufacturer": self.siemens.id,
+            f"edit-{self.item.id}-model": "S7",
+            f"edit-{self.item.id}-quantity": 7,
+            f"edit-{self.item.id}-market_value": "1.00",
+        })
+        bulk_adjust_quantity(self.company, [self.item.id], 5, user=self.user)
+        ItemImporter(self.company).run([
+            "id,name,type,manufacturer,model,quantity,market_value,description\n",
+            f"{self.item.id},CPU,PLC,Siemens,S7,20,1.00,\n",
+            ",Sensor,PLC,Siemens,B1,4,1.00,\n",
+        ])
+
+        self.assertEqual(
+            list(StockMovement.objects.filter(item=self.item).order_by("id")
+                 .values_list("delta", "reason", "user__username")),
+            [
+                (10, "initial", None),
+                (-3, "adjustment", "stocker"),
+                (5, "bulk", "stocker"),
+                (8, "import", None),
+            ],
+        )
+        self.assert_ledger_matches_quantities()
+
+    def test_point_in_time_uses_latest_snapshot_and_tail(self) -> None:
+        now = timezone.now()
+        StockMovement.objects.filter(item=self.item).update(timestamp=now - timedelta(days=30))
+        self.move(self.item, 5, now - timedelta(days=20))
+        self.assertEqual(take_stock_snapshots(self.company, at=now - timedelta(days=15)), 1)
+        self.move(self.item, -4, now - timedelta(days=10))
+
+        self.assertEqual(stock_on_hand(self.company, now - timedelta(days=25)), {self.item.id: 10})
+        self.assertEqual(stock_on_hand(self.company, now - timedelta(days=12)), {self.item.id: 15})
+        self.assertEqual(stock_on_hand(self.company, now), {self.item.id: 11})
+        self.assertEqual(stock_on_hand(self.company, now - timedelta(days=40)), {self.item.id: 0})
+
+        # Older movements are not replayed once a snapshot covers them.
+        StockMovement.objects.filter(timestamp__lte=now - timedelta(days=15)).delete()
+        self.assertEqual(stock_on_hand(self.company, now), {self.item.id: 11})
+
+    def test_snapshots_skip_items_without_new_movements(self) -> None:
+        now = timezone.now()
+        StockMovement.objects.filter(item=self.item).update(timestamp=now - timedelta(days=2))
+        self.assertEqual(take_stock_snapshots(self.company, at=now - timedelta(days=1)), 1)
+        self.assertEqual(take_stock_snapshots(self.company, at=now), 0)
+
+        output = StringIO()
+        call_command("take_stock_snapshots", stdout=output)
+        self.assertIn("0 stock snapshot(s) taken.", output.getvalue())
+        self.assertEqual(StockSnapshot.objects.count(), 1)
+
+    def test_bulk_delete_removes_ledger_rows(self) -> None:
+        take_stock_snapshots(self.company)
+        bulk_delete(self.company, [self.item.id])
+        self.assertFalse(StockMovement.objects.exists())
+        self.assertFalse(StockSnapshot.objects.exists())
+
+
+class ValuationBucketTests(TestCase):
+    def setUp(self) -> None:
+        self.company = create_company(name="Valuation Co")
+        self.plc = ItemType.objects.create(name="PLC", company=self.company)
+        self.siemens = Manufacturer.objects.create(name="Siemens", company=self.company)
+        self.item = Item.objects.create(
+            company=self.company, name="CPU", type=self.plc, manufacturer=self.siemens,
+            model="S7", quantity=2, market_value="100.00",
+        )
+
+    def record(self, day: date, quantity: int) -> None:
+        self.item.quantity = quantity
+        self.item.save()
+        record_valuation_buckets(self.company, day)
+
+    def test_buckets_copy_summary_and_rerun_replaces_day(self) -> None:
+        day = date(2026, 3, 2)
+        self.assertEqual(record_valuation_buckets(self.company, day), 3)
+        self.record(day, 3)
+
+        self.assertEqual(ValuationBucket.objects.filter(company=self.company, date=day).count(), 3)
+        total = ValuationBucket.objects.get(
+            company=self.company, date=day, type__isnull=True, manufacturer__isnull=True)
+        self.assertEqual((total.total_quantity, total.total_value), (3, Decimal("300.00")))
+
+    def test_series_downsamples_to_last_day_of_period(self) -> None:
+        self.record(date(2026, 3, 2), 1)   # Monday
+        self.record(date(2026, 3, 4), 2)
+        self.record(date(2026, 3, 9), 3)   # next Monday
+        self.record(date(2026, 4, 1), 4)
+
+        weekly = get_valuation_series(
+            self.company, date(2026, 3, 1), date(2026, 4, 30), granularity="week")
+        self.assertEqual(
+            [(point["period"], point["total_quantity"]) for point in weekly[0]["points"]],
+            [("2026-03-02", 2), ("2026-03-09", 3), ("2026-03-30", 4)],
+        )
+
+        monthly = get_valuation_series(
+            self.company, date(2026, 3, 1), date(2026, 4, 30),
+            granularity="month", dimension="type",
+        )
+        self.assertEqual(monthly[0]["label"], "PLC")
+        self.assertEqual(
+            [(point["period"], point["total_value"]) for point in monthly[0]["points"]],
+            [("2026-03-01", "300.00"), ("2026-04-01", "400.00")],
+        )
+
+    def test_endpoint_requires_financial_permission_and_validates_range(self) -> None:
+        user = User.objects.create_user(username="finance", password="strong-password-123")
+        Employee.objects.create(user=user, company=self.company)
+        self.client.login(username="finance", password="strong-password-123")
+        url = reverse("warehouse:valuation_series")
+
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        user.user_permissions.add(Permission.objects.get(codename="view_financial_dashboard"))
+        self.record(timezone.localdate(), 5)
+        response = self.client.get(url, {"granularity": "month"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["series"][0]["points"][0]["total_quantity"], 5)
+
+        response = self.client.get(url, {"start": "2026-05-01", "end": "2026-04-01"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_command_records_active_companies(self) -> None:
+        output = StringIO()
+        call_command("record_valuation_buckets", stdout=output)
+        self.assertIn("3 valuation bucket(s) recorded", output.getvalue())
+
+
+class ItemAutocompleteTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.company = create_company(name="Autocomplete Co")
+        other_company = create_company(name="Other Autocomplete Co")
+        for name in ["Sensor", "servo", "Servo Drive", "PLC", "Série X"]:
+            ItemType.objects.create(name=name, company=self.company)
+        ItemType.objects.create(name="Servo foreign", company=other_company)
+        self.siemens = Manufacturer.objects.create(name="Siemens", company=self.company)
+        plc = ItemType.objects.get(company=self.company, name="PLC")
+        for model in ["S7-200", "S7-200", "s7-300", "X1"]:
+            Item.objects.create(
+                company=self.company, name=model, type=plc, manufacturer=self.siemens,
+                model=model, quantity=1, market_value="1.00",
+            )
+
+    def test_prefix_search_is_case_insensitive_paginated_and_scoped(self) -> None:
+        results, has_next = autocomplete("types", self.company, "se", limit=2)
+        self.assertEqual([result["text"] for result in results], ["Sensor", "servo"])
+        self.assertTrue(has_next)
+
+        results, has_next = autocomplete("types", self.company, "se", limit=2, offset=2)
+        self.assertEqual([result["text"] for result in results], ["Servo Drive"])
+        self.assertFalse(has_next)
+
+        results, _ = autocomplete("models", self.company, "s7")
+        self.assertEqual([result["text"] for result in results], ["S7-200", "s7-300"])
+
+    def test_prefix_search_seeks_the_upper_index(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            autocomplete("manufacturers", self.company, "sie")
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {queries.captured_queries[-1]['sql']}")
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("manufacturer_company_upper_idx", plan)
+
+    def test_results_are_cached_until_choices_change(self) -> None:
+        autocomplete("types", self.company, "pl")
+        with self.assertNumQueries(0):
+            results, _ = autocomplete("types", self.company, "pl")
+        self.assertEqual(len(results), 1)
+
+        ItemType.objects.create(name="Plug", company=self.company)
+        results, _ = autocomplete("types", self.company, "pl")
+        self.assertEqual([result["text"] for result in results], ["PLC", "Plug"])
+
+    def test_endpoint(self) -> None:
+        user = User.objects.create_user(username="typist", password="strong-password-123")
+        Employee.objects.create(user=user, company=self.company)
+        self.client.login(username="typist", password="strong-password-123")
+        url = reverse("warehouse:autocomplete", args=["manufacturers"])
+
+        self.assertEqual(self.client.get(url, {"q": "s"}).status_code, 403)
+
+        user.user_permissions.add(Permission.objects.get(codename="add_item"))
+        response = self.client.get(url, {"q": "s", "limit": 5, "offset": 0})
+        self.assertEqual(response.json(), {
+            "results": [{"id": self.siemens.id, "text": "Siemens"}], "has_next": False,
+        })
+        response = self.client.get(reverse("warehouse:autocomplete", args=["items"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_item_form_renders_only_selected_option_past_threshold(self) -> None:
+        item = Item.objects.filter(company=self.company).first()
+        servo = ItemType.objects.get(company=self.company, name="servo")
+        with patch("warehouse.forms.ITEM_AUTOCOMPLETE_THRESHOLD", 3):
+            form = ItemForm(instance=item, company=self.company, autocomplete=True)
+            bound = ItemForm(
+                {
+                    "name": item.name, "type": servo.id, "manufacturer": self.siemens.id,
+                    "model": item.model, "quantity": 1, "market_value": "1.00",
+                },
+                instance=item, company=self.company, autocomplete=True,
+            )
+
+        self.assertEqual(list(form.fields["type"].choices), [("", "---------"), (item.type_id, "PLC")])
+        self.assertEqual(
+            form.fields["type"].autocomplete_url,
+            reverse("warehouse:autocomplete", args=["types"]),
+        )
+        # Two manufacturer options stay below the threshold and are rendered in full.
+        self.assertFalse(hasattr(form.fields["manufacturer"], "autocomplete_url"))
+        self.assertTrue(bound.is_valid(), bound.errors)
+        self.assertEqual(bound.cleaned_data["type"], servo)
+
+
+class InventoryApiTests(TestCase):
+    def setUp(self) -> None:
+        self.company = create_company(name="Api Co")
+        other_company = create_company(name="Other Api Co")
+        self.user = User.objects.create_user(username="poller", password="strong-password-123")
+        Employee.objects.create(user=self.user, company=self.company)
+        self.user.user_permissions.add(Permission.objects.get(codename="view_item"))
+        self.plc = ItemType.objects.create(name="PLC", company=self.company)
+        self.siemens = Manufacturer.objects.create(name="Siemens", company=self.company)
+        self.items = [
+            Item.objects.create(
+                company=self.company, name=f"Item {index}", type=self.plc,
+                manufacturer=self.siemens, model=f"M-{index}", quantity=index,
+                market_value="9.90",
+            )
+            for index in range(3)
+        ]
+        ItemUnit.objects.create(item=self.items[0], state="new")
+        Item.objects.create(
+            company=other_company, name="Foreign",
+            type=ItemType.objects.create(name="PLC", company=other_company),
+            manufacturer=Manufacturer.objects.create(name="Siemens", company=other_company),
+            model="F", quantity=1, market_value="1.00",
+        )
+        self.client.login(username="poller", password="strong-password-123")
+        self.url = reverse("warehouse:api_list", args=["items"])
+
+    def test_lists_company_rows_from_values_with_keyset_pages(self) -> None:
+        with patch.object(Item, "from_db", side_effect=AssertionError("model instantiated")):
+            response = self.client.get(self.url, {"limit": 2})
+        payload = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(payload["results"][0], {
+            "id": self.items[0].id, "name": "Item 0", "type_id": self.plc.id,
+            "manufacturer_id": self.siemens.id, "model": "M-0", "quantity": 0,
+            "market_value": "9.90", "description": None,
+            "type_name": "PLC", "manufacturer_name": "Siemens",
+        })
+        self.assertEqual(len(payload["results"]), 2)
+
+        payload = self.client.get(payload["next"]).json()
+        self.assertEqual([row["name"] for row in payload["results"]], ["Item 2"])
+        self.assertIsNone(payload["next"])
+
+        units = self.client.get(reverse("warehouse:api_list", args=["units"])).json()
+        self.assertEqual(
+            units["results"],
+            [{"id": ItemUnit.objects.get().id, "item_id": self.items[0].id, "state": "new", "remark": None}],
+        )
+
+    def test_unchanged_poll_gets_304_without_list_query(self) -> None:
+        first = self.client.get(self.url)
+        etag = first["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(
+            [query for query in queries if 'FROM "warehouse_item"' in query["sql"]]
+        )
+
+        other_page = self.client.get(self.url, {"limit": 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(other_page.status_code, 200)
+
+    async def test_async_stack_answers_unchanged_poll_with_304(self) -> None:
+        await self.async_client.aforce_login(self.user)
+        first = await self.async_client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+
+        response = await self.async_client.get(
+            self.url, headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], first["ETag"])
+
+    def test_writes_change_the_etag(self) -> None:
+        writes = [
+            lambda: Item.objects.filter(pk=self.items[0].pk).first().save(),
+            lambda: ItemType.objects.create(name="Sensor", company=self.company),
+            lambda: ItemUnit.objects.create(item=self.items[1], state="used"),
+            lambda: bulk_adjust_quantity(self.company, [self.items[0].id], 1),
+            lambda: bulk_transition_units(
+                self.company, ItemUnit.objects.values_list("id", flat=True), "sold"),
+            lambda: bulk_delete(self.company, [self.items[2].id]),
+        ]
+        etag = self.client.get(self.url)["ETag"]
+        for write in writes:
+            version = get_inventory_version(self.company.id)
+            write()
+            self.assertGreater(get_inventory_version(self.company.id), version)
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            etag = response["ETag"]
+
+    def test_unit_deletes_bump_the_version_without_per_unit_queries(self) -> None:
+        ItemUnit.objects.bulk_create(ItemUnit(item=self.items[0], state="new") for _ in range(300))
+        ItemUnit.objects.bulk_create(ItemUnit(item=self.items[1], state="used") for _ in range(300))
+
+        version = get_inventory_version(self.company.id)
+        with CaptureQueriesContext(connection) as queries:
+            ItemUnit.objects.filter(item=self.items[1]).delete()
+        self.assertGreater(get_inventory_version(self.company.id), version)
+        self.assertEqual(
+            len([query for query in queries if 'UPDATE "warehouse_inventoryversion"' in query["sql"]]), 1)
+        self.assertEqual(
+            len([query for query in queries if query["sql"].startswith('SELECT "warehouse_item"')]), 1)
+
+        version = get_inventory_version(self.company.id)
+        with CaptureQueriesContext(connection) as queries:
+            self.items[0].delete()
+        self.assertGreater(get_inventory_version(self.company.id), version)
+        self.assertLess(len(queries), 30)
+
+    def test_requires_view_permission_even_with_matching_etag(self) -> None:
+        etag = self.client.get(self.url)["ETag"]
+        self.user.user_permissions.clear()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(
+            self.client.get(reverse("warehouse:api_list", args=["users"])).status_code, 403)
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.company = create_company(name="Fragment Co")
+        self.user = User.objects.create_user(username="viewer", password="strong-password-123")
+        Employee.objects.create(user=self.user, company=self.company)
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="view_financial_dashboard"))
+        plc = ItemType.objects.create(name="PLC", company=self.company)
+        maker = Manufacturer.objects.create(name="Maker", company=self.company)
+        self.item = Item.objects.create(
+            company=self.company, name="CPU", type=plc, manufacturer=maker,
+            model="C-1", quantity=2, market_value="100.00",
+        )
+        self.client.login(username="viewer", password="strong-password-123")
+        self.url = reverse("warehouse:home")
+
+    def _inventory_queries(self) -> list[str]:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.response = response
+        return [
+            query["sql"] for query in queries
+            if 'FROM "warehouse_item"' in query["sql"]
+            or 'FROM "warehouse_inventorysummary"' in query["sql"]
+        ]
+
+    def test_dashboard_is_rendered_once_per_inventory_version(self) -> None:
+        self.assertTrue(self._inventory_queries())
+        self.assertFalse(self._inventory_queries())
+        self.assertContains(self.response, 'id="total-quantity">2<')
+
+        self.item.quantity = 7
+        self.item.save()
+
+        self.assertTrue(self._inventory_queries())
+        self.assertContains(self.response, 'id="total-quantity">7<')
+
+    def test_bulk_writes_and_summary_repairs_invalidate_the_dashboard(self) -> None:
+        self._inventory_queries()
+        bulk_adjust_quantity(self.company, [self.item.id], 3)
+        self.assertTrue(self._inventory_queries())
+        self.assertContains(self.response, 'id="total-quantity">5<')
+
+        InventorySummary.objects.filter(company=self.company).update(total_quantity=0)
+        self.assertFalse(self._inventory_queries())
+        rebuild_inventory_summary(self.company)
+        self.assertTrue(self._inventory_queries())
+        self.assertContains(self.response, 'id="total-quantity">5<')
+
+    def test_fragments_are_keyed_by_permission_set(self) -> None:
+        other_user = User.objects.create_user(username="other", password="strong-password-123")
+        key = fragment_cache_key("dashboard", self.company, self.user)
+
+        self.assertNotEqual(key, fragment_cache_key("dashboard", self.company, other_user))
+        other_user.user_permissions.add(
+            Permission.objects.get(codename="view_financial_dashboard"))
+        other_user = User.objects.get(pk=other_user.pk)
+        self.assertEqual(key, fragment_cache_key("dashboard", self.company, other_user))
+
+
+class JobQueueTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.company = create_company(name="Job Co")
+        self.user = User.objects.create_user(username="jobs", password="strong-password-123")
+        Employee.objects.create(user=self.user, company=self.company)
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="view_item"),
+            Permission.objects.get(codename="change_item"),
+        )
+        plc = ItemType.objects.create(name="PLC", company=self.company)
+        maker = Manufacturer.objects.create(name="Maker", company=self.company)
+        self.items = [
+            Item.objects.create(
+                company=self.company, name=f"Item {index}", type=plc,
+                manufacturer=maker, model=f"M-{index}", quantity=10, market_value="1.00",
+            )
+            for index in range(2)
+        ]
+        self.client.login(username="jobs", password="strong-password-123")
+
+    def test_each_job_is_claimed_once_in_order(self) -> None:
+        first = enqueue_job("take_stock_snapshots", self.company)
+        second = enqueue_job("take_stock_snapshots", self.company)
+
+        self.assertEqual(claim_job("worker-a").id, first.id)
+        self.assertEqual(claim_job("worker-b").id, second.id)
+        self.assertIsNone(claim_job("worker-c"))
+
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.worker), ("running", "worker-a"))
+        self.assertEqual(run_job(first).status, "succeeded")
+        first.refresh_from_db()
+        self.assertEqual((first.progress, first.result), (100, {"snapshots": 2}))
+
+    def test_stale_running_jobs_are_requeued_then_failed(self) -> None:
+        job = enqueue_job("take_stock_snapshots", self.company)
+        stale = timezone.now() - JOB_STALE_AFTER - timedelta(seconds=1)
+
+        for attempt in range(1, JOB_MAX_ATTEMPTS + 1):
+            self.assertEqual(claim_job(f"worker-{attempt}").id, job.id)
+            self.assertIsNone(claim_job("busy-worker"))
+            Job.objects.filter(pk=job.pk).update(heartbeat_at=stale)
+
+        self.assertEqual(reclaim_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("failed", JOB_MAX_ATTEMPTS))
+
+        touched = enqueue_job("take_stock_snapshots", self.company)
+        self.assertEqual(claim_job("live-worker").id, touched.id)
+        Job.objects.filter(pk=touched.pk).update(heartbeat_at=stale)
+        touch_jobs([touched.pk])
+        self.assertEqual(reclaim_stale_jobs(), 0)
+        touched.refresh_from_db()
+        self.assertEqual((touched.status, touched.worker), ("running", "live-worker"))
+
+    def test_only_retryable_kinds_are_requeued_and_reclaimed_runs_keep_their_outcome(self) -> None:
+        stale = timezone.now() - JOB_STALE_AFTER - timedelta(seconds=1)
+        bulk = enqueue_job("bulk_action", self.company, {})
+        self.assertEqual(claim_job("worker-a").id, bulk.id)
+        Job.objects.filter(pk=bulk.pk).update(heartbeat_at=stale)
+        self.assertEqual(reclaim_stale_jobs(), 1)
+        bulk.refresh_from_db()
+        self.assertEqual((bulk.status, bulk.attempts), ("failed", 1))
+
+        enqueue_job("take_stock_snapshots", self.company)
+        slow = claim_job("worker-a")
+        Job.objects.filter(pk=slow.pk).update(heartbeat_at=stale)
+        self.assertEqual(claim_job("worker-b").id, slow.id)
+
+        with self.assertLogs("warehouse.jobs", "WARNING"):
+            outcome = run_job(slow)
+        self.assertEqual((outcome.status, outcome.worker, outcome.attempts), ("running", "worker-b", 2))
+
+    def test_failures_are_recorded_on_the_job(self) -> None:
+        def expected_failure(job):
+            update_job_progress(job, 40)
+            raise JobError("Nothing to do.")
+
+        def crash(job):
+            raise RuntimeError("boom")
+
+        with patch.dict(JOB_HANDLERS, {"expected": expected_failure, "crash": crash}):
+            enqueue_job("expected", self.company)
+            expected = run_job(claim_job("test-worker"))
+            with self.assertLogs("warehouse.jobs", "ERROR"):
+                enqueue_job("crash", self.company)
+                crashed = run_job(claim_job("test-worker"))
+
+        self.assertEqual((expected.status, expected.error, expected.progress),
+                         ("failed", "Nothing to do.", 40))
+        self.assertEqual((crashed.status, crashed.error), ("failed", "Unexpected error."))
+        with self.assertRaises(ValueError):
+            enqueue_job("unknown", self.company)
+
+    def test_large_bulk_actions_run_as_jobs(self) -> None:
+        with patch("warehouse.views.BULK_INLINE_MAX_ITEMS", 1):
+            response = self.client.post(reverse("warehouse:items"), {
+                "action": "bulk_action",
+                "bulk_action": "adjust_quantity",
+                "item_ids": [item.id for item in self.items],
+                "quantity_delta": 5,
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            list(Item.objects.filter(company=self.company).values_list("quantity", flat=True)),
+            [10, 10],
+        )
+
+        job = run_job(claim_job("test-worker"))
+        self.assertEqual(
+            (job.kind, job.status, job.result), ("bulk_action", "succeeded", {"affected": 2}))
+        self.assertEqual(
+            list(Item.objects.filter(company=self.company).values_list("quantity", flat=True)),
+            [15, 15],
+        )
+        self.assertEqual(
+            StockMovement.objects.filter(item=self.items[0], user=self.user).count(), 1)
+
+    def test_job_status_is_visible_to_its_creator_only(self) -> None:
+        job = enqueue_job("take_stock_snapshots", self.company, user=self.user)
+        url = reverse("warehouse:job_status", args=[job.id])
+
+        self.assertEqual(self.client.get(url).json()["status"], "queued")
+        Job.objects.filter(pk=job.pk).update(created_by=None)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_commands_can_enqueue_periodic_work(self) -> None:
+        call_command("record_valuation_buckets", "--enqueue", stdout=StringIO())
+        call_command("take_stock_snapshots", "--enqueue", stdout=StringIO())
+
+        self.assertEqual(
+            sorted(Job.objects.filter(company=self.company).values_list("kind", flat=True)),
+            ["record_valuation_buckets", "take_stock_snapshots"],
+        )
+        while (job := claim_job("test-worker")) is not None:
+            self.assertEqual(run_job(job).status, "succeeded")
+
+
+class LowStockAlertTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.company = create_company(name="Alert Co")
+        self.plc = ItemType.objects.create(name="PLC", company=self.company, reorder_level=10)
+        self.sensor = ItemType.objects.create(name="Sensor", company=self.company)
+        self.maker = Manufacturer.objects.create(name="Maker", company=self.company)
+        self.cpu = self.create_item("CPU", self.plc, quantity=8)
+        self.probe = self.create_item("Probe", self.sensor, quantity=2)
+
+    def create_item(self, name: str, item_type: ItemType, **fields) -> Item:
+        return Item.objects.create(
+            company=self.company, name=name, type=item_type, manufacturer=self.maker,
+            model=name, market_value="1.00", **fields,
+        )
+
+    def alerts(self) -> dict[str, tuple[int, int]]:
+        return {
+            alert.item.name: (alert.quantity, alert.threshold)
+            for alert in LowStockAlert.objects.filter(company=self.company).select_related("item")
+        }
+
+    def test_item_writes_follow_item_and_type_thresholds(self) -> None:
+        self.assertEqual(self.alerts(), {"CPU": (8, 10)})
+
+        self.probe.reorder_level = 2
+        self.probe.save()
+        self.cpu.reorder_level = 5
+        self.cpu.save()
+        self.assertEqual(self.alerts(), {"Probe": (2, 2)})
+
+        self.probe.quantity = 3
+        self.probe.save()
+        self.cpu.quantity = 4
+        self.cpu.save()
+        self.assertEqual(self.alerts(), {"CPU": (4, 5)})
+
+        self.cpu.delete()
+        self.assertEqual(self.alerts(), {})
+
+    def test_unrelated_item_writes_skip_evaluation(self) -> None:
+        self.cpu.description = "Spare"
+        with CaptureQueriesContext(connection) as queries:
+            self.cpu.save()
+        self.assertFalse(
+            [query for query in queries if "warehouse_lowstockalert" in query["sql"]]
+        )
+
+    def test_type_threshold_changes_re_evaluate_that_type_only(self) -> None:
+        self.sensor.reorder_level = 5
+        self.sensor.save()
+        self.assertEqual(self.alerts(), {"CPU": (8, 10), "Probe": (2, 5)})
+
+        self.plc.reorder_level = None
+        self.plc.save()
+        self.assertEqual(self.alerts(), {"Probe": (2, 5)})
+
+    def test_bulk_writes_and_imports_maintain_alerts(self) -> None:
+        bulk_adjust_quantity(self.company, [self.cpu.id], 5)
+        self.assertEqual(self.alerts(), {})
+
+        bulk_set_type(self.company, [self.probe.id], self.plc)
+        self.assertEqual(self.alerts(), {"Probe": (2, 10)})
+
+        ItemImporter(self.company).run([
+            "id,name,type,manufacturer,model,quantity,market_value,description\n",
+            f"{self.cpu.id},CPU,PLC,Maker,CPU,1,1.00,\n",
+            ",New,PLC,Maker,N-1,20,1.00,\n",
+        ])
+        self.assertEqual(self.alerts(), {"CPU": (1, 10), "Probe": (2, 10)})
+
+        bulk_delete(self.company, [self.cpu.id])
+        self.assertEqual(self.alerts(), {"Probe": (2, 10)})
+
+        LowStockAlert.objects.all().delete()
+        self.assertEqual(rebuild_low_stock_alerts(self.company), 1)
+        self.assertEqual(self.alerts(), {"Probe": (2, 10)})
+
+    def test_alerts_page_and_header_badge(self) -> None:
+        user = User.objects.create_user(username="stock", password="strong-password-123")
+        Employee.objects.create(user=user, company=self.company)
+        user.user_permissions.add(Permission.objects.get(codename="view_item"))
+        self.client.login(username="stock", password="strong-password-123")
+
+        response = self.client.get(reverse("warehouse:low_stock_alerts"))
+        self.assertEqual([alert.item for alert in response.context["alerts"]], [self.cpu])
+        self.assertContains(response, 'id="low-stock-alert-count">1<')
+
+        user.user_permissions.clear()
+        response = self.client.get(reverse("companies:home"))
+        self.assertNotContains(response, "low-stock-alert-count")
+
+        user.user_permissions.add(Permission.objects.get(codename="view_item"))
+        CompanyFeature.objects.filter(company=self.company).delete()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("companies:home"))
+        self.assertNotContains(response, "low-stock-alert-count")
+        self.assertFalse([query for query in queries if "warehouse_lowstockalert" in query["sql"]])
+
+
+class ItemScanTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        scan_cache.clear()
+        self.company = create_company(name="Scan Co")
+        self.other_company = create_company(name="Other Scan Co")
+        self.user = User.objects.create_user(username="scanner", password="strong-password-123")
+        Employee.objects.create(user=self.user, company=self.company)
+        self.user.user_permissions.add(Permission.objects.get(codename="view_item"))
+        plc = ItemType.objects.create(name="PLC", company=self.company)
+        maker = Manufacturer.objects.create(name="Siemens", company=self.company)
+        self.item = Item.objects.create(
+            company=self.company, name="CPU", type=plc, manufacturer=maker,
+            model="S7-1200", quantity=3, market_value="500.00",
+        )
+        ItemCode.objects.create(company=self.company, item=self.item, code="7891234567895")
+        ItemCode.objects.create(company=self.company, item=self.item, code="CPU-01", kind="sku")
+        ItemUnit.objects.create(item=self.item, state="new")
+        ItemUnit.objects.create(item=self.item, state="new")
+        self.client.login(username="scanner", password="strong-password-123")
+        self.url = reverse("warehouse:scan")
+
+    def scan(self, code: str):
+        return self.client.get(self.url, {"code": code})
+
+    def test_codes_are_unique_per_company(self) -> None:
+        other_type = ItemType.objects.create(name="PLC", company=self.other_company)
+        other_item = Item.objects.create(
+            company=self.other_company, name="Other", type=other_type,
+            manufacturer=Manufacturer.objects.create(name="Siemens", company=self.other_company),
+            model="X", quantity=1, market_value="1.00",
+        )
+        ItemCode.objects.create(company=self.other_company, item=other_item, code="CPU-01")
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ItemCode.objects.create(company=self.company, item=self.item, code="CPU-01")
+        self.assertEqual(self.scan("CPU-01").json()["item"]["id"], self.item.id)
+
+    def test_admin_rejects_duplicate_codes_without_a_server_error(self) -> None:
+        admin_user = User.objects.create_superuser(
+            username="code-admin", password="strong-password-123")
+        self.client.force_login(admin_user)
+        other = Item.objects.create(
+            company=self.company, name="Drive", type=self.item.type,
+            manufacturer=self.item.manufacturer, model="D-1", quantity=1, market_value="1.00",
+        )
+
+        response = self.client.post(
+            reverse("admin:warehouse_item_change", args=[other.id]),
+            {
+                "company": self.company.id, "name": "Drive", "type": other.type_id,
+                "manufacturer": other.manufacturer_id, "model": "D-1", "quantity": 1,
+                "market_value": "1.00", "description": "", "reorder_level": "",
+                "codes-TOTAL_FORMS": 1, "codes-INITIAL_FORMS": 0,
+                "codes-MIN_NUM_FORMS": 0, "codes-MAX_NUM_FORMS": 1000,
+                "codes-0-code": "CPU-01", "codes-0-kind": "barcode",
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "This code is already used in this company.")
+        self.assertFalse(ItemCode.objects.filter(item=other).exists())
+
+    def test_codes_left_on_another_company_do_not_resolve(self) -> None:
+        Item.objects.filter(pk=self.item.pk).update(company=self.other_company)
+        scan_cache.clear()
+
+        self.assertEqual(self.scan("CPU-01").status_code, 404)
+
+    def test_scan_resolves_any_code_in_one_query_then_from_cache(self) -> None:
+        self.scan("CPU-01")
+        with CaptureQueriesContext(connection) as queries:
+            payload = self.scan(" 7891234567895 ").json()
+        self.assertEqual(
+            len([query for query in queries if "warehouse_" in query["sql"]]), 1)
+        self.assertEqual(payload["item"]["name"], "CPU")
+        self.assertEqual(payload["units"], {"new": 2, "used": 0, "damaged": 0, "sold": 0})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.scan("7891234567895").json(), payload)
+        self.assertFalse([query for query in queries if "warehouse_" in query["sql"]])
+
+    def test_writes_invalidate_cached_scans(self) -> None:
+        self.scan("CPU-01")
+        self.item.quantity = 9
+        self.item.save()
+        self.assertEqual(self.scan("CPU-01").json()["item"]["quantity"], 9)
+
+        bulk_transition_units(
+            self.company, ItemUnit.objects.values_list("id", flat=True), "sold")
+        self.assertEqual(self.scan("CPU-01").json()["units"]["sold"], 2)
+
+        ItemCode.objects.filter(code="CPU-01").delete()
+        self.assertEqual(self.scan("CPU-01").status_code, 404)
+
+        bulk_delete(self.company, [self.item.id])
+        self.assertEqual(self.scan("7891234567895").status_code, 404)
+
+    def test_scan_is_company_scoped_and_requires_view_permission(self) -> None:
+        other_user = User.objects.create_user(username="outsider", password="strong-password-123")
+        Employee.objects.create(user=other_user, company=self.other_company)
+        other_user.user_permissions.add(Permission.objects.get(codename="view_item"))
+        self.client.login(username="outsider", password="strong-password-123")
+        self.assertEqual(self.scan("CPU-01").status_code, 404)
+
+        other_user.user_permissions.clear()
+        self.assertEqual(self.scan("CPU-01").status_code, 403)
+
+
+class QueryPlanTests(TestCase):
+    # Tables that grow with tenants, items or history. Small catalogues
+    # (content types, permissions, features) may be scanned.
+    LARGE_TABLES = {
+        "auth_user",
+        "auth_user_groups",
+        "auth_user_user_permissions",
+        "companies_companyfeature",
+        "companies_employee",
+        "django_session",
+        "warehouse_inventorysummary",
+        "warehouse_item",
+        "warehouse_itemtype",
+        "warehouse_itemunit",
+        "warehouse_itemunitstatecount",
+        "warehouse_manufacturer",
+        "warehouse_stockmovement",
+        "warehouse_stocksnapshot",
+        "warehouse_valuationbucket",
+    }
+    COMPANIES = 4
+    ITEMS_PER_COMPANY = 1500
+    EMPLOYEES_PER_COMPANY = 150
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        companies = Company.objects.bulk_create(
+            Company(name=f"Plan Co {index}") for index in range(cls.COMPANIES)
+        )
+        feature, _ = Feature.objects.get_or_create(
+            code="warehouse", defaults={"name": "Warehouse"})
+        for company in companies:
+            CompanyFeature.objects.create(company=company, feature=feature)
+        today = timezone.localdate()
+        groups = Group.objects.bulk_create(Group(name=f"Plan group {index}") for index in range(5))
+        permissions = list(Permission.objects.filter(content_type__app_label="warehouse")[:10])
+        for company in companies:
+            types = ItemType.objects.bulk_create(
+                ItemType(name=f"Type {index}", company=company) for index in range(30)
+            )
+            manufacturers = Manufacturer.objects.bulk_create(
+                Manufacturer(name=f"Maker {index}", company=company) for index in range(15)
+            )
+            items = Item.objects.bulk_create(
+                Item(
+                    company=company,
+                    name=f"Item {index:05d}",
+                    type=types[index % len(types)],
+                    manufacturer=manufacturers[index % len(manufacturers)],
+                    model=f"MD-{index}",
+                    quantity=index % 97,
+                    market_value=Decimal(index % 500) + Decimal("0.99"),
+                )
+                for index in range(cls.ITEMS_PER_COMPANY)
+            )
+            ItemUnit.objects.bulk_create(
+                ItemUnit(item=item, state=state)
+                for item in items[:300]
+                for state in ("new", "used", "sold")
+            )
+            StockMovement.objects.bulk_create(
+                StockMovement(company=company, item=item, delta=item.quantity, reason="initial")
+                for item in items
+            )
+            rebuild_inventory_summary(company)
+            rebuild_unit_state_counts(company)
+            for offset in range(60):
+                record_valuation_buckets(company, today - timedelta(days=offset))
+            users = User.objects.bulk_create(
+                User(username=f"plan-{company.id}-{index:04d}")
+                for index in range(cls.EMPLOYEES_PER_COMPANY)
+            )
+            Employee.objects.bulk_create(
+                Employee(user=user, company=company) for user in users
+            )
+            User.groups.through.objects.bulk_create(
+                User.groups.through(user=user, group=groups[index % len(groups)])
+                for index, user in enumerate(users)
+            )
+            User.user_permissions.through.objects.bulk_create(
+                User.user_permissions.through(user=user, permission=permission)
+                for user in users[:50]
+                for permission in permissions
+            )
+        get_search_backend().rebuild()
+
+        cls.company = companies[1]
+        cls.user = User.objects.create_user(username="planner", password="strong-password-123")
+        Employee.objects.create(user=cls.user, company=cls.company)
+        cls.user.user_permissions.add(*Permission.objects.filter(
+            content_type__app_label__in=["warehouse", "companies"]
+        ))
+        cls.item = Item.objects.filter(company=cls.company).order_by("id").first()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client.login(username="planner", password="strong-password-123")
+
+    def full_scans(self, sql: str) -> list[str]:
+        # Django aliases repeated tables ("auth_user_groups" U1); plans name
+        # the alias, so map it back before checking.
+        aliases = dict(
+            (alias, table) for table, alias in re.findall(r'"(\w+)" (?:AS )?([A-Z]\d+)\b', sql)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            details = [row[-1] for row in cursor.fetchall()]
+        return [
+            detail for detail in details
+            if detail.startswith("SCAN ")
+            and aliases.get(detail.split()[1], detail.split()[1]) in self.LARGE_TABLES
+        ]
+
+    def assert_queries_use_indexes(self, queries: CaptureQueriesContext, label: str) -> None:
+        selects = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith("SELECT")
+        ]
+        self.assertTrue(selects, label)
+        for sql in selects:
+            self.assertEqual(self.full_scans(sql), [], f"{label}: {sql}")
+
+    def test_view_queries_do_not_scan_large_tables(self) -> None:
+        item_type = ItemType.objects.filter(company=self.company).first()
+        cursor_page = self.client.get(reverse("warehouse:items"), {"sort": "-market_value"})
+        pages = [
+            ("warehouse:home", [], {}),
+            ("warehouse:items", [], {}),
+            ("warehouse:items", [], {"sort": "-quantity", "type": item_type.id}),
+            ("warehouse:items", [], {"sort": "market_value", "min_quantity": 5}),
+            ("warehouse:items", [], {
+                "sort": "-market_value",
+                "cursor": cursor_page.context["next_page_url"].split("cursor=")[1],
+            }),
+            ("warehouse:item_edit_form", [self.item.id], {}),
+            ("warehouse:search_items", [], {"q": "MD-1"}),
+            ("warehouse:export_items", [], {"manufacturer": self.item.manufacturer_id}),
+            ("warehouse:valuation_series", [], {"dimension": "type", "granularity": "week"}),
+            ("warehouse:api_list", ["items"], {"after": self.item.id, "limit": 200}),
+            ("warehouse:api_list", ["units"], {}),
+            ("warehouse:api_list", ["types"], {}),
+            ("companies:home", [], {}),
+            ("companies:employees", [], {}),
+            ("companies:company_configuration", [], {}),
+        ]
+        for url_name, args, params in pages:
+            with self.subTest(url_name=url_name, params=params):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(reverse(url_name, args=args), params)
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                self.assertEqual(response.status_code, 200)
+                self.assert_queries_use_indexes(queries, url_name)
+
+    def test_ledger_and_unit_queries_do_not_scan_large_tables(self) -> None:
+        unit_ids = list(
+            ItemUnit.objects.filter(item__company=self.company, state="new")
+            .values_list("id", flat=True)[:100]
+        )
+        for label, operation in [
+            ("stock_on_hand", lambda: stock_on_hand(self.company, timezone.now(), [self.item.id])),
+            ("take_stock_snapshots", lambda: take_stock_snapshots(self.company)),
+            ("bulk_transition_units", lambda: bulk_transition_units(self.company, unit_ids, "sold")),
+            ("get_unit_state_counts", lambda: get_unit_state_counts(self.item)),
+        ]:
+            with self.subTest(label):
+                with CaptureQueriesContext(connection) as queries:
+                    operation()
+                self.assert_queries_use_indexes(queries, label)
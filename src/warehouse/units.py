@@ -0,0 +1,85 @@
+from collections import Counter
+from typing import Iterable
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from companies.models import Company
+from .models import Item, ItemState, ItemUnit, ItemUnitStateCount
+from .versioning import bump_inventory_version
+
+
+UNIT_STATES = [state.value for state in ItemState]
+
+
+def apply_unit_state_delta(item_id: int, state: str, delta: int) -> None:
+    if not delta:
+        return
+    counts = ItemUnitStateCount.objects.filter(item_id=item_id, state=state)
+    if counts.update(count=F("count") + delta) or delta < 0:
+        # As with the inventory summary, removals from a missing row (the item
+        # is being cascade-deleted) are dropped.
+        return
+    try:
+        with transaction.atomic():
+            ItemUnitStateCount.objects.create(item_id=item_id, state=state, count=delta)
+    except IntegrityError:
+        counts.update(count=F("count") + delta)
+
+
+def record_unit_saved(unit: ItemUnit, previous: dict | None) -> None:
+    if previous is not None:
+        if previous["item_id"] == unit.item_id and previous["state"] == unit.state:
+            return
+        apply_unit_state_delta(previous["item_id"], previous["state"], -1)
+    apply_unit_state_delta(unit.item_id, unit.state, 1)
+
+
+def record_unit_deleted(unit: ItemUnit) -> None:
+    apply_unit_state_delta(unit.item_id, unit.state, -1)
+
+
+def get_unit_state_counts(item: Item) -> dict[str, int]:
+    counts = dict.fromkeys(UNIT_STATES, 0)
+    counts.update(item.unit_state_counts.values_list("state", "count"))
+    return counts
+
+
+@transaction.atomic
+def bulk_transition_units(company: Company, unit_ids: Iterable[int], state: str) -> int:
+    if state not in UNIT_STATES:
+        raise ValueError(f"Unknown unit state: {state}")
+
+    # Lock the units that actually change, then move them with one UPDATE and
+    # apply the counter deltas per (item, state) group.
+    units = ItemUnit.objects.filter(item__company=company, pk__in=list(unit_ids)).exclude(
+        state=state)
+    locked_ids = list(units.select_for_update().values_list("id", flat=True))
+    if not locked_ids:
+        return 0
+    units = ItemUnit.objects.filter(pk__in=locked_ids)
+
+    groups = list(
+        units.values("item_id", "state").annotate(units=Count("id")).order_by()
+    )
+    updated = units.update(state=state)
+
+    arrivals: Counter[int] = Counter()
+    for group in groups:
+        apply_unit_state_delta(group["item_id"], group["state"], -group["units"])
+        arrivals[group["item_id"]] += group["units"]
+    for item_id, arrived in arrivals.items():
+        apply_unit_state_delta(item_id, state, arrived)
+    bump_inventory_version(company.id)
+    return updated
+
+
+@transaction.atomic
+def rebuild_unit_state_counts(company: Company) -> int:
+    ItemUnitStateCount.objects.filter(item__company=company).delete()
+    created = ItemUnitStateCount.objects.bulk_create(
+        ItemUnitStateCount(item_id=row["item_id"], state=row["state"], count=row["units"])
+        for row in ItemUnit.objects.filter(item__company=company)
+        .values("item_id", "state")
+        .annotate(units=Count("id"))
+        .order_by()
+    )
+    return len(created)
@@ -5,6 +5,17 @@ app_name = 'warehouse'
 
 urlpatterns = [
     path('estoque/', views.home, name="home"),
+    path('estoque/painel', views.dashboard_data, name="dashboard_data"),
+    path('estoque/valorizacao', views.valuation_series, name="valuation_series"),
     path('estoque/itens', views.items, name="items"),
+    path('estoque/alertas', views.low_stock_alerts, name="low_stock_alerts"),
     path('estoque/itens/criar', views.create_item, name="create_item"),
+    path('estoque/itens/importar', views.import_items, name="import_items"),
+    path('estoque/itens/exportar', views.export_items, name="export_items"),
+    path('estoque/tarefas/<int:job_id>', views.job_status, name="job_status"),
+    path('estoque/itens/leitura', views.scan, name="scan"),
+    path('estoque/itens/buscar', views.search_items, name="search_items"),
+    path('estoque/api/<str:resource>', views.api_list, name="api_list"),
+    path('estoque/autocomplete/<str:source>', views.autocomplete, name="autocomplete"),
+    path('estoque/itens/<int:item_id>/editar', views.item_edit_form, name="item_edit_form"),
 ]
@@ -0,0 +1,144 @@
+from datetime import date, timedelta
+from typing import Any
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from companies.models import Company
+from .models import InventorySummary, ValuationBucket
+
+
+VALUATION_GRANULARITIES = ("day", "week", "month")
+VALUATION_DIMENSIONS = ("total", "type", "manufacturer")
+VALUATION_MAX_DAYS = 3 * 366
+
+
+@transaction.atomic
+def record_valuation_buckets(company: Company, day: date | None = None) -> int:
+    # The buckets are a copy of the incrementally maintained summary, so a run
+    # costs one small read per company regardless of the number of items.
+    # Re-running on the same day replaces that day's rows.
+    day = day or timezone.localdate()
+    ValuationBucket.objects.filter(company=company, date=day).delete()
+    buckets = ValuationBucket.objects.bulk_create(
+        ValuationBucket(
+            company=company,
+            date=day,
+            type_id=summary.type_id,
+            manufacturer_id=summary.manufacturer_id,
+            item_count=summary.item_count,
+            total_quantity=summary.total_quantity,
+            total_value=summary.total_value,
+        )
+        for summary in InventorySummary.objects.filter(company=company)
+        if summary.item_count > 0 or (summary.type_id is None and summary.manufacturer_id is None)
+    )
+    return len(buckets)
+
+
+def record_all_valuation_buckets(day: date | None = None) -> int:
+    # Entry point for schedulers: one day of buckets for every active company.
+    day = day or timezone.localdate()
+    return sum(
+        record_valuation_buckets(company, day)
+        for company in Company.objects.filter(is_active=True).order_by("id")
+    )
+
+
+def _period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _valuation_rows_query(
+    company: Company,
+    start: date,
+    end: date,
+    granularity: str,
+    dimension: str,
+) -> tuple[QuerySet, str, str | None]:
+    if granularity not in VALUATION_GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+    if dimension not in VALUATION_DIMENSIONS:
+        raise ValueError(f"Unsupported dimension: {dimension}")
+
+    buckets = ValuationBucket.objects.filter(
+        company=company, date__gte=start, date__lte=end
+    )
+    if dimension == "total":
+        buckets = buckets.filter(type__isnull=True, manufacturer__isnull=True)
+        key_field, label_field = "company_id", None
+    elif dimension == "type":
+        buckets = buckets.filter(type__isnull=False)
+        key_field, label_field = "type_id", "type__name"
+    else:
+        buckets = buckets.filter(manufacturer__isnull=False)
+        key_field, label_field = "manufacturer_id", "manufacturer__name"
+
+    fields = [key_field, "date", "item_count", "total_quantity", "total_value"]
+    if label_field is not None:
+        fields.append(label_field)
+    return buckets.order_by("date").values(*fields), key_field, label_field
+
+
+def _build_valuation_series(
+    company: Company,
+    rows: list[dict[str, Any]],
+    key_field: str,
+    label_field: str | None,
+    granularity: str,
+) -> list[dict[str, Any]]:
+    # Valuation is a stock level, so a week or month is represented by its
+    # last recorded day. Rows come ordered by date, so later days overwrite.
+    series: dict[int, dict[str, Any]] = {}
+    for row in rows:
+        entry = series.setdefault(row[key_field], {
+            "key": row[key_field] if label_field is not None else None,
+            "label": row[label_field] if label_field is not None else company.name,
+            "points": {},
+        })
+        entry["points"][_period_start(row["date"], granularity)] = {
+            "date": row["date"].isoformat(),
+            "item_count": row["item_count"],
+            "total_quantity": row["total_quantity"],
+            "total_value": str(row["total_value"]),
+        }
+
+    return [
+        {
+            "key": entry["key"],
+            "label": entry["label"],
+            "points": [
+                {"period": period.isoformat(), **point}
+                for period, point in entry["points"].items()
+            ],
+        }
+        for entry in sorted(series.values(), key=lambda entry: entry["label"])
+    ]
+
+
+def get_valuation_series(
+    company: Company,
+    start: date,
+    end: date,
+    granularity: str = "day",
+    dimension: str = "total",
+) -> list[dict[str, Any]]:
+    rows, key_field, label_field = _valuation_rows_query(
+        company, start, end, granularity, dimension)
+    return _build_valuation_series(company, list(rows), key_field, label_field, granularity)
+
+
+async def aget_valuation_series(
+    company: Company,
+    start: date,
+    end: date,
+    granularity: str = "day",
+    dimension: str = "total",
+) -> list[dict[str, Any]]:
+    rows, key_field, label_field = _valuation_rows_query(
+        company, start, end, granularity, dimension)
+    rows = [row async for row in rows]
+    return _build_valuation_series(company, rows, key_field, label_field, granularity)
@@ -0,0 +1,35 @@
+import time
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from .models import InventoryVersion
+from .scan import scan_cache
+
+
+def bump_inventory_version(company_id: int) -> None:
+    # Every inventory write path ends here, so it also drops this process's
+    # cached scan results, again on commit in case a scan re-cached the
+    # pre-write rows in between.
+    scan_cache.invalidate(company_id)
+    transaction.on_commit(lambda: scan_cache.invalidate(company_id))
+    versions = InventoryVersion.objects.filter(company_id=company_id)
+    if versions.update(version=F("version") + 1):
+        return
+    try:
+        # Seed from the clock so a version row lost to a restore or reset
+        # never matches fragments cached under an older number.
+        with transaction.atomic():
+            InventoryVersion.objects.create(company_id=company_id, version=time.time_ns())
+    except IntegrityError:
+        versions.update(version=F("version") + 1)
+
+
+def _inventory_version_query(company_id: int):
+    return InventoryVersion.objects.filter(company_id=company_id).values_list("version", flat=True)
+
+
+def get_inventory_version(company_id: int) -> int:
+    return _inventory_version_query(company_id).first() or 0
+
+
+async def aget_inventory_version(company_id: int) -> int:
+    return await _inventory_version_query(company_id).afirst() or 0
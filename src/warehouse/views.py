@@ -1,28 +1,106 @@
+import hashlib
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse, HttpRequest
+from django.http import HttpResponse, HttpRequest, JsonResponse, StreamingHttpResponse
 from django.core.exceptions import PermissionDenied
-from django.shortcuts import render, redirect
-from .forms import ItemForm
-from .models import Item
-from companies.models import get_user_company
+from django.http import Http404, QueryDict
+from django.shortcuts import get_object_or_404, render, redirect
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.cache import cache_control
+from .api import API_MAX_PAGE_SIZE, API_PAGE_SIZE, API_RESOURCES, alist_resource
+from .autocomplete import AUTOCOMPLETE_MAX_PAGE_SIZE, AUTOCOMPLETE_PAGE_SIZE, AUTOCOMPLETE_SOURCES
+from .autocomplete import aautocomplete
+from .bulk import BULK_DELETE, BULK_INLINE_MAX_ITEMS, run_bulk_action
+from .dashboard import aget_dashboard_data, get_dashboard_data
+from .exporters import iter_items_csv
+from .choices import load_item_choices
+from .forms import (
+    ItemBulkActionForm,
+    ItemFilterForm,
+    ItemForm,
+    ItemImportUploadForm,
+    ValuationSeriesForm,
+)
+from .fragments import cached_fragment
+from .jobs import bulk_action_payload, enqueue_job, save_job_file
+from .models import Item, Job, JobStatus, LowStockAlert, StockMovementReason
+from .pagination import paginate_keyset
+from .scan import ascan_item
+from .search import asearch_items
+from .stock import attribute_stock_change
+from .valuation import aget_valuation_series
+from .versioning import aget_inventory_version
+
+
+ITEMS_PAGE_SIZE = 50
+ITEMS_CURSOR_SALT = "warehouse.items.cursor"
+ALERTS_PAGE_SIZE = 50
+ALERTS_CURSOR_SALT = "warehouse.low-stock-alerts.cursor"
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+
+def _positive_int(value: str | None, default: int) -> int:
+    try:
+        return max(int(value), 1) if value is not None else default
+    except ValueError:
+        return default
+
+
+def _non_negative_int(value: str | None, default: int) -> int:
+    try:
+        return max(int(value), 0) if value is not None else default
+    except ValueError:
+        return default
+
+
+def _page_url(request: HttpRequest, cursor: str | None) -> str | None:
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query["cursor"] = cursor
+    return f"?{query.urlencode()}"
+
+
+def _items_url(query: QueryDict) -> str:
+    # The item list with its filters, sort and cursor, so forms posted from a
+    # row come back to the same page.
+    query = query.copy()
+    query.pop("edit", None)
+    if not query:
+        return reverse("warehouse:items")
+    return f"{reverse('warehouse:items')}?{query.urlencode()}"
 
 
 @login_required
 def home(request: HttpRequest) -> HttpResponse:
-    company = get_user_company(request.user)
+    company = request.company
     if company is None:
         raise PermissionDenied("User is not associated with a company.")
-    items = Item.objects.filter(company=company)
     if request.user.has_perm('warehouse.view_financial_dashboard'):
+        # The dashboard only changes with the inventory version, so the data
+        # is queried and rendered once per version (and per day, for the
+        # valuation chart start date).
+        dashboard_html = cached_fragment(
+            "dashboard",
+            company,
+            request.user,
+            "warehouse/partials/dashboard.html",
+            lambda: {"dashboard": get_dashboard_data(company)},
+            vary_on=(timezone.localdate().isoformat(),),
+        )
         return render(request, 'warehouse/pages/home.html',
-                      {'title': 'Estoque', 'items': items})
+                      {'title': 'Estoque', 'dashboard_html': dashboard_html})
     else:
         return redirect('warehouse:items')
 
 
 @login_required
 def items(request: HttpRequest) -> HttpResponse:
-    company = get_user_company(request.user)
+    company = request.company
     if company is None:
         raise PermissionDenied("User is not associated with a company.")
 
@@ -33,17 +111,41 @@ def items(request: HttpRequest) -> HttpResponse:
     can_change_item = request.user.has_perm("warehouse.change_item")
     can_delete_item = request.user.has_perm("warehouse.delete_item")
 
+    choices = load_item_choices(company)
+    items_url = _items_url(request.GET)
     bound_update_form_item_id: int | None = None
     bound_update_form: ItemForm | None = None
+    bulk_form: ItemBulkActionForm | None = None
 
     if request.method == "POST":
         action = request.POST.get("action")
         item_id = request.POST.get("item_id")
 
+        if action == "bulk_action":
+            bulk_form = ItemBulkActionForm(request.POST, company=company, choices=choices)
+            if bulk_form.is_valid():
+                if bulk_form.cleaned_data["bulk_action"] == BULK_DELETE:
+                    if not can_delete_item:
+                        raise PermissionDenied("You do not have permission to delete items.")
+                elif not can_change_item:
+                    raise PermissionDenied("You do not have permission to change items.")
+                if len(bulk_form.cleaned_data["item_ids"]) > BULK_INLINE_MAX_ITEMS:
+                    job = enqueue_job(
+                        "bulk_action",
+                        company,
+                        bulk_action_payload(bulk_form.cleaned_data),
+                        user=request.user,
+                    )
+                    messages.info(request, f"Ação em massa agendada (tarefa #{job.id}).")
+                    return redirect(items_url)
+                affected = run_bulk_action(company, bulk_form.cleaned_data, request.user)
+                messages.success(request, f"{affected} item(ns) afetado(s).")
+                return redirect(items_url)
+
         if action in {"update_item", "delete_item"}:
             item = Item.objects.filter(company=company, pk=item_id).first()
             if item is None:
-                return redirect("warehouse:items")
+                return redirect(items_url)
 
             if action == "update_item":
                 if not can_change_item:
@@ -53,30 +155,65 @@ def items(request: HttpRequest) -> HttpResponse:
                     request.POST,
                     instance=item,
                     company=company,
+                    choices=choices,
+                    autocomplete=True,
                     prefix=f"edit-{item.id}",
                 )
                 if bound_update_form.is_valid():
+                    attribute_stock_change(bound_update_form.instance, request.user)
                     bound_update_form.save()
-                    return redirect("warehouse:items")
+                    return redirect(items_url)
 
             elif action == "delete_item":
                 if not can_delete_item:
                     raise PermissionDenied("You do not have permission to delete items.")
                 item.delete()
-                return redirect("warehouse:items")
+                return redirect(items_url)
 
-    items = list(
-        Item.objects.filter(company=company).select_related("type", "manufacturer")
+    filter_form = ItemFilterForm(request.GET or None, company=company, choices=choices)
+    items_queryset = Item.objects.filter(company=company).select_related(
+        "type", "manufacturer"
     )
+    ordering = "name"
+    if filter_form.is_valid():
+        items_queryset = filter_form.filter_queryset(items_queryset)
+        ordering = filter_form.get_ordering()
+
+    page = paginate_keyset(
+        items_queryset,
+        ordering,
+        request.GET.get("cursor"),
+        ITEMS_PAGE_SIZE,
+        salt=ITEMS_CURSOR_SALT,
+    )
+    items = page.object_list
+
+    # Rows are read-only; an edit form is only built for the row being edited
+    # (a failed submission or ?edit=<id> without JavaScript). Other rows load
+    # theirs on demand from the item_edit_form fragment.
+    edit_item_id = request.GET.get("edit")
+    edit_query = request.GET.copy()
     item_rows = []
     for item in items:
         edit_form = None
         if can_change_item:
             if bound_update_form_item_id == item.id and bound_update_form is not None:
                 edit_form = bound_update_form
-            else:
-                edit_form = ItemForm(instance=item, company=company, prefix=f"edit-{item.id}")
-        item_rows.append({"item": item, "edit_form": edit_form})
+            elif edit_item_id == str(item.id):
+                edit_form = ItemForm(
+                    instance=item,
+                    company=company,
+                    choices=choices,
+                    autocomplete=True,
+                    prefix=f"edit-{item.id}",
+                )
+        edit_query["edit"] = item.id
+        item_rows.append(
+            {"item": item, "edit_form": edit_form, "edit_url": f"?{edit_query.urlencode()}"}
+        )
+
+    if bulk_form is None and (can_change_item or can_delete_item):
+        bulk_form = ItemBulkActionForm(company=company, choices=choices)
 
     return render(
         request,
@@ -85,6 +222,11 @@ def items(request: HttpRequest) -> HttpResponse:
             "title": "Itens",
             "items": items,
             "item_rows": item_rows,
+            "filter_form": filter_form,
+            "bulk_form": bulk_form,
+            "items_url": items_url,
+            "next_page_url": _page_url(request, page.next_cursor),
+            "previous_page_url": _page_url(request, page.previous_cursor),
             "can_add_item": can_add_item,
             "can_change_item": can_change_item,
             "can_delete_item": can_delete_item,
@@ -92,22 +234,323 @@ def items(request: HttpRequest) -> HttpResponse:
     )
 
 
+@login_required
+def low_stock_alerts(request: HttpRequest) -> HttpResponse:
+    company = request.company
+    if company is None:
+        raise PermissionDenied("User is not associated with a company.")
+    if not request.user.has_perm("warehouse.view_item"):
+        raise PermissionDenied("You do not have permission to view items.")
+
+    page = paginate_keyset(
+        LowStockAlert.objects.filter(company=company).select_related(
+            "item__type", "item__manufacturer"
+        ),
+        "quantity",
+        request.GET.get("cursor"),
+        ALERTS_PAGE_SIZE,
+        salt=ALERTS_CURSOR_SALT,
+    )
+    return render(request, "warehouse/pages/low_stock_alerts.html", {
+        "title": "Alertas de estoque",
+        "alerts": page.object_list,
+        "next_page_url": _page_url(request, page.next_cursor),
+        "previous_page_url": _page_url(request, page.previous_cursor),
+    })
+
+
+@login_required
+def item_edit_form(request: HttpRequest, item_id: int) -> HttpResponse:
+    company = request.company
+    if company is None:
+        raise PermissionDenied("User is not associated with a company.")
+    if not request.user.has_perm("warehouse.change_item"):
+        raise PermissionDenied("You do not have permission to change items.")
+
+    item = get_object_or_404(Item, company=company, pk=item_id)
+    form = ItemForm(
+        instance=item,
+        company=company,
+        choices=load_item_choices(company),
+        autocomplete=True,
+        prefix=f"edit-{item.id}",
+    )
+    return render(
+        request,
+        "warehouse/partials/item_edit_form.html",
+        {"item": item, "form": form, "items_url": _items_url(request.GET)},
+    )
+
+
 @login_required
 def create_item(request: HttpRequest) -> HttpResponse:
-    company = get_user_company(request.user)
+    company = request.company
     if company is None:
         raise PermissionDenied("User is not associated with a company.")
     if not request.user.has_perm("warehouse.add_item"):
         raise PermissionDenied("You do not have permission to add items.")
 
     if request.method == 'POST':
-        form = ItemForm(request.POST, company=company)
+        form = ItemForm(request.POST, company=company, autocomplete=True)
         if form.is_valid():
             item = form.save(commit=False)
             item.company = company
+            attribute_stock_change(item, request.user, StockMovementReason.INITIAL)
             item.save()
             return redirect('warehouse:items')
 
-    form = ItemForm(company=company)
+    form = ItemForm(company=company, autocomplete=True)
     return render(request, 'warehouse/pages/create_item.html', {
         'title': 'Criar Item', 'form': form})
+
+
+@login_required
+def import_items(request: HttpRequest) -> HttpResponse:
+    company = request.company
+    if company is None:
+        raise PermissionDenied("User is not associated with a company.")
+    if not request.user.has_perm("warehouse.add_item"):
+        raise PermissionDenied("You do not have permission to add items.")
+
+    # The upload is stored and imported by the job worker; the page then
+    # follows the job until its report is ready.
+    if request.method == "POST":
+        form = ItemImportUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            job = enqueue_job(
+                "import_items",
+                company,
+                {
+                    "file": save_job_file(form.cleaned_data["file"]),
+                    "file_format": form.cleaned_data["file_format"],
+                    "allow_updates": request.user.has_perm("warehouse.change_item"),
+                },
+                user=request.user,
+            )
+            return redirect(f"{reverse('warehouse:import_items')}?job={job.id}")
+    else:
+        form = ItemImportUploadForm()
+
+    job = None
+    job_id = _positive_int(request.GET.get("job"), 0)
+    if job_id:
+        job = Job.objects.filter(
+            company=company, created_by=request.user, kind="import_items", pk=job_id
+        ).first()
+    report = job.result if job is not None and job.status == JobStatus.SUCCEEDED.value else None
+
+    return render(request, "warehouse/pages/import_items.html", {
+        "title": "Importar Itens", "form": form, "job": job, "report": report})
+
+
+@login_required
+def job_status(request: HttpRequest, job_id: int) -> JsonResponse:
+    company = request.company
+    if company is None:
+        raise PermissionDenied("User is not associated with a company.")
+
+    job = get_object_or_404(Job, company=company, created_by=request.user, pk=job_id)
+    return JsonResponse({
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "error": job.error,
+    })
+
+
+@login_required
+def export_items(request: HttpRequest) -> StreamingHttpResponse:
+    company = request.company
+    if company is None:
+        raise PermissionDenied("User is not associated with a company.")
+    if not request.user.has_perm("warehouse.view_item"):
+        raise PermissionDenied("You do not have permission to view items.")
+
+    # Exports honour the same filters and sort as the items list.
+    filter_form = ItemFilterForm(request.GET or None, company=company)
+    items_queryset = Item.objects.filter(company=company)
+    ordering = "name"
+    if filter_form.is_valid():
+        items_queryset = filter_form.filter_queryset(items_queryset)
+        ordering = filter_form.get_ordering()
+    items_queryset = items_queryset.order_by(ordering, "pk")
+
+    response = StreamingHttpResponse(
+        iter_items_csv(items_queryset), content_type="text/csv; charset=utf-8"
+    )
+    response["Content-Disposition"] = 'attachment; filename="itens.csv"'
+    return response
+
+
+@login_required
+async def search_items(request: HttpRequest) -> JsonResponse:
+    user = await request.auser()
+    company = request.company
+    if company is None:
+        raise PermissionDenied("User is not associated with a company.")
+    if not await user.ahas_perm("warehouse.view_item"):
+        raise PermissionDenied("You do not have permission to view items.")
+
+    query = request.GET.get("q", "").strip()
+    page_number = _positive_int(request.GET.get("page"), 1)
+    page_size = min(
+        _positive_int(request.GET.get("page_size"), SEARCH_PAGE_SIZE),
+        SEARCH_MAX_PAGE_SIZE,
+    )
+
+    results: list[Item] = []
+    has_next = False
+    if query:
+        results, has_next = await asearch_items(
+            company, query, limit=page_size, offset=(page_number - 1) * page_size
+        )
+
+    return JsonResponse(
+        {
+            "query": query,
+            "page": page_number,
+            "page_size": page_size,
+            "has_next": has_next,
+            "results": [
+                {
+                    "id": item.id,
+                    "name": item.name,
+                    "model": item.model,
+                    "type": item.type.name,
+                    "manufacturer": item.manufacturer.name,
+                    "quantity": item.quantity,
+                    "market_value": str(item.market_value),
+                }
+                for item in results
+            ],
+        }
+    )
+
+
+@login_required
+async def scan(request: HttpRequest) -> JsonResponse:
+    user = await request.auser()
+    company = request.company
+    if company is None:
+        raise PermissionDenied("User is not associated with a company.")
+    if not await user.ahas_perm("warehouse.view_item"):
+        raise PermissionDenied("You do not have permission to view items.")
+
+    result = await ascan_item(company, request.GET.get("code", ""))
+    if result is None:
+        raise Http404("Unknown code.")
+    return JsonResponse(result)
+
+
+@login_required
+async def valuation_series(request: HttpRequest) -> JsonResponse:
+    user = await request.auser()
+    company = request.company
+    if company is None:
+        raise PermissionDenied("User is not associated with a company.")
+    if not await user.ahas_perm("warehouse.view_financial_dashboard"):
+        raise PermissionDenied("You do not have permission to view the financial dashboard.")
+
+    form = ValuationSeriesForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+
+    return JsonResponse(
+        {
+            "start": form.cleaned_data["start"].isoformat(),
+            "end": form.cleaned_data["end"].isoformat(),
+            "granularity": form.cleaned_data["granularity"],
+            "dimension": form.cleaned_data["dimension"],
+            "series": await aget_valuation_series(company, **form.cleaned_data),
+        }
+    )
+
+
+@login_required
+async def dashboard_data(request: HttpRequest) -> JsonResponse:
+    user = await request.auser()
+    company = request.company
+    if company is None:
+        raise PermissionDenied("User is not associated with a company.")
+    if not await user.ahas_perm("warehouse.view_financial_dashboard"):
+        raise PermissionDenied("You do not have permission to view the financial dashboard.")
+
+    data = await aget_dashboard_data(company)
+    return JsonResponse(
+        {
+            "item_count": data["item_count"],
+            "total_quantity": data["total_quantity"],
+            "total_value": data["total_value"],
+            "units": data["units"],
+            "charts": data["charts"],
+            "recent_items": [
+                {
+                    "id": item.id,
+                    "name": item.name,
+                    "type": item.type.name,
+                    "manufacturer": item.manufacturer.name,
+                    "quantity": item.quantity,
+                }
+                for item in data["recent_items"]
+            ],
+        }
+    )
+
+
+@login_required
+async def autocomplete(request: HttpRequest, source: str) -> JsonResponse:
+    user = await request.auser()
+    company = request.company
+    if company is None:
+        raise PermissionDenied("User is not associated with a company.")
+    for codename in ("view_item", "add_item", "change_item"):
+        if await user.ahas_perm(f"warehouse.{codename}"):
+            break
+    else:
+        raise PermissionDenied("You do not have permission to view items.")
+    if source not in AUTOCOMPLETE_SOURCES:
+        raise Http404("Unknown autocomplete source.")
+
+    query = request.GET.get("q", "").strip()
+    limit = min(
+        _positive_int(request.GET.get("limit"), AUTOCOMPLETE_PAGE_SIZE),
+        AUTOCOMPLETE_MAX_PAGE_SIZE,
+    )
+    offset = _non_negative_int(request.GET.get("offset"), 0)
+
+    results, has_next = await aautocomplete(source, company, query, limit, offset)
+    return JsonResponse({"results": results, "has_next": has_next})
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+async def api_list(request: HttpRequest, resource: str) -> HttpResponse:
+    user = await request.auser()
+    company = request.company
+    if company is None:
+        raise PermissionDenied("User is not associated with a company.")
+    if not await user.ahas_perm("warehouse.view_item"):
+        raise PermissionDenied("You do not have permission to view items.")
+    if resource not in API_RESOURCES:
+        raise Http404("Unknown resource.")
+
+    # Answers conditional GETs from the company's inventory version alone, so
+    # an unchanged poll returns 304 without running the list query.
+    query = hashlib.sha256(request.GET.urlencode().encode()).hexdigest()[:16]
+    version = await aget_inventory_version(company.id)
+    etag = quote_etag(f"{company.id}-{version}-{resource}-{query}")
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        limit = min(_positive_int(request.GET.get("limit"), API_PAGE_SIZE), API_MAX_PAGE_SIZE)
+        after = _non_negative_int(request.GET.get("after"), 0)
+        rows, next_after = await alist_resource(API_RESOURCES[resource], company, after, limit)
+
+        next_url = None
+        if next_after is not None:
+            page_query = request.GET.copy()
+            page_query["after"] = next_after
+            next_url = f"{request.path}?{page_query.urlencode()}"
+        response = JsonResponse({"results": rows, "next": next_url})
+    response.headers["ETag"] = etag
+    return response